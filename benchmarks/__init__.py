@@ -0,0 +1,4 @@
+"""
+Benchmarks for the solver: tiered puzzle corpora, a timing runner and
+regression checks between saved runs. Run them with `solve_sudoku.py bench`.
+"""
@@ -0,0 +1,127 @@
+"""
+Tiered benchmark corpora, as lists of 81-character puzzle lines.
+
+- "examples": the puzzles bundled in `examples/`.
+- "easy", "medium", "hard": puzzles with a unique solution from
+  `sudoku.generator`, with fewer clues at each level.
+- "sudoku17": minimal 17-clue puzzles, randomly relabelled and permuted.
+
+LARGE_TIERS hold bigger grids, "16x16" and "25x25": randomly permuted solution
+grids with a fixed fraction of their cells emptied. They may have several
+solutions, which does not matter to a solve benchmark. They are not run by
+default, only when asked for by name.
+
+Generated tiers are deterministic for a given seed, so runs can be compared.
+"""
+
+import random
+from pathlib import Path
+from sudoku.puzzle_file import read_puzzle, format_puzzle, DIGITS
+from sudoku.generator import generate_stream
+
+ROOT = Path(__file__).parent.parent
+EXAMPLES = ROOT / "examples"
+SUDOKU17 = Path(__file__).parent / "sudoku17.txt"
+
+# Clues left in the generated puzzles of every level.
+LEVELS = {"easy": 40, "medium": 32, "hard": 26}
+
+
+def shuffle_grid(line: str, rng: random.Random) -> str:
+    """
+    Applies a random validity-preserving transformation to a puzzle: relabels the
+    digits, permutes bands, stacks, and rows and cols within them, and may transpose.
+    """
+    def order() -> list[int]:
+        bands = rng.sample(range(3), 3)
+        return [band * 3 + r for band in bands for r in rng.sample(range(3), 3)]
+
+    rows = order()
+    cols = order()
+    digits = rng.sample("123456789", 9)
+    grid = [[line[r * 9 + c] for c in cols] for r in rows]
+    if rng.random() < 0.5:
+        grid = [list(col) for col in zip(*grid)]
+    return "".join(digits[int(ch) - 1] if ch in "123456789" else "." for row in grid for ch in row)
+
+
+def examples(count: int = 0, seed: int = 0) -> list[str]:
+    """
+    Returns the bundled example puzzles; `count` and `seed` are ignored.
+    """
+    return [format_puzzle(read_puzzle(path)) for path in sorted(EXAMPLES.glob("*.txt"))]
+
+
+def generated(clues: int, count: int, seed: int = 0) -> list[str]:
+    """
+    Generates `count` puzzles with `clues` clues and a unique solution each, across
+    all CPUs.
+    """
+    return list(generate_stream(count, clues=clues, seed=seed))
+
+
+def sudoku17(count: int, seed: int = 0) -> list[str]:
+    """
+    Returns `count` 17-clue puzzles: the bundled ones first, then random
+    transformations of them.
+    """
+    rng = random.Random(seed)
+    base = [line.strip() for line in SUDOKU17.read_text().splitlines() if line.strip()]
+    lines = base[:count]
+    while len(lines) < count:
+        lines.append(shuffle_grid(rng.choice(base), rng))
+    return lines
+
+
+def large(box: int, empty: float, count: int, seed: int = 0) -> list[str]:
+    """
+    Returns `count` puzzles of `box * box` rows: solution grids built from a
+    pattern, with their digits, bands, stacks, and rows and cols within them
+    randomly permuted, and a fraction `empty` of their cells emptied.
+    """
+    rng = random.Random(seed)
+    n = box * box
+
+    def order() -> list[int]:
+        return [band * box + r for band in rng.sample(range(box), box) for r in rng.sample(range(box), box)]
+
+    lines = []
+    for _ in range(count):
+        rows = order()
+        cols = order()
+        digits = rng.sample(DIGITS[:n], n)
+        cells = [digits[(box * (r % box) + r // box + c) % n] for r in rows for c in cols]
+        for i in rng.sample(range(n * n), int(n * n * empty)):
+            cells[i] = "."
+        lines.append("".join(cells))
+    return lines
+
+
+TIERS = {
+    "examples": examples,
+    **{
+        level: (lambda count, seed=0, clues=clues: generated(clues, count, seed))
+        for level, clues in LEVELS.items()
+    },
+    "sudoku17": sudoku17,
+}
+
+
+# The box size and the fraction of empty cells of every large-grid tier. Both
+# need a search; 25x25 grids with fewer clues than this take seconds apiece.
+LARGE = {"16x16": (4, 0.6), "25x25": (5, 0.5)}
+
+LARGE_TIERS = {
+    name: (lambda count, seed=0, box=box, empty=empty: large(box, empty, count, seed))
+    for name, (box, empty) in LARGE.items()
+}
+
+
+def load_tier(name: str, count: int, seed: int = 0) -> list[str]:
+    """
+    Returns the puzzles of the tier `name`, one of TIERS or LARGE_TIERS.
+    """
+    tiers = TIERS | LARGE_TIERS
+    if name not in tiers:
+        raise ValueError(f"unknown tier {name!r}, expected one of {tuple(tiers)}")
+    return tiers[name](count, seed)
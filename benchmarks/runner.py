@@ -0,0 +1,137 @@
+"""
+Runs the solver over benchmark tiers and compares saved results.
+
+Every tier is solved three times: once timed without any instrumentation, once
+with an observer counting propagation steps and guesses, and once under
+tracemalloc for the peak memory, so that the counting does not skew the timings.
+"""
+
+import json
+import platform
+import time
+import tracemalloc
+from statistics import quantiles
+from sudoku.events import EventKind
+from sudoku.puzzle_file import parse_puzzle
+from sudoku.solver import solve, SolverResult
+from .corpus import load_tier
+
+
+class _Counter:
+    def __init__(self):
+        self.steps = 0
+        self.guesses = 0
+
+    def __call__(self, event):
+        if event.kind == EventKind.ITERATION:
+            self.steps += 1
+        elif event.kind == EventKind.GUESS:
+            self.guesses += 1
+
+
+def _percentile(latencies: list[float], p: int) -> float:
+    if len(latencies) == 1:
+        return latencies[0]
+    return quantiles(latencies, n=100, method="inclusive")[p - 1]
+
+
+def run_tier(lines: list[str], backend: str = "propagation") -> dict:
+    """
+    Benchmarks the solver on one list of puzzles.
+
+    Returns:
+        The number of puzzles and of solved puzzles, puzzles per second, p50 and
+        p99 latency in milliseconds, peak traced memory in KiB, and the total
+        number of propagation steps and guesses.
+    """
+    puzzles = [parse_puzzle(line) for line in lines]
+
+    solved = 0
+    latencies = []
+    for puzzle in puzzles:
+        start = time.perf_counter()
+        result, _ = solve(puzzle, backend=backend)
+        latencies.append(time.perf_counter() - start)
+        if result == SolverResult.SOLVED:
+            solved += 1
+
+    counter = _Counter()
+    for puzzle in puzzles:
+        solve(puzzle, backend=backend, observer=counter)
+
+    tracemalloc.start()
+    try:
+        for puzzle in puzzles:
+            solve(puzzle, backend=backend)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        "puzzles": len(puzzles),
+        "solved": solved,
+        "puzzles_per_second": len(puzzles) / total if total else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "peak_memory_kib": peak / 1024,
+        "steps": counter.steps,
+        "guesses": counter.guesses,
+    }
+
+
+def run(tiers: list[str], count: int = 100, seed: int = 0, backend: str = "propagation") -> dict:
+    """
+    Benchmarks the solver on several tiers, see `benchmarks.corpus.TIERS`.
+
+    Returns:
+        A JSON-serializable report with the settings, the environment and the
+        results of every tier.
+    """
+    return {
+        "engine": backend,
+        "count": count,
+        "seed": seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tiers": {name: run_tier(load_tier(name, count, seed), backend) for name in tiers},
+    }
+
+
+def save(report: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, report: dict, tolerance: float = 0.1) -> list[str]:
+    """
+    Compares a report against a baseline report.
+
+    Args:
+        baseline: The earlier report.
+        report: The new report.
+        tolerance: The allowed relative slowdown before a change counts as a regression.
+
+    Returns:
+        A description of every regression: a tier whose throughput dropped, or whose
+        p99 latency, steps or guesses grew, by more than `tolerance`.
+    """
+    regressions = []
+    for name, new in report["tiers"].items():
+        old = baseline.get("tiers", {}).get(name)
+        if old is None:
+            continue
+        if new["puzzles_per_second"] < old["puzzles_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {new['puzzles_per_second']:.1f} puzzles/s, was {old['puzzles_per_second']:.1f}"
+            )
+        for key in ("p99_ms", "steps", "guesses"):
+            if new[key] > old[key] * (1 + tolerance) and new[key] - old[key] > 1e-9:
+                regressions.append(f"{name}: {key} {new[key]:.4g}, was {old[key]:.4g}")
+    return regressions
@@ -0,0 +1,58 @@
+"""
+Measures how long the command line takes to start, as seen by a script that runs it
+once per puzzle, and checks it against a budget.
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# What is timed: a fresh interpreter importing the core package, and a full CLI
+# solve of a bundled puzzle.
+COMMANDS = {
+    "import": ["-c", "import sudoku.solver"],
+    "solve": [str(ROOT / "solve_sudoku.py"), "solve", str(ROOT / "examples" / "easy.txt")],
+}
+
+# The slowest acceptable start of each command, in milliseconds. Generous enough
+# for slow machines; the core imports in well under half of it.
+BUDGETS_MS = {"import": 150.0, "solve": 250.0}
+
+# Third-party packages that must not be imported by the commands above.
+HEAVY_MODULES = ("pydantic", "typer", "rich", "numpy")
+
+
+def measure(args: list[str], runs: int = 5) -> float:
+    """
+    Runs `python *args` `runs` times.
+
+    Returns:
+        The fastest wall time in milliseconds.
+    """
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(runs: int = 5) -> dict[str, float]:
+    """
+    Returns the fastest start of every one of COMMANDS, in milliseconds.
+    """
+    return {name: measure(args, runs) for name, args in COMMANDS.items()}
+
+
+def over_budget(timings: dict[str, float], budgets: dict[str, float] = BUDGETS_MS) -> list[str]:
+    """
+    Returns a description of every command that took longer than its budget.
+    """
+    return [
+        f"{name}: {timings[name]:.1f} ms, budget {budget:.1f} ms"
+        for name, budget in budgets.items()
+        if timings.get(name, 0.0) > budget
+    ]
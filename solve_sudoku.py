@@ -1,13 +1,93 @@
-import typer
-from typing_extensions import Annotated
+from __future__ import annotations
+
+import re
+import sys
+from typing import Annotated
 from sudoku.puzzle_file import read_puzzle
-from sudoku.solver import try_solve_puzzle, SolverResult
-from rich import print
+from sudoku.solver import solve, count_solutions, SolverResult, BACKENDS
+from sudoku.propagation import TECHNIQUES, DEFAULT_TECHNIQUES
+from sudoku.events import Event, EventKind
+from sudoku.generator import DIFFICULTIES, MIN_CLUES, MAX_ATTEMPTS
+
+# typer, rich and the batch, cache and generator machinery are only imported by the
+# commands that use them, and a plain `solve` run needs none of them, see `run`.
+# Annotations are evaluated when the typer app is built.
+_COMMANDS = []
+
+
+def command(name: str | None = None):
+    """
+    Registers a command of the typer app, see `build_app`.
+    """
+    def register(func):
+        _COMMANDS.append((name, func))
+        return func
+
+    return register
+
+
+def build_app():
+    global typer
+    import typer
+
+    app = typer.Typer()
+    for name, func in _COMMANDS:
+        app.command(name)(func)
+    return app
+
+
+_MARKUP = re.compile(r"\[/?[a-z ]+\]")
+
+
+def print(*objects, file=None):
+    """
+    Prints with rich markup. Without a terminal, rich would only drop the markup of
+    plain strings, so it is stripped here instead of importing rich.
+    """
+    stream = file or sys.stdout
+    if stream.isatty() or not all(isinstance(o, str) for o in objects):
+        from rich import print as rich_print
 
-app = typer.Typer()
+        rich_print(*objects, file=stream)
+    else:
+        text = " ".join(str(o) for o in objects)
+        stream.write(_MARKUP.sub("", text) + "\n")
 
 
-@app.command()
+def check_engine(engine: str):
+    if engine not in BACKENDS:
+        raise typer.BadParameter(f"expected one of {', '.join(BACKENDS)}", param_hint="--engine")
+
+
+def parse_techniques(techniques: str) -> tuple[str, ...]:
+    names = tuple(name.strip() for name in techniques.split(",") if name.strip())
+    unknown = [name for name in names if name not in TECHNIQUES]
+    if unknown:
+        raise typer.BadParameter(
+            f"unknown {', '.join(unknown)}, expected some of {', '.join(TECHNIQUES)}", param_hint="--techniques"
+        )
+    return names
+
+
+def print_event(event: Event):
+    """
+    Prints the progress of a solve: every propagation pass with the resulting board,
+    and every guess, backtrack and contradiction.
+    """
+    if event.kind == EventKind.ITERATION:
+        print(f"\n[green]Iteration {event.iteration}[/green]:\n")
+        event.puzzle.print()
+    elif event.kind == EventKind.GUESS:
+        (value,) = event.digits
+        print(f"\nTry to assign value {value} to cell {event.position}")
+    elif event.kind == EventKind.BACKTRACK:
+        (value,) = event.digits
+        print(f"\nValue {value} is not valid for cell {event.position}, try next value")
+    elif event.kind == EventKind.CONTRADICTION:
+        print("\n[yellow]Contradiction found[/yellow]")
+
+
+@command("solve")
 def main(
     puzzle_file: Annotated[
         str,
@@ -16,69 +96,610 @@ def main(
             help="The path to the file containing the Sudoku puzzle.",
         ),
     ],
+    engine: Annotated[
+        str,
+        typer.Option(help=f"The solver backend, one of: {', '.join(BACKENDS)}."),
+    ] = "propagation",
+    verbose: Annotated[
+        bool,
+        typer.Option("--verbose", "-v", help="Show every propagation pass, guess and backtrack."),
+    ] = False,
+    techniques: Annotated[
+        str,
+        typer.Option(
+            help=f"The deduction techniques to apply, comma-separated, some of: {', '.join(TECHNIQUES)}.",
+        ),
+    ] = ",".join(DEFAULT_TECHNIQUES),
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs", "-j", help="The number of worker processes to split a long search over, 0 for one per CPU."
+        ),
+    ] = 1,
+    timeout: Annotated[
+        float | None,
+        typer.Option(help="Give up after this many seconds."),
+    ] = None,
+    portfolio: Annotated[
+        bool,
+        typer.Option(
+            "--portfolio", help="Race several strategies in worker processes; --engine and --techniques are ignored."
+        ),
+    ] = False,
 ):
     """
     Solve a Sudoku puzzle. The definition of the puzzle in in the given text file.
 
-        The puzzle file should contain 9 lines, each line with 9 characters.
-        Each character is either a digit from 1 to 9 or a dot (.) to represent an empty cell.
+        The puzzle file has one line per row: 9 lines of 9 characters for a 9x9 puzzle,
+        or 4, 16 or 25 lines of as many characters for the other sizes. Each character
+        is either a digit (1 to 9, then A for 10 up to P for 25) or a dot (.) to
+        represent an empty cell; rows can also be written as space-separated numbers.
     """
+    check_engine(engine)
+    applied = parse_techniques(techniques)
+    if jobs != 1 and (engine != "propagation" or verbose):
+        raise typer.BadParameter(
+            "only the propagation engine, without --verbose, can search in parallel", param_hint="--jobs"
+        )
+
+    if portfolio and (jobs != 1 or verbose):
+        raise typer.BadParameter("cannot be combined with --jobs or --verbose", param_hint="--portfolio")
+
     puzzle = read_puzzle(puzzle_file)
     print("[green]Input Puzzle:[/green]\n")
     puzzle.print()
 
-    solved, puzzle, iteration = try_solve_puzzle(puzzle)
+    winner = None
+    if portfolio:
+        from sudoku.portfolio import solve_portfolio
 
-    while solved == SolverResult.UNSOLVED:
-        print(
-            "\nPuzzle is not solved by just removing cyclic cells, need to do trial-and-error"
+        result, puzzle, winner = solve_portfolio(puzzle, timeout=timeout)
+    else:
+        result, puzzle = solve(
+            puzzle,
+            backend=engine,
+            observer=print_event if verbose else None,
+            techniques=applied,
+            workers=jobs or None,
+            timeout=timeout,
         )
-        # puzzle is not solved yet, pick one cell and assign a possible value and try to solve again
-        unsolved_cells = puzzle.get_unsolved_cells()
-        if unsolved_cells:
-            unsolved_cells.sort(key=lambda tile: len(tile.cell.possible_values))
-
-            try_cell = unsolved_cells[0]
-            original_puzzle = puzzle.copy()
-            for possible_value in iter(try_cell.cell.possible_values):
-                puzzle = original_puzzle.copy()
-                print(
-                    f"Try to assign value {possible_value} to cell ({try_cell.position})"
-                )
-                try_cell.cell.set_value(possible_value, {possible_value})
-                row, col = try_cell.position
-                puzzle[row, col] = try_cell.cell
-
-                solved, puzzle, iteration = try_solve_puzzle(puzzle, iteration + 1)
-                if solved == SolverResult.SOLVED or solved == SolverResult.UNSOLVED:
-                    break
-                else:
-                    print(
-                        f"\nValue {possible_value} is not valid for cell ({try_cell.position}), try next value"
-                    )
-
-            # consumed all of the possible values
-            if solved == SolverResult.SOLVED:
-                break
-            if solved == SolverResult.FAILURE:
-                print(
-                    f"\nFailed to solve the puzzle after trying all possible values for cell ({try_cell.position})"
-                )
-                break
-            if solved == SolverResult.UNSOLVED:
-                print(f"\nPuzzle is not solved yet, try to fill in value of another cell")
-                continue
 
-        
+    if result == SolverResult.TIMEOUT:
+        print(f"\n[red]No solution found within {timeout:g} seconds.[/red]")
+        sys.exit(1)
+    if result != SolverResult.SOLVED:
+        print("\n[red]The puzzle has no solution.[/red]")
+        # Not typer.Exit: this also runs without typer, see `run`.
+        sys.exit(1)
 
     # print the result
     print()
     print("[green]Solved Puzzle:[/green]\n")
     puzzle.print()
-    # puzzle.print_unsolved_values()
-    # puzzle.update_single_possible_values()
-    # puzzle.print_unsolved_values()
+    if winner is not None:
+        print(f"\nSolved first by the {winner} strategy.")
+
+
+@command()
+def check(
+    puzzle_files: Annotated[
+        list[str],
+        typer.Argument(
+            metavar="puzzle_file...",
+            help="The paths to files containing a Sudoku puzzle each, as for the solve command.",
+        ),
+    ],
+    engine: Annotated[
+        str,
+        typer.Option(help=f"The solver backend, one of: {', '.join(BACKENDS)}."),
+    ] = "propagation",
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs", "-j", help="The number of worker processes to split a long search over, 0 for one per CPU."
+        ),
+    ] = 1,
+    timeout: Annotated[
+        float | None,
+        typer.Option(help="Give up on a puzzle after this many seconds."),
+    ] = None,
+    max_nodes: Annotated[
+        int | None,
+        typer.Option(help="Give up on a puzzle after this many guesses."),
+    ] = None,
+):
+    """
+    Check that Sudoku puzzles have exactly one solution.
+
+        Reports for every puzzle whether it has no solution, a unique solution or
+        several solutions, or whether it timed out. Exits with an error if any
+        puzzle is not shown to be unique.
+    """
+    check_engine(engine)
+    if jobs != 1 and engine != "propagation":
+        raise typer.BadParameter("only the propagation engine can search in parallel", param_hint="--jobs")
+
+    failed = 0
+    for puzzle_file in puzzle_files:
+        try:
+            count = count_solutions(
+                read_puzzle(puzzle_file),
+                limit=2,
+                backend=engine,
+                workers=jobs or None,
+                timeout=timeout,
+                max_nodes=max_nodes,
+            )
+        except TimeoutError:
+            failed += 1
+            print(f"{puzzle_file}: [yellow]timed out[/yellow]")
+            continue
+        if count == 1:
+            print(f"{puzzle_file}: [green]unique solution[/green]")
+        else:
+            failed += 1
+            print(f"{puzzle_file}: [red]{'no solution' if count == 0 else 'multiple solutions'}[/red]")
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@command()
+def batch(
+    input_file: Annotated[
+        str,
+        typer.Argument(
+            help="A file with many puzzles, one line each (81 characters for 9x9), a binary corpus, or - for stdin.",
+        ),
+    ] = "-",
+    output: Annotated[
+        str,
+        typer.Option("--output", "-o", help="Where to write the solutions, or - for stdout."),
+    ] = "-",
+    start: Annotated[
+        int,
+        typer.Option(help="Skip this many puzzles first, e.g. to resume an interrupted run."),
+    ] = 0,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume",
+            help="Record results in the binary corpus given as input, and start at the first puzzle without one.",
+        ),
+    ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", help="The number of worker processes, 0 for one per CPU."),
+    ] = 0,
+    chunk_size: Annotated[
+        int,
+        typer.Option(help="The number of puzzles sent to a worker at a time."),
+    ] = 256,
+    engine: Annotated[
+        str,
+        typer.Option(help=f"The solver backend, one of: {', '.join(BACKENDS)}."),
+    ] = "propagation",
+    vectorized: Annotated[
+        bool,
+        typer.Option(help="Propagate each chunk with NumPy first; needs the 'fast' extra."),
+    ] = False,
+    stats: Annotated[
+        bool,
+        typer.Option("--stats", help="Print solve statistics for the whole run to stderr, as JSON."),
+    ] = False,
+    cache: Annotated[
+        str | None,
+        typer.Option(help="A solution cache file, read first and saved at the end; created if missing."),
+    ] = None,
+    cache_size: Annotated[
+        int,
+        typer.Option(help="The number of solutions kept in the --cache file."),
+    ] = 100_000,
+    timeout: Annotated[
+        float | None,
+        typer.Option(help="Give up on a puzzle after this many seconds."),
+    ] = None,
+    max_nodes: Annotated[
+        int | None,
+        typer.Option(help="Give up on a puzzle after this many guesses."),
+    ] = None,
+    output_format: Annotated[
+        str,
+        typer.Option(
+            "--format",
+            help="The output format: lines (solution lines), jsonl (a JSON object per puzzle) "
+            "or binary (a corpus with results).",
+        ),
+    ] = "lines",
+    compression: Annotated[
+        str | None,
+        typer.Option(help="Compress the output: gzip, bz2, lzma or zstd; implied by a .gz, .bz2, .xz or .zst output."),
+    ] = None,
+    unordered: Annotated[
+        bool,
+        typer.Option("--unordered", help="Write results as they come rather than in input order; not for lines."),
+    ] = False,
+):
+    """
+    Solve many puzzles, streaming them from a file or stdin.
+
+        Every puzzle is a line of 81 characters (digits, with ., 0 or x for empty cells),
+        or of 16, 256 or 625 for the other grid sizes; the first field of
+        comma-separated lines is used, as in the Kaggle datasets.
+        One solution line is written per puzzle, in input order. Puzzles without a
+        solution, or not solved within --timeout or --max-nodes, are written back
+        unchanged. With --format jsonl, every puzzle gets a JSON object with its
+        index and result instead, and --stats are added at the end. --format binary
+        only holds 9x9 puzzles, and stops at the first puzzle of another size.
+
+        A binary corpus (see the convert command) is read by random access, so --start
+        costs nothing. With --resume, results are recorded in the corpus itself as
+        they come, and a run that was interrupted continues where it stopped.
+    """
+    import json
+    from contextlib import ExitStack
+    from itertools import islice
+    from sudoku.puzzle_file import open_source, iter_puzzle_lines
+    from sudoku.corpus_file import Corpus, is_corpus, check_lengths
+    from sudoku.batch import solve_indexed
+    from sudoku.sinks import open_sink, FORMATS
+    from sudoku.stats import SolveStats
+    from sudoku.cache import SolutionCache
+
+    check_engine(engine)
+    if output_format not in FORMATS:
+        raise typer.BadParameter(f"expected one of: {', '.join(FORMATS)}", param_hint="--format")
+    if unordered and output_format == "lines":
+        raise typer.BadParameter(
+            "solution lines carry no index, use --format jsonl or binary", param_hint="--unordered"
+        )
+    binary = is_corpus(input_file)
+    if resume and not binary:
+        raise typer.BadParameter("--resume needs a binary corpus as input", param_hint="--resume")
+
+    total = failed = timed_out = 0
+    solve_stats = SolveStats() if stats else None
+    solution_cache = None if cache is None else SolutionCache(cache_size, cache)
+    with ExitStack() as stack:
+        if binary:
+            corpus = stack.enter_context(Corpus(input_file, writable=resume))
+            if resume:
+                if not corpus.has_results:
+                    raise typer.BadParameter(
+                        "the corpus has no results section, convert it with --results", param_hint="--resume"
+                    )
+                start = corpus.first_unsolved(start)
+                stack.callback(corpus.flush)
+            lines = corpus.iter_lines(start)
+        else:
+            lines = islice(iter_puzzle_lines(stack.enter_context(open_source(input_file))), start, None)
+            if output_format == "binary":
+                # Rejected as they are read, before anything is solved.
+                lines = check_lengths(lines)
+        if solution_cache is not None:
+            stack.callback(solution_cache.save)
+        try:
+            sink = stack.enter_context(open_sink(output, output_format, compression))
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--output") from None
+
+        results = solve_indexed(
+            lines,
+            jobs=jobs or None,
+            chunk_size=chunk_size,
+            backend=engine,
+            vectorized=vectorized,
+            stats=solve_stats,
+            cache=solution_cache,
+            timeout=timeout,
+            max_nodes=max_nodes,
+            ordered=not unordered,
+        )
+        try:
+            for index, result, line in results:
+                index += start
+                sink.write(index, result, line)
+                if resume:
+                    corpus.set_result(index, result, line if result == SolverResult.SOLVED else None)
+                total += 1
+                if result != SolverResult.SOLVED:
+                    failed += 1
+                    timed_out += result == SolverResult.TIMEOUT
+        except ValueError as e:
+            print(f"[red]Error[/red] {e}", file=sys.stderr)
+            raise typer.Exit(code=1)
+        if solve_stats is not None:
+            sink.write_stats(solve_stats)
+
+    summary = f"Solved {total - failed} of {total} puzzles"
+    print(f"{summary}, {timed_out} timed out." if timed_out else f"{summary}.", file=sys.stderr)
+    if solve_stats is not None:
+        sys.stderr.write(json.dumps(solve_stats.to_dict(), indent=2) + "\n")
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@command()
+def convert(
+    input_file: Annotated[
+        str,
+        typer.Argument(help="A text puzzle file (or - for stdin), or a binary corpus."),
+    ],
+    output: Annotated[
+        str,
+        typer.Argument(help="The binary corpus to write, or the text file (or - for stdout)."),
+    ],
+    encoding: Annotated[
+        str,
+        typer.Option(help="The binary encoding: nibbles (41 bytes a puzzle) or bytes (81)."),
+    ] = "nibbles",
+    results: Annotated[
+        bool,
+        typer.Option("--results", help="Add an empty results section, for batch --resume."),
+    ] = False,
+):
+    """
+    Convert puzzles between text files and the binary corpus format.
+
+        A binary corpus as input is written out as 81-character lines; anything else
+        is read as a text puzzle file and written as a binary corpus.
+    """
+    from sudoku.corpus_file import ENCODINGS, is_corpus, text_to_corpus, corpus_to_text
+
+    if encoding not in ENCODINGS:
+        raise typer.BadParameter(f"expected one of {', '.join(ENCODINGS)}", param_hint="--encoding")
+
+    if is_corpus(input_file):
+        if output == "-":
+            count = corpus_to_text(input_file, sys.stdout)
+        else:
+            with open(output, "w") as out:
+                count = corpus_to_text(input_file, out)
+    else:
+        count = text_to_corpus(input_file, output, encoding, results)
+    print(f"Converted {count} puzzles.", file=sys.stderr)
+
+
+@command()
+def generate(
+    count: Annotated[
+        int,
+        typer.Option("--count", "-n", help="The number of puzzles to generate."),
+    ] = 1,
+    clues: Annotated[
+        int | None,
+        typer.Option(help=f"The number of clues of every puzzle, at least {MIN_CLUES}."),
+    ] = None,
+    difficulty: Annotated[
+        str | None,
+        typer.Option(help=f"The difficulty of every puzzle, one of: {', '.join(DIFFICULTIES)}."),
+    ] = None,
+    seed: Annotated[
+        int | None,
+        typer.Option(help="The seed, to generate the same puzzles again."),
+    ] = None,
+    output: Annotated[
+        str,
+        typer.Option("--output", "-o", help="Where to write the puzzles, or - for stdout."),
+    ] = "-",
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", help="The number of worker processes, 0 for one per CPU."),
+    ] = 0,
+    max_attempts: Annotated[
+        int,
+        typer.Option(help="The number of solution grids tried for every puzzle before giving up."),
+    ] = MAX_ATTEMPTS,
+):
+    """
+    Generate puzzles with a unique solution, one 81-character line each.
+
+        Without --clues, as many clues as possible are removed. The difficulty is
+        rated by the techniques needed: easy puzzles fall to naked and hidden
+        singles, medium ones need subsets as well, and hard ones need guessing.
+        Few grids yield fewer than 22 clues, and some combinations of clues and
+        difficulty none; generation stops with an error after --max-attempts.
+    """
+    if clues is not None and not MIN_CLUES <= clues <= 81:
+        raise typer.BadParameter(f"expected a number between {MIN_CLUES} and 81", param_hint="--clues")
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise typer.BadParameter(f"expected one of {', '.join(DIFFICULTIES)}", param_hint="--difficulty")
+    if max_attempts < 1:
+        raise typer.BadParameter("expected a positive number", param_hint="--max-attempts")
+
+    from sudoku.generator import generate_stream
+
+    out = sys.stdout if output == "-" else open(output, "w")
+    try:
+        puzzles = generate_stream(count, clues, difficulty, seed=seed, jobs=jobs or None, max_attempts=max_attempts)
+        for line in puzzles:
+            out.write(line + "\n")
+            out.flush()
+    except ValueError as e:
+        print(f"[red]Error[/red] {e}", file=sys.stderr)
+        raise typer.Exit(code=1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+@command()
+def serve(
+    host: Annotated[
+        str,
+        typer.Option(help="The address to listen on."),
+    ] = "127.0.0.1",
+    port: Annotated[
+        int,
+        typer.Option(help="The TCP port to listen on."),
+    ] = 8765,
+    socket: Annotated[
+        str | None,
+        typer.Option(help="Listen on this Unix socket instead of TCP."),
+    ] = None,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", help="The number of worker processes, 0 for one per CPU."),
+    ] = 0,
+    batch_size: Annotated[
+        int,
+        typer.Option(help="The largest number of puzzles handed to a worker at a time."),
+    ] = 64,
+    max_pending: Annotated[
+        int,
+        typer.Option(help="The number of queued requests past which clients are not read from."),
+    ] = 1024,
+    timeout: Annotated[
+        float | None,
+        typer.Option(help="The default deadline of a request, in seconds."),
+    ] = None,
+    engine: Annotated[
+        str,
+        typer.Option(help=f"The solver backend, one of: {', '.join(BACKENDS)}."),
+    ] = "propagation",
+):
+    """
+    Serve solve requests on a local socket, from a pool of warm worker processes.
+
+        Send one request per line: a puzzle on one line (81 characters, or 16, 256
+        or 625 for the other sizes), answered with its solution line, or a JSON object {"puzzle": ..., "id": ..., "timeout": ...},
+        answered with a JSON object. Replies come back in request order.
+    """
+    import asyncio
+    from sudoku.server import serve as run_server
+
+    check_engine(engine)
+
+    def on_start(server):
+        where = socket or ", ".join(f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+        print(f"Listening on {where}", file=sys.stderr)
+
+    try:
+        asyncio.run(
+            run_server(
+                host,
+                port,
+                socket,
+                on_start,
+                jobs=jobs or None,
+                batch_size=batch_size,
+                max_pending=max_pending,
+                timeout=timeout,
+                backend=engine,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+@command()
+def bench(
+    tier: Annotated[
+        list[str],
+        typer.Option(help="The corpora to run (repeatable); defaults to all the 9x9 ones; 16x16 and 25x25 are run when named."),
+    ] = [],
+    count: Annotated[
+        int,
+        typer.Option(help="The number of puzzles in every generated tier."),
+    ] = 100,
+    seed: Annotated[int, typer.Option(help="The seed for the generated tiers.")] = 0,
+    engine: Annotated[
+        str,
+        typer.Option(help=f"The solver backend, one of: {', '.join(BACKENDS)}."),
+    ] = "propagation",
+    output: Annotated[
+        str | None,
+        typer.Option("--output", "-o", help="Save the results to this JSON file."),
+    ] = None,
+    baseline: Annotated[
+        str | None,
+        typer.Option(help="Compare against the results saved in this JSON file."),
+    ] = None,
+    tolerance: Annotated[
+        float,
+        typer.Option(help="The relative slowdown allowed before --baseline reports a regression."),
+    ] = 0.1,
+    startup: Annotated[
+        bool,
+        typer.Option("--startup", help="Time the start of the command line instead, against its budget."),
+    ] = False,
+):
+    """
+    Benchmark the solver on tiered puzzle corpora.
+
+        Reports puzzles per second, p50/p99 latency, peak memory, and the number of
+        propagation steps and guesses for every tier. Exits with an error if
+        --baseline is given and any tier regressed. With --startup, exits with an
+        error if starting the command line takes longer than its budget.
+    """
+    from rich.table import Table
+    from benchmarks.corpus import TIERS, LARGE_TIERS
+    from benchmarks import runner
+
+    if startup:
+        from benchmarks import startup as startup_bench
+
+        timings = startup_bench.run()
+        table = Table("command", "ms", "budget ms")
+        for name, ms in timings.items():
+            table.add_row(name, f"{ms:.1f}", f"{startup_bench.BUDGETS_MS[name]:.1f}")
+        print(table)
+        problems = startup_bench.over_budget(timings)
+        for problem in problems:
+            print(f"[red]Over budget[/red] {problem}")
+        if problems:
+            raise typer.Exit(code=1)
+        return
+
+    check_engine(engine)
+    for name in tier:
+        if name not in TIERS and name not in LARGE_TIERS:
+            raise typer.BadParameter(f"expected one of {', '.join(TIERS | LARGE_TIERS)}", param_hint="--tier")
+
+    report = runner.run(tier or list(TIERS), count=count, seed=seed, backend=engine)
+
+    table = Table("tier", "puzzles", "solved", "puzzles/s", "p50 ms", "p99 ms", "peak KiB", "steps", "guesses")
+    for name, row in report["tiers"].items():
+        table.add_row(
+            name,
+            str(row["puzzles"]),
+            str(row["solved"]),
+            f"{row['puzzles_per_second']:.1f}",
+            f"{row['p50_ms']:.3f}",
+            f"{row['p99_ms']:.3f}",
+            f"{row['peak_memory_kib']:.1f}",
+            str(row["steps"]),
+            str(row["guesses"]),
+        )
+    print(table)
+
+    if output:
+        runner.save(report, output)
+    if baseline:
+        regressions = runner.compare(runner.load(baseline), report, tolerance)
+        for regression in regressions:
+            print(f"[red]Regression[/red] {regression}")
+        if regressions:
+            raise typer.Exit(code=1)
+
+
+def command_names() -> set[str]:
+    return {name or func.__name__.replace("_", "-") for name, func in _COMMANDS}
+
+
+def run(args: list[str]):
+    """
+    Runs the command line. A puzzle file without a command is solved, as the
+    `solve` command would. `solve FILE` or `FILE` alone, the way scripts call it
+    once per puzzle, is run directly, without importing typer; anything else goes
+    through the typer app.
+    """
+    if args and not args[0].startswith("-") and args[0] not in command_names():
+        args = ["solve", *args]
+    if len(args) == 2 and args[0] == "solve" and not args[1].startswith("-"):
+        main(args[1])
+    else:
+        build_app()(args)
 
 
 if __name__ == "__main__":
-    app()
+    run(sys.argv[1:])
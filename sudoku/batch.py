@@ -0,0 +1,302 @@
+"""
+Solving large streams of puzzles across a pool of worker processes.
+"""
+
+import os
+from collections import deque
+from itertools import islice
+from time import perf_counter
+from typing import Iterable, Iterator
+from .puzzle import Puzzle
+from .puzzle_file import parse_puzzle, format_puzzle
+from .solver import solve, solve_many, SolverResult
+from .stats import SolveStats
+from .cache import SolutionCache, is_cacheable
+from .canonical import canonical_form
+
+
+def solve_lines(
+    lines: list[str],
+    backend: str = "propagation",
+    vectorized: bool = False,
+    stats: SolveStats | None = None,
+    cache: SolutionCache | None = None,
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+    chunk_timeout: float | None = None,
+) -> list[tuple[SolverResult, str]]:
+    """
+    Solves a chunk of puzzles written as 81-character lines.
+
+    Args:
+        lines: The puzzles.
+        backend: The solver backend, see `sudoku.solver.BACKENDS`.
+        vectorized: Run a NumPy propagation pass over the whole chunk first,
+            see `sudoku.solver.solve_many`.
+        stats: Filled in with the counts and timings of the solves, if given. A
+            vectorized chunk is only timed as a whole, as the "vectorized" phase.
+        cache: Looked up before solving every puzzle, and given the new solutions.
+        timeout: The time allowed for every puzzle, in seconds.
+        max_nodes: The largest number of guesses allowed for every puzzle.
+        chunk_timeout: The time allowed for the whole chunk, in seconds: every
+            puzzle gets what is left of it, and once it has passed the remaining
+            puzzles are not started and come back as TIMEOUT.
+
+    Returns:
+        For every puzzle, its SolverResult and the solved grid as an 81-character
+        line, or the puzzle as given if it has no solution or was not solved
+        within the limits (TIMEOUT).
+    """
+    puzzles = [parse_puzzle(line) for line in lines]
+    end = None if chunk_timeout is None else perf_counter() + chunk_timeout
+    if vectorized:
+        if end is not None:
+            timeout = chunk_timeout if timeout is None else min(timeout, chunk_timeout)
+        solved = _solve_vectorized(puzzles, backend, stats, cache, timeout, max_nodes)
+    else:
+        solved = []
+        for puzzle in puzzles:
+            allowed = timeout
+            if end is not None:
+                left = end - perf_counter()
+                if left <= 0:
+                    if stats is not None:
+                        stats.puzzles += 1
+                        stats.timeouts += 1
+                    solved.append((SolverResult.TIMEOUT, puzzle))
+                    continue
+                allowed = left if timeout is None else min(timeout, left)
+            solved.append(
+                solve(puzzle, backend=backend, stats=stats, cache=cache, timeout=allowed, max_nodes=max_nodes)
+            )
+    return [
+        (result, format_puzzle(puzzle) if result == SolverResult.SOLVED else line)
+        for line, (result, puzzle) in zip(lines, solved)
+    ]
+
+
+def _solve_vectorized(
+    puzzles: list[Puzzle],
+    backend: str,
+    stats: SolveStats | None,
+    cache: SolutionCache | None,
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+) -> list[tuple[SolverResult, Puzzle]]:
+    solved = [None] * len(puzzles)
+    forms = {}
+    if cache is not None:
+        for j, puzzle in enumerate(puzzles):
+            if not is_cacheable(puzzle):
+                continue
+            key, transform = forms[j] = canonical_form(puzzle)
+            solution = cache.lookup(key)
+            if solution is not None:
+                solved[j] = SolverResult.SOLVED, transform.inverse().apply_puzzle(parse_puzzle(solution))
+                if stats is not None:
+                    stats.cache_hits += 1
+    pending = [j for j, result in enumerate(solved) if result is None]
+
+    start = perf_counter()
+    for j, (result, puzzle) in zip(pending, solve_many([puzzles[j] for j in pending], backend, timeout, max_nodes)):
+        solved[j] = result, puzzle
+        if j in forms and result == SolverResult.SOLVED:
+            key, transform = forms[j]
+            cache.store(key, format_puzzle(transform.apply_puzzle(puzzle)))
+    if stats is not None:
+        stats.puzzles += len(pending)
+        stats.timeouts += sum(solved[j][0] == SolverResult.TIMEOUT for j in pending)
+        stats.add_time("vectorized", perf_counter() - start)
+    return solved
+
+
+class _WorkerCache(SolutionCache):
+    """
+    A worker process's copy of the caller's cache, which remembers the solutions
+    added to it so that they can be sent back to the caller.
+    """
+
+    def __init__(self, maxsize: int, entries: list[tuple[str, str]]):
+        super().__init__(maxsize)
+        self.added = []
+        self.update(entries)
+        self.added = []
+
+    def store(self, key: str, solution: str):
+        super().store(key, solution)
+        self.added.append((key, solution))
+
+
+_worker_cache: _WorkerCache | None = None
+
+
+def _init_worker(maxsize: int, entries: list[tuple[str, str]]):
+    global _worker_cache
+    _worker_cache = _WorkerCache(maxsize, entries)
+
+
+def _solve_chunk(
+    lines: list[str],
+    backend: str,
+    vectorized: bool,
+    with_stats: bool,
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+    chunk_timeout: float | None = None,
+) -> tuple[list[tuple[SolverResult, str]], SolveStats | None, list[tuple[str, str]]]:
+    """
+    Solves a chunk in a worker process, returning its stats, if asked for, and the
+    solutions added to the worker's cache.
+    """
+    stats = SolveStats() if with_stats else None
+    results = solve_lines(lines, backend, vectorized, stats, _worker_cache, timeout, max_nodes, chunk_timeout)
+    added = []
+    if _worker_cache is not None:
+        added, _worker_cache.added = _worker_cache.added, []
+    return results, stats, added
+
+
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[list[str]]:
+    lines = iter(lines)
+    while chunk := list(islice(lines, chunk_size)):
+        yield chunk
+
+
+def solve_stream(
+    lines: Iterable[str],
+    jobs: int | None = None,
+    chunk_size: int = 256,
+    backend: str = "propagation",
+    vectorized: bool = False,
+    stats: SolveStats | None = None,
+    cache: SolutionCache | None = None,
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+) -> Iterator[tuple[SolverResult, str]]:
+    """
+    Solves a stream of puzzles, yielding the results in input order.
+
+    The puzzles are dispatched in chunks to a pool of `jobs` worker processes. At
+    most a few chunks per worker are in flight at any time, so memory stays bounded
+    however long the stream is, and results are yielded as soon as every earlier
+    chunk is done.
+
+    Args:
+        lines: The puzzles, as 81-character lines.
+        jobs: The number of worker processes; defaults to the number of CPUs.
+            With 1, puzzles are solved in the calling process.
+        chunk_size: The number of puzzles sent to a worker at a time.
+        backend: The solver backend, see `sudoku.solver.BACKENDS`.
+        vectorized: Run a NumPy propagation pass over every chunk first.
+        stats: If given, the stats of every chunk are merged into it as its
+            results are yielded.
+        cache: Looked up before solving every puzzle. Every worker starts with a
+            copy of it, and the solutions found by the workers are added to it as
+            their results are yielded.
+        timeout, max_nodes: The limits of every puzzle, see `solve_lines`.
+
+    Yields:
+        The SolverResult and resulting line of every puzzle, see `solve_lines`.
+    """
+    for _, results in _solve_chunks(
+        lines, jobs, chunk_size, backend, vectorized, stats, cache, timeout, max_nodes, ordered=True
+    ):
+        yield from results
+
+
+def solve_indexed(
+    lines: Iterable[str],
+    jobs: int | None = None,
+    chunk_size: int = 256,
+    backend: str = "propagation",
+    vectorized: bool = False,
+    stats: SolveStats | None = None,
+    cache: SolutionCache | None = None,
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+    ordered: bool = True,
+) -> Iterator[tuple[int, SolverResult, str]]:
+    """
+    Solves a stream of puzzles like `solve_stream`, yielding every result with
+    the index of its puzzle in `lines`.
+
+    Args:
+        ordered: Whether to yield the results in input order. Otherwise, the
+            results of every chunk are yielded as soon as it is done, so that a
+            slow chunk does not hold back the ones after it.
+        The others: See `solve_stream`.
+
+    Yields:
+        The index, SolverResult and resulting line of every puzzle.
+    """
+    for start, results in _solve_chunks(
+        lines, jobs, chunk_size, backend, vectorized, stats, cache, timeout, max_nodes, ordered
+    ):
+        for index, (result, line) in enumerate(results, start):
+            yield index, result, line
+
+
+def _solve_chunks(
+    lines: Iterable[str],
+    jobs: int | None,
+    chunk_size: int,
+    backend: str,
+    vectorized: bool,
+    stats: SolveStats | None,
+    cache: SolutionCache | None,
+    timeout: float | None,
+    max_nodes: int | None,
+    ordered: bool,
+) -> Iterator[tuple[int, list[tuple[SolverResult, str]]]]:
+    """
+    Solves the puzzles chunk by chunk over the worker pool, yielding the index of
+    the first puzzle of every chunk with its results, in input order if `ordered`,
+    otherwise in the order the chunks are done.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        start = 0
+        for chunk in _chunks(lines, chunk_size):
+            yield start, solve_lines(chunk, backend, vectorized, stats, cache, timeout, max_nodes)
+            start += len(chunk)
+        return
+
+    def collect(future) -> tuple[int, list[tuple[SolverResult, str]]]:
+        results, chunk_stats, added = future.result()
+        if stats is not None:
+            stats.merge(chunk_stats)
+        if cache is not None:
+            cache.update(added)
+        return starts.pop(future), results
+
+    def next_done() -> Iterator[tuple[int, list[tuple[SolverResult, str]]]]:
+        # The oldest chunk when ordered, otherwise every chunk done by now.
+        if ordered:
+            yield collect(pending.popleft())
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            yield collect(future)
+
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    if cache is None:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(cache.maxsize, list(cache.items()))
+        )
+    pending = deque()
+    starts = {}
+    start = 0
+    with executor:
+        for chunk in _chunks(lines, chunk_size):
+            while len(pending) >= 4 * jobs:
+                yield from next_done()
+            future = executor.submit(_solve_chunk, chunk, backend, vectorized, stats is not None, timeout, max_nodes)
+            starts[future] = start
+            start += len(chunk)
+            pending.append(future)
+        while pending:
+            yield from next_done()
@@ -0,0 +1,137 @@
+"""
+A bounded cache of solutions, shared by every puzzle of a symmetry class.
+
+Puzzles are looked up by their canonical form (see `sudoku.canonical`), and the
+solution of the canonical puzzle is stored, so a puzzle that is a relabelled,
+permuted or transposed copy of one solved before is answered by transforming the
+stored solution back instead of solving it again.
+"""
+
+import os
+from collections import OrderedDict
+from typing import Iterable, Iterator
+from .canonical import canonical_form
+from .cell import ALL_CANDIDATES
+from .puzzle import Puzzle
+from .puzzle_file import parse_puzzle, format_puzzle
+
+
+# The most clues a cached puzzle has. Denser puzzles are solved in less time than
+# their canonical form takes, which grows steeply as the grid fills up: about 1 ms
+# at 35 clues, against about 300 ms for a full grid.
+MAX_CLUES = 35
+
+
+def is_cacheable(puzzle: Puzzle) -> bool:
+    """
+    Whether a puzzle is described by its values alone, as a freshly read puzzle is:
+    every empty cell still has all its candidates. Only such puzzles, and only
+    9x9 ones with at most MAX_CLUES clues, go through the cache.
+    """
+    if puzzle.size != 9 or 81 - puzzle._values.count(0) > MAX_CLUES:
+        return False
+    masks = puzzle._masks
+    return all(value or masks[i] == ALL_CANDIDATES for i, value in enumerate(puzzle._values))
+
+
+class SolutionCache:
+    """
+    A least-recently-used mapping from canonical puzzles to their solutions, both as
+    81-character lines, optionally persisted to a file.
+
+    Args:
+        maxsize: The number of solutions kept; the least recently used ones are
+            dropped first.
+        path: A file to load the cache from, if it exists, and to `save()` it to.
+    """
+
+    def __init__(self, maxsize: int = 100_000, path: str | None = None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def items(self) -> Iterator[tuple[str, str]]:
+        """
+        Yields every (canonical puzzle, solution), least recently used first.
+        """
+        return iter(self._entries.items())
+
+    def lookup(self, key: str) -> str | None:
+        """
+        Returns the solution of the canonical puzzle `key`, if it is cached.
+        """
+        solution = self._entries.get(key)
+        if solution is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return solution
+
+    def store(self, key: str, solution: str):
+        """
+        Caches the solution of the canonical puzzle `key`.
+        """
+        self._entries[key] = solution
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def update(self, entries: Iterable[tuple[str, str]]):
+        for key, solution in entries:
+            self.store(key, solution)
+
+    def get(self, puzzle: Puzzle) -> Puzzle | None:
+        """
+        Returns the solution of `puzzle`, if a puzzle equivalent to it is cached.
+        """
+        if not is_cacheable(puzzle):
+            return None
+        key, transform = canonical_form(puzzle)
+        solution = self.lookup(key)
+        if solution is None:
+            return None
+        return transform.inverse().apply_puzzle(parse_puzzle(solution))
+
+    def put(self, puzzle: Puzzle, solution: Puzzle):
+        """
+        Caches the solution of `puzzle`, for it and every puzzle equivalent to it.
+        """
+        if is_cacheable(puzzle):
+            key, transform = canonical_form(puzzle)
+            self.store(key, format_puzzle(transform.apply_puzzle(solution)))
+
+    def load(self, path: str):
+        """
+        Adds the entries saved in a file by `save()`.
+        """
+        with open(path, "r") as f:
+            for i, line in enumerate(f):
+                key, _, solution = line.strip().partition(",")
+                if len(key) != 81 or len(solution) != 81:
+                    raise ValueError(f"format error in line {i}, content is [{line.strip()}]")
+                self.store(key, solution)
+
+    def save(self, path: str | None = None):
+        """
+        Writes the cache to `path`, or to the path it was created with, one
+        "puzzle,solution" line per entry. The file is replaced atomically.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("no path to save the cache to")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            for key, solution in self._entries.items():
+                f.write(f"{key},{solution}\n")
+        os.replace(tmp, path)
@@ -0,0 +1,264 @@
+"""
+Canonical forms of puzzles under the Sudoku symmetries.
+
+Relabelling the digits, permuting the rows within a band, the bands, the columns
+within a stack and the stacks, and transposing all turn a puzzle into an
+equivalent one, with a correspondingly transformed solution. `canonical_form`
+maps every member of such a symmetry class to the same key, the lexicographically
+smallest 81-character line of the class ("minlex"), together with the Transform
+that takes the puzzle there.
+"""
+
+import random
+from itertools import permutations, product
+from typing import NamedTuple, Sequence
+from .puzzle import Puzzle
+
+_TRANSPOSED = tuple(c * 9 + r for r in range(9) for c in range(9))
+
+
+def _inverse(permutation: Sequence[int]) -> tuple[int, ...]:
+    result = [0] * len(permutation)
+    for i, p in enumerate(permutation):
+        result[p] = i
+    return tuple(result)
+
+
+class Transform(NamedTuple):
+    """
+    A symmetry of the Sudoku grid.
+
+    Attributes:
+        transpose: Whether the grid is transposed first.
+        rows: Row r of the result is row rows[r] of the (transposed) grid.
+        cols: Column c of the result is column cols[c] of the (transposed) grid.
+        digits: Digit d becomes digits[d]; digits[0] is 0, for empty cells.
+    """
+
+    transpose: bool
+    rows: tuple[int, ...]
+    cols: tuple[int, ...]
+    digits: tuple[int, ...]
+
+    def apply(self, values: Sequence[int]) -> bytearray:
+        """
+        Transforms 81 cell values, row by row with 0 for empty cells.
+        """
+        if self.transpose:
+            values = [values[i] for i in _TRANSPOSED]
+        digits = self.digits
+        return bytearray(digits[values[r * 9 + c]] for r in self.rows for c in self.cols)
+
+    def apply_puzzle(self, puzzle: Puzzle) -> Puzzle:
+        """
+        Transforms the values of a puzzle; the candidates are reset to those of
+        a freshly read puzzle.
+        """
+        result = Puzzle()
+        for i, value in enumerate(self.apply(puzzle._values)):
+            if value:
+                result._values[i] = value
+                result._masks[i] = 1 << (value - 1)
+        return result
+
+    def inverse(self) -> "Transform":
+        rows = _inverse(self.rows)
+        cols = _inverse(self.cols)
+        if self.transpose:
+            rows, cols = cols, rows
+        return Transform(self.transpose, rows, cols, _inverse(self.digits))
+
+
+IDENTITY = Transform(False, tuple(range(9)), tuple(range(9)), tuple(range(10)))
+
+
+def random_transform(rng: random.Random) -> Transform:
+    """
+    Returns a uniformly random symmetry of the Sudoku grid.
+    """
+    def order() -> tuple[int, ...]:
+        return tuple(band * 3 + r for band in rng.sample(range(3), 3) for r in rng.sample(range(3), 3))
+
+    return Transform(rng.random() < 0.5, order(), order(), (0, *rng.sample(range(1, 10), 9)))
+
+
+def _stack_orders(row: Sequence[int], blank: list[bool]) -> list[tuple[tuple[int, ...], ...]]:
+    """
+    The column partitions that can start the smallest first row, if it is `row`: the
+    orders of the stacks with the fewest clues of `row` first, which all give the same
+    row. Stacks that are `blank` in the whole grid are interchangeable, so they keep
+    their relative order.
+    """
+    counts = [sum(1 for d in row[s * 3 : s * 3 + 3] if d) for s in range(3)]
+    orders = []
+    for order in permutations(range(3)):
+        if any(counts[a] > counts[b] for a, b in zip(order, order[1:])):
+            continue
+        empty = [s for s in order if blank[s]]
+        if empty == sorted(empty):
+            orders.append(tuple(tuple(range(s * 3, s * 3 + 3)) for s in order))
+    return orders
+
+
+def _min_row(row: Sequence[int], partition, labels: tuple[int, ...], next_label: int):
+    """
+    Orders the columns of one row to make it smallest, within the freedom left by
+    `partition`: a tuple of groups of columns, in output order, whose columns can
+    still be permuted among themselves.
+
+    Returns:
+        The smallest relabelled row, and for every group the columns placed first
+        (the empty ones as a group, then the labelled ones) and the columns whose
+        digits are not labelled yet, which come last; see `_refine`.
+    """
+    out = []
+    groups = []
+    label = next_label
+    for group in partition:
+        if len(group) == 1:
+            d = row[group[0]]
+            if not d or labels[d]:
+                out.append(labels[d])
+                groups.append(((group,), ()))
+            else:
+                out.append(label)
+                label += 1
+                groups.append(((), group))
+            continue
+        empty = []
+        labelled = []
+        unlabelled = []
+        for c in group:
+            d = row[c]
+            if not d:
+                empty.append(c)
+            elif labels[d]:
+                labelled.append((labels[d], c))
+            else:
+                unlabelled.append(c)
+        if empty:
+            out.extend([0] * len(empty))
+        if labelled:
+            labelled.sort()
+            out.extend(d for d, _ in labelled)
+        if unlabelled:
+            out.extend(range(label, label + len(unlabelled)))
+            label += len(unlabelled)
+        head = ((tuple(empty),) if empty else ()) + tuple((c,) for _, c in labelled)
+        groups.append((head, unlabelled))
+    return tuple(out), groups
+
+
+def _refine(row: Sequence[int], groups, labels: tuple[int, ...], next_label: int):
+    """
+    Yields every (partition, labels, next_label) giving the row found by `_min_row`.
+    Digits not labelled yet get the next labels in column order, so the order of
+    such columns within a group does not change the row, but it does change the
+    labels; every such order is yielded.
+    """
+    choices = [permutations(unlabelled) if len(unlabelled) > 1 else (unlabelled,) for _, unlabelled in groups]
+    for picked in product(*choices):
+        partition = []
+        new_labels = list(labels)
+        label = next_label
+        for (head, _), order in zip(groups, picked):
+            partition.extend(head)
+            for c in order:
+                partition.append((c,))
+                new_labels[row[c]] = label
+                label += 1
+        yield tuple(partition), tuple(new_labels), label
+
+
+def canonical_form(puzzle: Puzzle) -> tuple[str, Transform]:
+    """
+    Computes the canonical form of a puzzle: the smallest 81-character line, with
+    "." below every digit, among all the puzzles equivalent to it.
+
+    The grid is built row by row, keeping every partial transformation that gives
+    the smallest rows so far. Columns that are still interchangeable are kept
+    together instead of being enumerated, and empty rows, bands and stacks are only
+    tried once, so sparse and symmetric puzzles stay cheap.
+
+    Args:
+        puzzle: The puzzle; only its values are considered.
+
+    Returns:
+        The canonical line, and a Transform that maps the puzzle to it.
+    """
+    values = puzzle._values
+    grids = (values, bytes(values[i] for i in _TRANSPOSED))
+    rows = [[grid[r * 9 : r * 9 + 9] for r in range(9)] for grid in grids]
+    empty = [[not any(row) for row in grid_rows] for grid_rows in rows]
+    blank = [[not any(row[s * 3 : s * 3 + 3] for row in grid_rows) for s in range(3)] for grid_rows in rows]
+
+    # A state is (grid, rows chosen so far, column partition, labels, next label);
+    # the partition is only fixed once the first row is known.
+    states = [(0, (), None, (0,) * 10, 1), (1, (), None, (0,) * 10, 1)]
+    rows_out = []
+    for k in range(9):
+        best = None
+        next_states = []
+        for g, chosen, partition, labels, next_label in states:
+            for r in _candidate_rows(empty[g], chosen, k):
+                row = rows[g][r]
+                starts = _stack_orders(row, blank[g]) if partition is None else (partition,)
+                out, groups = _min_row(row, starts[0], labels, next_label)
+                if best is None or out < best:
+                    best = out
+                    next_states = []
+                if out == best:
+                    chosen_r = chosen + (r,)
+                    for start in starts:
+                        if start is not starts[0]:
+                            groups = _min_row(row, start, labels, next_label)[1]
+                        next_states.extend(
+                            (g, chosen_r, *refined) for refined in _refine(row, groups, labels, next_label)
+                        )
+        rows_out.append(best)
+        states = next_states
+
+    g, chosen, partition, labels, next_label = states[0]
+    digits = list(labels)
+    for d in range(1, 10):
+        if not digits[d]:
+            digits[d] = next_label
+            next_label += 1
+    cols = tuple(c for group in partition for c in group)
+    key = "".join(str(v) if v else "." for row in rows_out for v in row)
+    return key, Transform(g == 1, chosen, cols, tuple(digits))
+
+
+def _candidate_rows(empty: list[bool], chosen: tuple[int, ...], k: int) -> list[int]:
+    """
+    The rows that can come next, after the rows in `chosen`, as row `k` of the result.
+    Empty rows within a band, and bands without any clue, are interchangeable, so
+    only the first of them is tried.
+    """
+    if k % 3:
+        band = chosen[-1] // 3
+        bands = [band]
+    else:
+        used = {r // 3 for r in chosen}
+        bands = []
+        seen_blank = False
+        for band in range(3):
+            if band in used:
+                continue
+            if all(empty[band * 3 : band * 3 + 3]):
+                if seen_blank:
+                    continue
+                seen_blank = True
+            bands.append(band)
+    rows = []
+    for band in bands:
+        seen_empty = False
+        for r in range(band * 3, band * 3 + 3):
+            if r in chosen:
+                continue
+            if empty[r]:
+                if seen_empty:
+                    continue
+                seen_empty = True
+            rows.append(r)
+    return rows
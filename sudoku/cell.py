@@ -1,10 +1,74 @@
-from pydantic import BaseModel, Field
-from copy import copy
+from typing import Iterable
 
+# Candidates are stored as bitmasks: bit (v - 1) is set when v is possible. This
+# is every candidate of a 9x9 puzzle; see `sudoku.units.Geometry` for other sizes.
+ALL_CANDIDATES = 0b111111111
 
-class Cell(BaseModel):
-    value: int | None = Field(default=None)
-    possible_values: set[int] = Field(default={1, 2, 3, 4, 5, 6, 7, 8, 9})
+
+def to_mask(values: Iterable[int]) -> int:
+    mask = 0
+    for v in values:
+        mask |= 1 << (v - 1)
+    return mask
+
+
+def from_mask(mask: int) -> set[int]:
+    values = set()
+    v = 1
+    while mask:
+        if mask & 1:
+            values.add(v)
+        mask >>= 1
+        v += 1
+    return values
+
+
+class Cell:
+    """
+    One Sudoku cell: its value, if known, and the values still possible for it.
+
+    A Cell assigned into a Puzzle (`puzzle[row, col] = cell`) is bound to that
+    cell of the puzzle: indexing the puzzle there returns it, and it reads and
+    writes the puzzle's arrays, as a CellView does, until another cell is
+    assigned in its place.
+
+    Without `possible_values`, every digit is possible: 1 to 9 for a cell on its
+    own, and every digit of the grid once it is assigned into a puzzle.
+    """
+
+    __slots__ = ("_value", "_possible_values", "_default", "_puzzle", "_index")
+
+    def __init__(self, value: int | None = None, possible_values: Iterable[int] | None = None):
+        self._puzzle = None
+        self._value = value
+        self._default = possible_values is None
+        self._possible_values = set(range(1, 10) if possible_values is None else possible_values)
+
+    @property
+    def value(self) -> int | None:
+        if self._puzzle is None:
+            return self._value
+        return self._puzzle._values[self._index] or None
+
+    @value.setter
+    def value(self, v: int | None):
+        if self._puzzle is None:
+            self._value = v
+        else:
+            self._puzzle._place(self._index, v or 0)
+
+    @property
+    def possible_values(self) -> set[int]:
+        if self._puzzle is None:
+            return self._possible_values
+        return from_mask(self._puzzle._masks[self._index])
+
+    @possible_values.setter
+    def possible_values(self, p: set[int]):
+        if self._puzzle is None:
+            self._possible_values = p
+        else:
+            self._puzzle._masks[self._index] = to_mask(p)
 
     def set_value(self, v: int, p: set = set()):
         self.value = v
@@ -13,10 +77,67 @@ class Cell(BaseModel):
         else:
             self.possible_values = p
 
+    def _bind(self, puzzle, index: int):
+        self._puzzle = puzzle
+        self._index = index
+        self._default = False
+
+    def _unbind(self):
+        # Keeps the state of the puzzle's cell, which is about to be replaced.
+        self._value, self._possible_values = self.value, self.possible_values
+        self._puzzle = None
+
     def __eq__(self, other: "Cell"):
         return (
             self.value == other.value and self.possible_values == other.possible_values
         )
 
-    def copy(self):
-        return copy(self)
+    def copy(self) -> "Cell":
+        return Cell(self.value, self.possible_values)
+
+    def __repr__(self):
+        return f"Cell(value={self.value}, possible_values={self.possible_values})"
+
+
+class CellView(Cell):
+    """
+    A live, Cell-compatible view of one cell stored inside a Puzzle: a Cell
+    bound to it from the start.
+
+    Reading and assigning `value` and `possible_values` goes straight to the
+    puzzle's value and candidate mask arrays, so no per-cell objects are kept.
+    Note that `possible_values` returns a fresh set; mutate it through
+    assignment (e.g. `view.possible_values -= {1}`) rather than in place.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, puzzle, index: int):
+        self._puzzle = puzzle
+        self._index = index
+
+    @property
+    def value(self) -> int | None:
+        return self._puzzle._values[self._index] or None
+
+    @value.setter
+    def value(self, v: int | None):
+        self._puzzle._place(self._index, v or 0)
+
+    @property
+    def possible_values(self) -> set[int]:
+        return from_mask(self._puzzle._masks[self._index])
+
+    @possible_values.setter
+    def possible_values(self, p: set[int]):
+        self._puzzle._masks[self._index] = to_mask(p)
+
+    def set_value(self, v: int, p: set = set()):
+        self._puzzle._place(self._index, v)
+        self._puzzle._masks[self._index] = to_mask(p) if len(p) else 1 << (v - 1)
+
+    def copy(self) -> Cell:
+        return Cell(value=self.value, possible_values=self.possible_values)
+
+    def __repr__(self):
+        return f"CellView(value={self.value}, possible_values={self.possible_values})"
@@ -0,0 +1,327 @@
+"""
+A fixed-width binary format for large puzzle corpora.
+
+Every puzzle takes the same number of bytes, so a memory-mapped corpus gives
+constant-time access to any puzzle, can be split into shards by index, and a run
+over it can be resumed from any offset without parsing what comes before.
+
+Layout, all integers little-endian:
+
+- A 32-byte header: the magic b"SDKC", the format version, the encoding, the
+  flags, a reserved byte, and the number of puzzles as 8 bytes; the rest is zero.
+- The puzzles, which are all 9x9. With the "bytes" encoding, a puzzle is 81
+  bytes, one cell value per byte (0 for empty). With the "nibbles" encoding, it
+  is 41 bytes, two cells per byte (the first one in the high nibble).
+- If the RESULTS flag is set, a results section: one status byte per puzzle (0 if
+  not solved yet, otherwise the value of its SolverResult), followed by one
+  solution per puzzle, in the puzzles' encoding.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+from .puzzle import Puzzle
+from .puzzle_file import parse_puzzle, open_source, iter_puzzle_lines
+from .solver import SolverResult
+
+MAGIC = b"SDKC"
+VERSION = 1
+ENCODINGS = ("bytes", "nibbles")
+RESULTS = 1
+
+_HEADER = struct.Struct("<4sBBBBQ")
+HEADER_SIZE = 32
+_RECORD_SIZES = {"bytes": 81, "nibbles": 41}
+
+# Text to cell values, with 255 for characters that are not allowed.
+_FROM_TEXT = bytes(
+    0 if chr(b) in ".0x" else b - 48 if 49 <= b <= 57 else 255 for b in range(256)
+)
+_TO_TEXT = bytes(ord(".") if b == 0 else 48 + b if b <= 9 else ord("?") for b in range(256))
+_PAIRS = tuple(chr(_TO_TEXT[b >> 4]) + chr(_TO_TEXT[b & 15]) for b in range(256))
+# Cell values moved to the high nibble.
+_HIGH = bytes((b << 4) & 0xFF for b in range(256))
+_CELL_VALUES = bytes(range(10))
+
+
+def check_length(line: str):
+    """
+    Raises ValueError if `line` is not a puzzle a corpus can hold: 9x9, written
+    as 81 characters.
+    """
+    if len(line) != 81:
+        raise ValueError(f"a binary corpus only holds 9x9 puzzles of 81 characters, got {len(line)}: [{line[:100]}]")
+
+
+def check_lengths(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yields `lines`, raising ValueError at the first one that is not a puzzle a
+    corpus can hold, see `check_length`; to reject them before they are solved.
+    """
+    for line in lines:
+        check_length(line)
+        yield line
+
+
+def encode(line: str, encoding: str = "nibbles") -> bytes:
+    """
+    Encodes a puzzle written as an 81-character line as one record.
+    """
+    check_length(line)
+    values = line.encode("ascii", "replace").translate(_FROM_TEXT)
+    if max(values) > 9:
+        raise ValueError(f"format error, content is [{line}]")
+    if encoding == "bytes":
+        return values
+    return bytes(values[i] << 4 | (values[i + 1] if i < 80 else 0) for i in range(0, 81, 2))
+
+
+def encode_many(lines: list[str], encoding: str = "nibbles") -> bytes:
+    """
+    Encodes many puzzles at once, as the concatenation of their records; much
+    faster than `encode` on every line.
+    """
+    for line in lines:
+        check_length(line)
+    if encoding == "bytes":
+        values = "".join(lines).encode("ascii", "replace").translate(_FROM_TEXT)
+    else:
+        # Every record takes a padding cell, so that cells pair up within records.
+        values = ".".join(lines).encode("ascii", "replace").translate(_FROM_TEXT) + b"\0"
+    if values.translate(None, _CELL_VALUES):
+        raise ValueError("format error, a puzzle holds a character that is not a digit or an empty marker")
+    if encoding == "bytes":
+        return values
+    high, low = values[0::2].translate(_HIGH), values[1::2]
+    # The nibbles of a pair never overlap, so one big OR packs them all.
+    return (int.from_bytes(high, "big") | int.from_bytes(low, "big")).to_bytes(len(low), "big")
+
+
+def decode(record: bytes, encoding: str = "nibbles") -> str:
+    """
+    Decodes one record into an 81-character line, with "." for empty cells.
+    """
+    if encoding == "bytes":
+        return record.translate(_TO_TEXT).decode("ascii")
+    return "".join([_PAIRS[b] for b in record])[:81]
+
+
+def is_corpus(path: str) -> bool:
+    """
+    Whether `path` is a binary corpus file, judging by its magic bytes.
+    """
+    if path == "-" or not os.path.isfile(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_corpus(path: str, lines: Iterable[str], encoding: str = "nibbles", results: bool = False) -> int:
+    """
+    Writes a binary corpus, streaming the puzzles.
+
+    Args:
+        path: The file to write.
+        lines: The puzzles, as 81-character lines.
+        encoding: One of ENCODINGS.
+        results: Whether to add an empty results section, to be filled in by
+            `Corpus.set_result`.
+
+    Returns:
+        The number of puzzles written.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+    record_size = _RECORD_SIZES[encoding]
+    count = 0
+    with open(path, "wb") as f:
+        f.write(bytes(HEADER_SIZE))
+        lines = iter(lines)
+        while chunk := list(islice(lines, 4096)):
+            f.write(encode_many(chunk, encoding))
+            count += len(chunk)
+        if results:
+            # Zero-filled, which may stay sparse on disk until results are written.
+            f.truncate(HEADER_SIZE + count * record_size + count * (1 + record_size))
+        f.seek(0)
+        flags = RESULTS if results else 0
+        f.write(_HEADER.pack(MAGIC, VERSION, ENCODINGS.index(encoding), flags, 0, count))
+    return count
+
+
+class Corpus:
+    """
+    A memory-mapped binary corpus, see the module docstring for the format.
+
+    Indexing a corpus returns the puzzle as an 81-character line; `puzzle(i)` parses
+    it. Use it as a context manager, or `close()` it.
+
+    Args:
+        path: The corpus file.
+        writable: Whether results will be written with `set_result`.
+    """
+
+    def __init__(self, path: str, writable: bool = False):
+        self.path = path
+        self._file = open(path, "r+b" if writable else "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a puzzle corpus") from None
+        if len(self._map) < HEADER_SIZE or self._map[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a puzzle corpus")
+        _, version, encoding, flags, _, count = _HEADER.unpack_from(self._map)
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"unsupported corpus version {version} in {path}")
+        if encoding >= len(ENCODINGS):
+            self.close()
+            raise ValueError(f"{path} is not a puzzle corpus")
+        self.encoding = ENCODINGS[encoding]
+        self.record_size = _RECORD_SIZES[self.encoding]
+        self.has_results = bool(flags & RESULTS)
+        # The puzzles, then, with results, a status byte and a solution per puzzle.
+        size = HEADER_SIZE + count * self.record_size
+        if self.has_results:
+            size += count * (1 + self.record_size)
+        if len(self._map) != size:
+            self.close()
+            raise ValueError(f"{path} is not a puzzle corpus")
+        self._count = count
+        self._status = HEADER_SIZE + count * self.record_size
+        self._solutions = self._status + count
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _index(self, i: int) -> int:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("corpus index out of range")
+        return i
+
+    def __getitem__(self, i: int) -> str:
+        start = HEADER_SIZE + self._index(i) * self.record_size
+        return decode(self._map[start : start + self.record_size], self.encoding)
+
+    def puzzle(self, i: int) -> Puzzle:
+        return parse_puzzle(self[i])
+
+    def iter_lines(self, start: int = 0, stop: int | None = None) -> Iterator[str]:
+        """
+        Yields the puzzles from index `start` up to `stop`, e.g. to resume a run or
+        to work on one shard.
+        """
+        stop = self._count if stop is None else min(stop, self._count)
+        size = self.record_size
+        encoding = self.encoding
+        offset = HEADER_SIZE + start * size
+        for _ in range(start, stop):
+            yield decode(self._map[offset : offset + size], encoding)
+            offset += size
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_lines()
+
+    def _check_results(self):
+        if not self.has_results:
+            raise ValueError(f"{self.path} has no results section")
+
+    def result(self, i: int) -> tuple[SolverResult | None, str | None]:
+        """
+        Returns the result recorded for puzzle `i`, and its solution if it was solved;
+        (None, None) if nothing is recorded yet.
+        """
+        self._check_results()
+        i = self._index(i)
+        status = self._map[self._status + i]
+        if not status:
+            return None, None
+        result = SolverResult(status)
+        if result != SolverResult.SOLVED:
+            return result, None
+        start = self._solutions + i * self.record_size
+        return result, decode(self._map[start : start + self.record_size], self.encoding)
+
+    def set_result(self, i: int, result: SolverResult, solution: str | None = None):
+        """
+        Records the result of puzzle `i`, and its solution if it was solved. The
+        solution is written before the status, so a crash never leaves a status
+        without its solution.
+        """
+        self._check_results()
+        i = self._index(i)
+        if solution is not None:
+            start = self._solutions + i * self.record_size
+            self._map[start : start + self.record_size] = encode(solution, self.encoding)
+        self._map[self._status + i] = result.value
+
+    def first_unsolved(self, start: int = 0) -> int:
+        """
+        Returns the index of the first puzzle from `start` on without a recorded
+        result, or the number of puzzles if there is none: where to resume a run
+        that records its results in order.
+        """
+        self._check_results()
+        found = self._map.find(b"\0", self._status + start, self._status + self._count)
+        return self._count if found < 0 else found - self._status
+
+    def flush(self):
+        self._map.flush()
+
+
+def shards(count: int, n: int) -> list[range]:
+    """
+    Splits the indices of `count` puzzles into `n` contiguous ranges of nearly
+    equal size, e.g. one per worker.
+    """
+    size, extra = divmod(count, n)
+    ranges = []
+    start = 0
+    for k in range(n):
+        stop = start + size + (k < extra)
+        ranges.append(range(start, stop))
+        start = stop
+    return ranges
+
+
+def text_to_corpus(source: str, path: str, encoding: str = "nibbles", results: bool = False) -> int:
+    """
+    Converts a text puzzle file, or standard input when `source` is "-", into a
+    binary corpus. See `sudoku.puzzle_file.iter_puzzle_lines` for the text formats.
+
+    Returns:
+        The number of puzzles converted.
+    """
+    with open_source(source) as f:
+        return write_corpus(path, iter_puzzle_lines(f), encoding, results)
+
+
+def corpus_to_text(path: str, out: TextIO = sys.stdout) -> int:
+    """
+    Writes the puzzles of a binary corpus as 81-character lines.
+
+    Returns:
+        The number of puzzles converted.
+    """
+    with Corpus(path) as corpus:
+        for line in corpus:
+            out.write(line + "\n")
+        return len(corpus)
@@ -0,0 +1,273 @@
+"""
+Exact-cover solver backend using Knuth's Dancing Links (Algorithm X).
+
+A 9x9 Sudoku is encoded as an exact-cover problem with 324 constraint columns
+(every cell holds one digit, and every row, col and section holds every digit
+once) and 729 option rows, one per (cell, digit) pair; other sizes scale the
+same way. The links live in flat integer lists, and search covers and uncovers
+columns in place, so no memory is allocated once a solver has been built.
+"""
+
+from functools import cache
+from typing import TYPE_CHECKING
+from .puzzle import Puzzle
+
+if TYPE_CHECKING:
+    from .limits import Limits
+
+ROOT = 0
+
+
+def _constraints(cell: int, digit: int, box: int = 3) -> tuple[int, int, int, int]:
+    """
+    Returns the four constraint columns (1-based) satisfied by placing `digit` in `cell`.
+    """
+    n = box * box
+    cells = n * n
+    row, col = divmod(cell, n)
+    section = row // box * box + col // box
+    d = digit - 1
+    return (
+        1 + cell,
+        1 + cells + row * n + d,
+        1 + 2 * cells + col * n + d,
+        1 + 3 * cells + section * n + d,
+    )
+
+
+@cache
+def _template(box: int = 3) -> tuple[list[int], list[int], list[int], list[int], list[int], list[int]]:
+    """
+    Builds the links of the full matrix, 729 x 324 for a 9x9 grid: the root, one
+    header per column and four nodes per option row. Built on first use for
+    every size, and copied for every puzzle.
+    """
+    n = box * box
+    options = n * n * n
+    columns = 4 * n * n
+    count = 1 + columns + 4 * options
+    left = list(range(-1, count - 1))
+    right = list(range(1, count + 1))
+    up = list(range(count))
+    down = list(range(count))
+    column = list(range(count))
+    option = [-1] * count
+
+    # Circular list of column headers around the root.
+    left[ROOT] = columns
+    right[columns] = ROOT
+
+    node = 1 + columns
+    for o in range(options):
+        first = node
+        for c in _constraints(o // n, o % n + 1, box):
+            column[node] = c
+            option[node] = o
+            # Append the node at the bottom of its column.
+            up[node] = up[c]
+            down[node] = c
+            down[up[c]] = node
+            up[c] = node
+            left[node] = node - 1
+            right[node] = node + 1
+            node += 1
+        left[first] = node - 1
+        right[node - 1] = first
+
+    return left, right, up, down, column, option
+
+
+class DancingLinks:
+    """
+    The exact-cover matrix for one puzzle, ready to search.
+
+    Options for the puzzle's given values are selected up front, and options
+    excluded by the candidate masks of unsolved cells are removed, so the
+    search only explores placements the puzzle still allows.
+    """
+
+    __slots__ = ("left", "right", "up", "down", "column", "option", "size", "selected", "solution", "n", "columns")
+
+    def __init__(self, puzzle: Puzzle):
+        box = puzzle.box
+        n = self.n = puzzle.size
+        self.columns = 4 * n * n
+        left, right, up, down, column, option = _template(box)
+        self.left = left.copy()
+        self.right = right.copy()
+        self.up = up.copy()
+        self.down = down.copy()
+        self.column = column
+        self.option = option
+        self.size = [0] + [n] * self.columns
+        self.selected = []
+        self.solution = None
+
+        values = puzzle._values
+        masks = puzzle._masks
+        for cell in range(n * n):
+            if values[cell]:
+                continue
+            mask = masks[cell]
+            for d in range(n):
+                if not mask >> d & 1:
+                    self._remove_option(cell * n + d)
+        for cell in range(n * n):
+            if values[cell]:
+                self._select(cell * n + values[cell] - 1)
+
+    def _first_node(self, o: int) -> int:
+        return 1 + self.columns + 4 * o
+
+    def _remove_option(self, o: int):
+        up = self.up
+        down = self.down
+        size = self.size
+        first = self._first_node(o)
+        for node in range(first, first + 4):
+            down[up[node]] = down[node]
+            up[down[node]] = up[node]
+            size[self.column[node]] -= 1
+
+    def _select(self, o: int):
+        node = self._first_node(o)
+        self._cover(self.column[node])
+        j = self.right[node]
+        while j != node:
+            self._cover(self.column[j])
+            j = self.right[j]
+        self.selected.append(o)
+
+    def _cover(self, c: int):
+        left = self.left
+        right = self.right
+        up = self.up
+        down = self.down
+        column = self.column
+        size = self.size
+        right[left[c]] = right[c]
+        left[right[c]] = left[c]
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, c: int):
+        left = self.left
+        right = self.right
+        up = self.up
+        down = self.down
+        column = self.column
+        size = self.size
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = c
+        left[right[c]] = c
+
+    def search(self, limit: int = 1, limits: "Limits | None" = None) -> int:
+        """
+        Runs Algorithm X, always branching on the column with the fewest options.
+
+        Args:
+            limit: Stop once this many solutions have been found.
+            limits: Checked at every option tried, see `sudoku.limits`.
+
+        Returns:
+            The number of solutions found, at most `limit`. The options of the
+            first solution are kept in `solution`.
+
+        Raises:
+            SolveInterrupted: If one of `limits` was reached.
+        """
+        right = self.right
+        down = self.down
+        left = self.left
+        column = self.column
+        option = self.option
+        size = self.size
+        stack = self.selected
+        found = 0
+
+        def recurse() -> bool:
+            nonlocal found
+            if right[ROOT] == ROOT:
+                found += 1
+                if self.solution is None:
+                    self.solution = list(stack)
+                return found >= limit
+
+            c = right[ROOT]
+            best = c
+            best_size = size[c]
+            while c != ROOT and best_size > 1:
+                if size[c] < best_size:
+                    best = c
+                    best_size = size[c]
+                c = right[c]
+            if best_size == 0:
+                return False
+
+            self._cover(best)
+            r = down[best]
+            while r != best:
+                if limits is not None:
+                    limits.node()
+                stack.append(option[r])
+                j = right[r]
+                while j != r:
+                    self._cover(column[j])
+                    j = right[j]
+                if recurse():
+                    return True
+                j = left[r]
+                while j != r:
+                    self._uncover(column[j])
+                    j = left[j]
+                stack.pop()
+                r = down[r]
+            self._uncover(best)
+            return False
+
+        recurse()
+        return found
+
+    def fill(self, puzzle: Puzzle):
+        """
+        Writes the first solution found by `search()` into `puzzle`.
+        """
+        for o in self.solution:
+            cell, d = divmod(o, self.n)
+            puzzle._place(cell, d + 1)
+            puzzle._masks[cell] = 1 << d
+
+
+def solve_dlx(puzzle: Puzzle, limits: "Limits | None" = None) -> Puzzle | None:
+    """
+    Solves a puzzle with Dancing Links.
+
+    Args:
+        puzzle: The Sudoku puzzle to be solved. It is not modified, and must not
+            repeat a value within a unit.
+        limits: The limits of the search, see `DancingLinks.search`.
+
+    Returns:
+        The solved puzzle, or None if the puzzle has no solution.
+    """
+    links = DancingLinks(puzzle)
+    if not links.search(1, limits):
+        return None
+    result = puzzle.copy()
+    links.fill(result)
+    return result
@@ -0,0 +1,45 @@
+"""
+Structured events emitted while solving.
+
+Solve entry points accept an optional `observer`: any callable taking an Event.
+When no observer is given, no events are built, and the solver runs the plain
+code paths without any per-event checks.
+"""
+
+from enum import Enum
+from typing import Callable, NamedTuple
+from .puzzle import Puzzle
+
+
+class EventKind(Enum):
+    ITERATION = 1
+    ELIMINATION = 2
+    GUESS = 3
+    BACKTRACK = 4
+    CONTRADICTION = 5
+
+
+class Event(NamedTuple):
+    """
+    One step of a solve.
+
+    Attributes:
+        kind: What happened.
+        puzzle: The puzzle being solved, in its current state. It keeps changing
+            after the observer returns; copy it to keep a snapshot.
+        position: The (row, col) of the cell concerned, if any.
+        digits: The candidates removed (ELIMINATION), or the value tried (GUESS) or
+            given up (BACKTRACK).
+        depth: The number of guesses the current state depends on.
+        iteration: The number of propagation passes run so far.
+    """
+
+    kind: EventKind
+    puzzle: Puzzle
+    position: tuple[int, int] | None = None
+    digits: frozenset[int] = frozenset()
+    depth: int = 0
+    iteration: int = 0
+
+
+Observer = Callable[[Event], None]
@@ -0,0 +1,221 @@
+"""
+Generating puzzles with a unique solution.
+
+A random solution grid is filled first, and clues are then removed from it in
+random order, keeping only the removals after which the solution is still unique.
+Puzzles can be asked for with a number of clues, a difficulty, or both.
+"""
+
+import os
+import random
+from collections import deque
+from typing import Iterator
+from .cell import ALL_CANDIDATES
+from .puzzle import Puzzle
+from .puzzle_file import format_puzzle
+from .units import SECTIONS
+from .propagation import Propagator, TECHNIQUES
+from .solver import solve, count_solutions, SolverResult
+from .canonical import random_transform
+
+# From the puzzles solved by naked and hidden singles alone, to those that also
+# need the other deduction techniques, to those that need a search.
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# No puzzle with fewer clues has a unique solution.
+MIN_CLUES = 17
+
+# The number of solution grids tried for a puzzle before giving up. Digging a grid
+# takes about 70 ms; about 2% of grids yield 22 clues, and fewer clues are rarer
+# still, some combinations of clues and difficulty never.
+MAX_ATTEMPTS = 500
+
+
+def random_grid(rng: random.Random) -> Puzzle:
+    """
+    Returns a random solution grid: the three sections on the diagonal, which do not
+    share any unit, are filled with random permutations, the rest of the grid is
+    solved, and the result is randomly transformed.
+    """
+    while True:
+        puzzle = Puzzle()
+        for section in (0, 4, 8):
+            for i, digit in zip(SECTIONS[section], rng.sample(range(1, 10), 9)):
+                puzzle._values[i] = digit
+                puzzle._masks[i] = 1 << (digit - 1)
+        result, solved = solve(puzzle)
+        if result == SolverResult.SOLVED:
+            return random_transform(rng).apply_puzzle(solved)
+
+
+def grade(puzzle: Puzzle) -> str:
+    """
+    Rates a puzzle by the techniques needed to solve it.
+
+    Returns:
+        One of DIFFICULTIES: "easy" if naked and hidden singles solve it, "medium"
+        if the other techniques of `sudoku.propagation.TECHNIQUES` are needed too,
+        and "hard" if a search is needed.
+    """
+    for difficulty, techniques in (("easy", ("singles", "hidden_singles")), ("medium", TECHNIQUES)):
+        result = puzzle.copy()
+        propagator = Propagator(result, techniques)
+        propagator.load()
+        if not propagator.propagate():
+            raise ValueError("the puzzle has no solution")
+        if result.is_solved():
+            return difficulty
+    return "hard"
+
+
+def dig(grid: Puzzle, rng: random.Random, clues: int = MIN_CLUES, difficulty: str | None = None) -> Puzzle:
+    """
+    Removes clues from a solution grid, in random order, as long as the solution
+    stays unique.
+
+    A clue can be removed if no solution has another digit in its cell, which is a
+    single early-terminating search instead of counting solutions up to two.
+
+    Args:
+        grid: The solution grid. It is not modified.
+        rng: The source of randomness.
+        clues: Stop once this many clues are left.
+        difficulty: If given, only remove clues as long as the puzzle is no harder
+            than this, one of DIFFICULTIES.
+
+    Returns:
+        A puzzle with a unique solution, and `clues` clues or more.
+    """
+    puzzle = grid.copy()
+    values = puzzle._values
+    masks = puzzle._masks
+    left = 81
+    for i in rng.sample(range(81), 81):
+        if left <= clues:
+            break
+        digit = values[i]
+        puzzle._place(i, 0)
+        masks[i] = ALL_CANDIDATES & ~(1 << (digit - 1))
+        if count_solutions(puzzle, limit=1) == 0:
+            masks[i] = ALL_CANDIDATES
+            if difficulty is None or DIFFICULTIES.index(grade(puzzle)) <= DIFFICULTIES.index(difficulty):
+                left -= 1
+                continue
+        puzzle._place(i, digit)
+        masks[i] = 1 << (digit - 1)
+    return puzzle
+
+
+def _check(clues: int | None, difficulty: str | None):
+    if clues is not None and not MIN_CLUES <= clues <= 81:
+        raise ValueError(f"clues must be between {MIN_CLUES} and 81, got {clues}")
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(f"unknown difficulty {difficulty!r}, expected one of {DIFFICULTIES}")
+
+
+def generate(
+    rng: random.Random,
+    clues: int | None = None,
+    difficulty: str | None = None,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> Puzzle:
+    """
+    Generates a puzzle with a unique solution.
+
+    Args:
+        rng: The source of randomness.
+        clues: The number of clues of the puzzle. Without it, as many clues as
+            possible are removed. The fewer clues, the more grids may have to be
+            tried; below about 22 clues, few are found within `max_attempts`.
+        difficulty: The difficulty of the puzzle, one of DIFFICULTIES.
+        max_attempts: The number of solution grids tried before giving up.
+
+    Returns:
+        The puzzle.
+
+    Raises:
+        ValueError: If the arguments are out of range, or no puzzle was found in
+            `max_attempts` attempts.
+    """
+    _check(clues, difficulty)
+    for _ in range(max_attempts):
+        puzzle = dig(random_grid(rng), rng, clues or MIN_CLUES, difficulty)
+        if clues is not None and 81 - puzzle._values.count(0) != clues:
+            continue
+        if difficulty is not None and grade(puzzle) != difficulty:
+            continue
+        return puzzle
+    wanted = " ".join(part for part in (difficulty, f"{clues}-clue" if clues else None) if part)
+    raise ValueError(f"no {wanted} puzzle found in {max_attempts} attempts")
+
+
+def generate_lines(
+    count: int,
+    seed: str,
+    clues: int | None = None,
+    difficulty: str | None = None,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> list[str]:
+    """
+    Generates `count` puzzles as 81-character lines, deterministically for a seed.
+    """
+    rng = random.Random(seed)
+    return [format_puzzle(generate(rng, clues, difficulty, max_attempts)) for _ in range(count)]
+
+
+def generate_stream(
+    count: int,
+    clues: int | None = None,
+    difficulty: str | None = None,
+    seed: int | None = None,
+    jobs: int | None = None,
+    chunk_size: int = 16,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> Iterator[str]:
+    """
+    Generates puzzles across a pool of worker processes.
+
+    Every chunk of puzzles gets its own random seed, derived from `seed`, so the
+    puzzles depend on the seed and the chunk size but not on the number of workers.
+
+    Args:
+        count: The number of puzzles.
+        clues: The number of clues of every puzzle, see `generate`.
+        difficulty: The difficulty of every puzzle, one of DIFFICULTIES.
+        seed: The seed; a random one is used if not given.
+        jobs: The number of worker processes; defaults to the number of CPUs.
+            With 1, puzzles are generated in the calling process.
+        chunk_size: The number of puzzles generated by a worker at a time.
+        max_attempts: The number of solution grids tried for every puzzle, see
+            `generate`.
+
+    Yields:
+        The puzzles, as 81-character lines.
+
+    Raises:
+        ValueError: See `generate`.
+    """
+    _check(clues, difficulty)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    chunks = (
+        (min(chunk_size, count - start), f"{seed}:{start // chunk_size}")
+        for start in range(0, count, chunk_size)
+    )
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        for size, chunk_seed in chunks:
+            yield from generate_lines(size, chunk_seed, clues, difficulty, max_attempts)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for size, chunk_seed in chunks:
+            if len(pending) >= 4 * jobs:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(generate_lines, size, chunk_seed, clues, difficulty, max_attempts))
+        while pending:
+            yield from pending.popleft().result()
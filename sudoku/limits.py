@@ -0,0 +1,76 @@
+"""
+Limits on a solve: a deadline, a budget of search nodes, and a cancellation token.
+
+The solvers check their limits at propagation and guess boundaries: every unit a
+propagator examines, and every value the search guesses, is a point where a solve
+can stop. A solve stopped that way returns `SolverResult.TIMEOUT`, see
+`sudoku.solver.solve`. Solves without limits do not check anything.
+"""
+
+from time import perf_counter
+
+
+class SolveInterrupted(TimeoutError):
+    """
+    Raised inside a solver when a limit is reached. `solve()` returns it as
+    `SolverResult.TIMEOUT`; `count_solutions()` lets it through.
+
+    Attributes:
+        puzzle: The puzzle as far as the solve got, where the solver keeps it.
+    """
+
+    puzzle = None
+
+
+class Limits:
+    """
+    The limits of one solve.
+
+    Args:
+        timeout: The time allowed, in seconds from now.
+        max_nodes: The largest number of search nodes, i.e. guesses, allowed.
+        cancel: A cancellation token: anything with an `is_set()` method, such as a
+            `threading.Event`, set from elsewhere to stop the solve.
+    """
+
+    __slots__ = ("deadline", "max_nodes", "cancel", "nodes")
+
+    def __init__(self, timeout: float | None = None, max_nodes: int | None = None, cancel=None):
+        self.deadline = None if timeout is None else perf_counter() + timeout
+        self.max_nodes = max_nodes
+        self.cancel = cancel
+        self.nodes = 0
+
+    def remaining(self) -> float | None:
+        """
+        The time left before the deadline in seconds, or None without a deadline.
+        """
+        return None if self.deadline is None else max(0.0, self.deadline - perf_counter())
+
+    def check(self):
+        """
+        Raises SolveInterrupted if the deadline has passed or the solve was cancelled.
+        """
+        if self.deadline is not None and perf_counter() >= self.deadline:
+            raise SolveInterrupted("the solve timed out")
+        if self.cancel is not None and self.cancel.is_set():
+            raise SolveInterrupted("the solve was cancelled")
+
+    def node(self):
+        """
+        Counts a search node, then checks every limit.
+        """
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SolveInterrupted(f"the solve took more than {self.max_nodes} nodes")
+        self.check()
+
+
+def make_limits(timeout: float | None = None, max_nodes: int | None = None, cancel=None) -> Limits | None:
+    """
+    Returns the Limits of a solve, or None if there are none, so that solves
+    without limits skip every check.
+    """
+    if timeout is None and max_nodes is None and cancel is None:
+        return None
+    return Limits(timeout, max_nodes, cancel)
@@ -0,0 +1,354 @@
+"""
+Parallel search of a single puzzle over worker processes.
+
+The search tree is split into subproblems, each a puzzle state (see
+`Puzzle.to_bytes`) covering a disjoint part of the tree: a node of the search,
+or a node with a cell narrowed down to the digits not tried yet. Searching all
+of them is the same as searching the whole tree.
+
+The search starts in the calling process, so that a puzzle solved within the
+first time slice never starts a process. Otherwise, what is left of the tree is
+handed to a pool of workers. A worker searches its subproblem depth-first, and
+at the end of every time slice checks whether any worker is idle; if so, it stops
+and sends back the rest of its subproblem, split into pieces, which are queued
+for the idle workers. As soon as enough solutions are found, every worker is
+told to stop.
+
+The limits of a search (see `sudoku.limits`) are checked by the calling process
+while it waits for the workers, and handed to every worker as the time and the
+nodes left when its subproblem is queued, so a worker stops on its own once they
+run out. The node budget is shared by the workers running at the same time, so a
+search may go over it by up to one budget per worker.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from time import perf_counter
+from typing import Callable, TYPE_CHECKING
+from .puzzle import Puzzle
+from .propagation import Propagator, DEFAULT_TECHNIQUES
+from .limits import Limits, SolveInterrupted
+from .solver import _choose_cell
+
+if TYPE_CHECKING:
+    from .stats import SolveStats
+
+# The time spent searching in the calling process before any worker is started,
+# and between two checks of a worker for idle workers, in seconds.
+SERIAL_TIME = 0.05
+SLICE_TIME = 0.01
+
+# A subproblem: a puzzle state, and the depth of the search it starts at.
+Subproblem = tuple[bytes, int]
+
+
+def _explore(
+    propagator: Propagator,
+    limit: int,
+    split: Callable[[], bool],
+    slice_time: float,
+    depth: int = 0,
+    stats: "SolveStats | None" = None,
+) -> tuple[int, bytes | None, list[Subproblem]]:
+    """
+    Depth-first search over the propagated puzzle, like `sudoku.solver._search`
+    but with an explicit stack, so that it can stop at any node and return the
+    part of the tree left to search.
+
+    Args:
+        propagator: The propagator, at a consistent fixpoint.
+        limit: Stop once this many solutions are found.
+        split: Called at the end of every time slice; if it returns True, the
+            search stops and returns the rest of the tree.
+        slice_time: The length of a time slice, in seconds.
+        depth: The depth of the search at the puzzle, for `stats.max_depth`.
+        stats: Gets the guesses, backtracks and search depth, if given.
+
+    Returns:
+        The number of solutions found, the state of the first one, if any, and
+        the subproblems left, if the search was split.
+
+    Raises:
+        SolveInterrupted: If one of `propagator.limits` was reached.
+    """
+    puzzle = propagator.puzzle
+    values = puzzle._values
+    masks = puzzle._masks
+    # The cell guessed at every level, the trail mark before the guess, and the
+    # digits not tried yet.
+    stack = []
+    found = 0
+    solution = None
+    guesses = 0
+    limits = propagator.limits
+    next_check = perf_counter() + slice_time
+    try:
+        while True:
+            if stack and perf_counter() >= next_check:
+                # Only split if there is more to hand out than the current node.
+                if any(remaining for _, _, remaining in stack) and split():
+                    return found, solution, _remainder(propagator, stack, depth)
+                next_check = perf_counter() + slice_time
+            i = _choose_cell(values, masks)
+            if i is None:
+                found += 1
+                if solution is None:
+                    solution = puzzle.to_bytes()
+                if found >= limit:
+                    return found, solution, []
+            else:
+                stack.append((i, propagator.mark(), masks[i]))
+                if stats is not None and depth + len(stack) > stats.max_depth:
+                    stats.max_depth = depth + len(stack)
+
+            # Move on to the next branch not tried yet.
+            while stack:
+                i, mark, remaining = stack[-1]
+                propagator.undo(mark)
+                if not remaining:
+                    stack.pop()
+                    continue
+                bit = remaining & -remaining
+                stack[-1] = (i, mark, remaining ^ bit)
+                guesses += 1
+                if limits is not None:
+                    limits.node()
+                if stats is not None:
+                    stats.eliminations["guesses"] += masks[i].bit_count() - 1
+                if propagator.assign(i, bit.bit_length()) and propagator.propagate():
+                    break
+            else:
+                return found, solution, []
+    finally:
+        if stats is not None:
+            # Every guess but those on the current path was undone.
+            stats.guesses += guesses
+            stats.backtracks += guesses - len(stack)
+
+
+def _remainder(propagator: Propagator, stack: list[tuple[int, int, int]], depth: int) -> list[Subproblem]:
+    """
+    Returns the part of the tree `_explore` has not searched yet: the current node,
+    and every level of the stack with its cell narrowed to the digits not tried.
+    """
+    puzzle = propagator.puzzle
+    values = puzzle._values
+    masks = puzzle._masks
+    rest = [(puzzle.to_bytes(), depth + len(stack))]
+    for level in range(len(stack) - 1, -1, -1):
+        i, mark, remaining = stack[level]
+        propagator.undo(mark)
+        if not remaining:
+            continue
+        mask = masks[i]
+        masks[i] = remaining
+        if not remaining & (remaining - 1):
+            values[i] = remaining.bit_length()
+        rest.append((puzzle.to_bytes(), depth + level))
+        masks[i] = mask
+        values[i] = 0
+    return rest
+
+
+_cancelled = None
+_outstanding = None
+_workers = 0
+
+
+def _init_worker(cancelled, outstanding, workers: int):
+    global _cancelled, _outstanding, _workers
+    _cancelled = cancelled
+    _outstanding = outstanding
+    _workers = workers
+
+
+def _split() -> bool:
+    # Stop if the search is over, or to hand work to an idle worker.
+    return _cancelled.is_set() or _outstanding.value < _workers
+
+
+def _search_subproblem(
+    state: bytes,
+    depth: int,
+    limit: int,
+    techniques: tuple[str, ...],
+    with_stats: bool,
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+) -> tuple[int, bytes | None, list[Subproblem], int, bool, "SolveStats | None"]:
+    """
+    Searches a subproblem in a worker process, see `_explore`, within the time and
+    nodes left to the search, if any.
+
+    Returns:
+        What `_explore` returns, then the number of nodes searched, whether a limit
+        was reached, and the stats, if asked for.
+    """
+    stats = None
+    if with_stats:
+        from .stats import SolveStats
+
+        stats = SolveStats()
+    propagator = Propagator(Puzzle.from_bytes(state), techniques)
+    if timeout is not None or max_nodes is not None:
+        propagator.limits = Limits(timeout, max_nodes)
+    propagator.load()
+    result = (0, None, [])
+    interrupted = False
+    try:
+        if not _cancelled.is_set() and propagator.propagate():
+            result = _explore(propagator, limit, _split, SLICE_TIME, depth, stats)
+    except SolveInterrupted:
+        interrupted = True
+    if stats is not None:
+        stats.add_propagator(propagator)
+    nodes = 0 if propagator.limits is None else propagator.limits.nodes
+    return *result, nodes, interrupted, stats
+
+
+def search(
+    puzzle: Puzzle,
+    workers: int | None = None,
+    limit: int = 1,
+    techniques: tuple[str, ...] = DEFAULT_TECHNIQUES,
+    stats: "SolveStats | None" = None,
+    serial_time: float = SERIAL_TIME,
+    limits: Limits | None = None,
+) -> tuple[int, Puzzle | None, Puzzle]:
+    """
+    Searches a puzzle for solutions over a pool of worker processes.
+
+    Args:
+        puzzle: The puzzle. It is not modified.
+        workers: The number of worker processes; defaults to the number of CPUs.
+        limit: Stop once this many solutions are found.
+        techniques: The deduction techniques, see `sudoku.propagation.TECHNIQUES`.
+        stats: Gets the guesses, backtracks and search depth of every worker and
+            the propagation and search times, if given.
+        serial_time: How long to search in the calling process first, in seconds.
+        limits: The limits of the search, if any.
+
+    Returns:
+        The number of solutions found, up to `limit`, the first solution found,
+        if any, and the puzzle after the initial propagation.
+
+    Raises:
+        SolveInterrupted: If one of `limits` was reached. Its `puzzle` is the
+            puzzle as far as the initial propagation got.
+    """
+    workers = workers or os.cpu_count() or 1
+    start = perf_counter()
+    searched = None
+    root = puzzle.copy()
+    propagator = Propagator(root, techniques)
+    propagator.limits = limits
+    try:
+        propagator.load()
+        consistent = propagator.propagate()
+        if stats is not None:
+            stats.add_propagator(propagator)
+            searched = perf_counter()
+            stats.add_time("propagation", searched - start)
+        if not consistent:
+            return 0, None, root
+
+        propagator = Propagator(root.copy(), techniques)
+        propagator.limits = limits
+        found, solution, rest = _explore(propagator, limit, lambda: True, serial_time, stats=stats)
+        if rest and found < limit:
+            found, solution = _search_pool(rest, workers, limit, found, solution, techniques, stats, limits)
+        if stats is not None:
+            stats.add_propagator(propagator)
+        return min(found, limit), (None if solution is None else Puzzle.from_bytes(solution)), root
+    except SolveInterrupted as e:
+        e.puzzle = root
+        raise
+    finally:
+        if stats is not None:
+            stats.puzzles += 1
+            if searched is None:
+                stats.add_propagator(propagator)
+                stats.add_time("propagation", perf_counter() - start)
+            else:
+                stats.add_time("search", perf_counter() - searched)
+
+
+def _search_pool(
+    subproblems: list[Subproblem],
+    workers: int,
+    limit: int,
+    found: int,
+    solution: bytes | None,
+    techniques: tuple[str, ...],
+    stats: "SolveStats | None",
+    limits: Limits | None = None,
+) -> tuple[int, bytes | None]:
+    """
+    Searches the subproblems over a pool of workers, queueing the pieces sent back
+    by the workers that split their search, until `limit` solutions are found or
+    nothing is left.
+
+    Raises:
+        SolveInterrupted: If one of `limits` was reached, by this process or by
+            a worker.
+    """
+    import multiprocessing
+
+    cancelled = multiprocessing.Event()
+    outstanding = multiprocessing.RawValue("i", 0)
+    pending = set()
+    # Wake up regularly to check the deadline and the cancellation token.
+    poll = None if limits is None or (limits.deadline is None and limits.cancel is None) else SLICE_TIME
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(cancelled, outstanding, workers)
+    ) as executor:
+
+        def submit(subproblem: Subproblem):
+            state, depth = subproblem
+            timeout = max_nodes = None
+            if limits is not None:
+                timeout = limits.remaining()
+                if limits.max_nodes is not None:
+                    max_nodes = limits.max_nodes - limits.nodes
+            outstanding.value += 1
+            pending.add(
+                executor.submit(
+                    _search_subproblem,
+                    state,
+                    depth,
+                    limit - found,
+                    techniques,
+                    stats is not None,
+                    timeout,
+                    max_nodes,
+                )
+            )
+
+        try:
+            for subproblem in subproblems:
+                submit(subproblem)
+            while pending and found < limit:
+                done, _ = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    outstanding.value -= 1
+                    task_found, task_solution, rest, nodes, interrupted, task_stats = future.result()
+                    found += task_found
+                    if solution is None:
+                        solution = task_solution
+                    if stats is not None:
+                        stats.merge(task_stats)
+                    if limits is not None:
+                        limits.nodes += nodes
+                    if interrupted and found < limit:
+                        raise SolveInterrupted("the search ran out of time or nodes")
+                    if found < limit:
+                        for subproblem in rest:
+                            submit(subproblem)
+                if limits is not None and found < limit:
+                    limits.check()
+        finally:
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+    return found, solution
@@ -0,0 +1,185 @@
+"""
+Portfolio solving: racing several strategies on the same puzzle.
+
+No single configuration of the solver is fastest on every puzzle: propagation
+alone settles easy puzzles at once, while sparse ones are often done sooner by
+the extra deduction techniques or by Dancing Links. A Portfolio keeps one worker
+process per strategy, starts all of them on every puzzle, and returns the first
+definitive answer (solved, or no solution); the others are then cancelled
+through the limits of their solves (see `sudoku.limits`) and stop at their next
+check. The strategy that answered first is counted in `Portfolio.wins`, so that
+the defaults can be tuned on real traffic.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import NamedTuple
+from .puzzle import Puzzle
+from .propagation import TECHNIQUES, DEFAULT_TECHNIQUES, check_techniques
+from .solver import solve, SolverResult, BACKENDS
+
+
+class Strategy(NamedTuple):
+    """
+    A configuration of `sudoku.solver.solve` raced in a portfolio.
+
+    Attributes:
+        name: The name the strategy is reported under.
+        backend: The solver backend, one of `sudoku.solver.BACKENDS`.
+        techniques: The deduction techniques of the "propagation" backend.
+    """
+
+    name: str
+    backend: str = "propagation"
+    techniques: tuple[str, ...] = DEFAULT_TECHNIQUES
+
+
+# The default portfolio: the default solver, every deduction technique, and DLX.
+STRATEGIES = (
+    Strategy("propagation"),
+    Strategy("deductions", techniques=TECHNIQUES),
+    Strategy("dlx", backend="dlx"),
+)
+
+# The last call decided, shared with the workers: a worker's solve is cancelled
+# once the call it belongs to is.
+_decided = None
+
+
+def _init_worker(decided):
+    global _decided
+    _decided = decided
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class _Cancelled:
+    """
+    The cancellation token of a worker's solve for call `call` of a portfolio.
+    """
+
+    __slots__ = ("call",)
+
+    def __init__(self, call: int):
+        self.call = call
+
+    def is_set(self) -> bool:
+        return _decided.value >= self.call
+
+
+def _run_strategy(
+    state: bytes, strategy: Strategy, call: int, timeout: float | None
+) -> tuple[SolverResult, Puzzle]:
+    """
+    Solves a puzzle with one strategy in a worker process.
+    """
+    return solve(
+        Puzzle.from_bytes(state),
+        strategy.backend,
+        techniques=strategy.techniques,
+        timeout=timeout,
+        cancel=_Cancelled(call),
+    )
+
+
+class Portfolio:
+    """
+    A pool of worker processes, one per strategy, racing the strategies on every
+    puzzle. Use it as a context manager, or call `close()` when done.
+
+    Puzzles are solved one at a time; concurrent calls to `solve` wait their turn.
+
+    Args:
+        strategies: The strategies to race. Their names must be unique.
+
+    Attributes:
+        wins: The number of puzzles answered first by every strategy, by name.
+    """
+
+    def __init__(self, strategies: tuple[Strategy, ...] = STRATEGIES):
+        if not strategies:
+            raise ValueError("a portfolio needs at least one strategy")
+        names = [strategy.name for strategy in strategies]
+        if len(set(names)) != len(names):
+            raise ValueError(f"the strategy names are not unique: {names}")
+        for strategy in strategies:
+            if strategy.backend not in BACKENDS:
+                raise ValueError(f"unknown backend {strategy.backend!r}, expected one of {BACKENDS}")
+            check_techniques(strategy.techniques)
+        self.strategies = tuple(strategies)
+        self.wins = dict.fromkeys(names, 0)
+        self._calls = 0
+        self._lock = threading.Lock()
+        self._decided = multiprocessing.RawValue("q", 0)
+        self._executor = ProcessPoolExecutor(
+            max_workers=len(strategies), initializer=_init_worker, initargs=(self._decided,)
+        )
+        # Start every worker now rather than on the first puzzle.
+        for future in [self._executor.submit(_ping) for _ in strategies]:
+            future.result()
+
+    def solve(self, puzzle: Puzzle, timeout: float | None = None) -> tuple[SolverResult, Puzzle, str | None]:
+        """
+        Races the strategies on a puzzle.
+
+        Args:
+            puzzle: The Sudoku puzzle to be solved. It is not modified.
+            timeout: The time allowed to every strategy, in seconds.
+
+        Returns:
+            A tuple containing three elements:
+            - SOLVED, FAILURE if the puzzle has no solution, or TIMEOUT if no
+              strategy answered within `timeout`.
+            - The solved puzzle, or the puzzle as far as the winning strategy got.
+            - The name of the winning strategy, or None after a TIMEOUT.
+        """
+        state = puzzle.to_bytes()
+        with self._lock:
+            self._calls += 1
+            call = self._calls
+            futures = {
+                self._executor.submit(_run_strategy, state, strategy, call, timeout): strategy
+                for strategy in self.strategies
+            }
+            pending = set(futures)
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    # Of the strategies done at once, the first listed wins.
+                    for future in sorted(done, key=list(futures).index):
+                        result, solved = future.result()
+                        if result != SolverResult.TIMEOUT:
+                            name = futures[future].name
+                            self.wins[name] += 1
+                            return result, solved, name
+            finally:
+                self._decided.value = call
+        return SolverResult.TIMEOUT, puzzle.copy(), None
+
+    def close(self):
+        """
+        Shuts the worker pool down, cancelling the solves still running.
+        """
+        self._decided.value = self._calls
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "Portfolio":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def solve_portfolio(
+    puzzle: Puzzle, strategies: tuple[Strategy, ...] = STRATEGIES, timeout: float | None = None
+) -> tuple[SolverResult, Puzzle, str | None]:
+    """
+    Races the strategies on a single puzzle, see `Portfolio.solve`. To solve many
+    puzzles, keep a Portfolio instead, so that its workers are started only once.
+    """
+    with Portfolio(strategies) as portfolio:
+        return portfolio.solve(puzzle, timeout)
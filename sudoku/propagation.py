@@ -0,0 +1,501 @@
+from collections import deque
+from .puzzle import Puzzle
+from .cell import from_mask
+from .subsets import subset_eliminations, MAX_SUBSET_SIZE
+from .events import Event, EventKind, Observer
+from .limits import Limits, SolveInterrupted
+
+
+# The deduction techniques, from the cheapest to the most expensive:
+# - "singles": a placed value is removed from its peers, and a cell left with a
+#   single candidate is assigned it (naked singles). Always applied.
+# - "hidden_singles": a digit that fits in a single cell of a unit is placed there.
+# - "pointing": a digit confined to one row (or col) of a section is removed from
+#   the rest of that row (or col), i.e. pointing pairs and triples.
+# - "box_line": a digit confined to one section in a row or col is removed from
+#   the rest of that section (box/line reduction).
+# - "subsets": naked and hidden subsets, see `sudoku.subsets`.
+# - "x_wing": a digit confined to the same two cols in two rows is removed from
+#   the rest of those cols, and likewise with rows and cols swapped.
+TECHNIQUES = ("singles", "hidden_singles", "pointing", "box_line", "subsets", "x_wing")
+
+# The techniques applied unless asked otherwise. Intersections and X-wings spare
+# a few guesses, but on typical puzzles they cost more time than the guesses.
+DEFAULT_TECHNIQUES = ("singles", "hidden_singles", "subsets")
+
+
+def check_techniques(techniques: tuple[str, ...]):
+    """
+    Raises ValueError if `techniques` names anything but TECHNIQUES.
+    """
+    unknown = [t for t in techniques if t not in TECHNIQUES]
+    if unknown:
+        raise ValueError(f"unknown techniques {unknown}, expected some of {TECHNIQUES}")
+
+
+class Propagator:
+    """
+    Incremental, worklist-driven constraint propagation over a Puzzle.
+
+    The deductions are a pipeline of the configured TECHNIQUES, each driven by its
+    own queue: cells whose value still has to be removed from their peers, then,
+    for every unit technique, the units it has yet to examine, then a flag for
+    the whole-grid X-wing search. A change queues the affected units for the
+    cheapest unit technique, and every technique passes the units it examined on
+    to the next one. The cheapest technique with queued work always runs first,
+    so the pipeline falls back to the cheap techniques as soon as an expensive one
+    makes progress, and an expensive technique only looks at a unit once the
+    cheap ones are done with it. `propagate()` returns as soon as every queue is
+    empty.
+
+    The propagator updates the puzzle's value and candidate arrays in place,
+    and the unit counts of `Puzzle.is_valid()` once it has been called.
+    Every change is recorded on a trail first, so a search can take a `mark()`
+    before a guess and `undo()` back to it instead of copying the puzzle.
+
+    A few counters are kept for `sudoku.stats.SolveStats`: the candidates removed
+    by each technique (in the order of TECHNIQUES in `eliminated`), the number of
+    subset searches, and how often each largest subset size was tried
+    (`subset_sizes`).
+
+    The unit and peer tables are those of the puzzle's size, see
+    `sudoku.units.geometry`.
+
+    If `limits` is set (see `sudoku.limits`), they are checked before every unit
+    is examined, and `propagate()` raises SolveInterrupted once one is reached.
+
+    Args:
+        puzzle: The puzzle to work on.
+        techniques: The techniques to apply, some of TECHNIQUES; "singles" is
+            applied whether listed or not.
+    """
+
+    __slots__ = (
+        "puzzle",
+        "trail",
+        "techniques",
+        "limits",
+        "eliminated",
+        "subset_calls",
+        "subset_sizes",
+        "_values",
+        "_masks",
+        "_cells",
+        "_levels",
+        "_fish",
+        "_unit_cells",
+        "_cell_units",
+        "_peers",
+        "_intersections",
+        "_lines",
+        "_size",
+        "_all",
+    )
+
+    def __init__(self, puzzle: Puzzle, techniques: tuple[str, ...] = DEFAULT_TECHNIQUES):
+        check_techniques(techniques)
+        self.puzzle = puzzle
+        self.techniques = tuple(t for t in TECHNIQUES if t == "singles" or t in techniques)
+        self.trail = []
+        self.limits: Limits | None = None
+        self.eliminated = [0] * len(TECHNIQUES)
+        self.subset_calls = 0
+        self.subset_sizes = [0] * (MAX_SUBSET_SIZE + 1)
+        self._values = puzzle._values
+        self._masks = puzzle._masks
+        self._cells = deque()
+        g = puzzle._geometry
+        self._unit_cells = g.units
+        self._cell_units = g.cell_units
+        self._peers = g.peers
+        self._intersections = g.intersections
+        self._lines = (g.rows, g.cols)
+        self._size = g.size
+        self._all = g.all_candidates
+
+        # Every unit technique has a queue of units, a flag per unit telling whether
+        # it is queued, and the queue and flags of the next technique, if any.
+        reducers = []
+        if "hidden_singles" in techniques:
+            reducers.append(self._hidden_singles)
+        if "pointing" in techniques or "box_line" in techniques:
+            reducers.append(self._intersect)
+        if "subsets" in techniques:
+            reducers.append(self._subsets)
+        levels = []
+        following = None
+        for reduce in reversed(reducers):
+            queue = deque()
+            dirty = bytearray(len(g.units))
+            levels.append((queue, dirty, reduce, following))
+            following = (queue, dirty)
+        self._levels = tuple(reversed(levels))
+        self._fish = False
+
+    def load(self):
+        """
+        Queues every known value and every unit, so that the next `propagate()`
+        brings the whole puzzle to a fixpoint.
+        """
+        values = self._values
+        masks = self._masks
+        for i in range(len(values)):
+            if values[i]:
+                masks[i] = 1 << (values[i] - 1)
+                self._cells.append(i)
+        if self._levels:
+            queue, dirty, _, _ = self._levels[0]
+            for u in range(len(self._unit_cells)):
+                if not dirty[u]:
+                    dirty[u] = 1
+                    queue.append(u)
+        self._fish = True
+
+    def assign(self, i: int, digit: int) -> bool:
+        """
+        Assigns `digit` to cell `i`.
+
+        Returns:
+            False if the digit is not a candidate of the cell, True otherwise.
+        """
+        bit = 1 << (digit - 1)
+        if not self._masks[i] & bit:
+            return False
+        if self._values[i]:
+            return self._values[i] == digit
+        self.trail.append((i, 0, self._masks[i]))
+        if self.puzzle._counts is None:
+            self._values[i] = digit
+        else:
+            self.puzzle._place(i, digit)
+        self._masks[i] = bit
+        self._cells.append(i)
+        self._touch(i)
+        return True
+
+    def eliminate(self, i: int, bits: int) -> bool:
+        """
+        Removes the candidates in `bits` from cell `i`. A cell left with a single
+        candidate is assigned that value.
+
+        Returns:
+            False if the cell is left without candidates, True otherwise.
+        """
+        mask = self._masks[i]
+        if not mask & bits:
+            return True
+        self.trail.append((i, self._values[i], mask))
+        mask &= ~bits
+        self._masks[i] = mask
+        if not mask:
+            return False
+        if not self._values[i] and not mask & (mask - 1):
+            if self.puzzle._counts is None:
+                self._values[i] = mask.bit_length()
+            else:
+                self.puzzle._place(i, mask.bit_length())
+            self._cells.append(i)
+        self._touch(i)
+        return True
+
+    def mark(self) -> int:
+        """
+        Returns the current trail position, to be passed to `undo()`.
+        """
+        return len(self.trail)
+
+    def undo(self, mark: int):
+        """
+        Restores every cell changed since `mark` was taken.
+        """
+        trail = self.trail
+        values = self._values
+        masks = self._masks
+        if self.puzzle._counts is not None:
+            place = self.puzzle._place
+            while len(trail) > mark:
+                i, value, mask = trail.pop()
+                place(i, value)
+                masks[i] = mask
+            return
+        while len(trail) > mark:
+            i, value, mask = trail.pop()
+            values[i] = value
+            masks[i] = mask
+
+    def propagate(self) -> bool:
+        """
+        Runs until no queued work is left.
+
+        Every value placed is removed from the candidates of its peers, so a value
+        repeated within a unit, given or deduced, empties a cell and is reported
+        as a contradiction. A puzzle at a fixpoint is therefore always valid, and
+        callers need not check `Puzzle.is_valid()` again.
+
+        Returns:
+            False if a contradiction was found, True otherwise.
+        """
+        values = self._values
+        masks = self._masks
+        cells = self._cells
+        levels = self._levels
+        peers = self._peers
+        x_wing = "x_wing" in self.techniques
+        limits = self.limits
+        removed = 0
+        try:
+            while True:
+                while cells:
+                    i = cells.popleft()
+                    bit = 1 << (values[i] - 1)
+                    for peer in peers[i]:
+                        if masks[peer] & bit:
+                            removed += 1
+                            if not self.eliminate(peer, bit):
+                                self._clear()
+                                return False
+                if limits is not None:
+                    try:
+                        limits.check()
+                    except SolveInterrupted:
+                        self._clear()
+                        raise
+                for queue, dirty, reduce, following in levels:
+                    if queue:
+                        u = queue.popleft()
+                        dirty[u] = 0
+                        consistent = reduce(u)
+                        if following is not None:
+                            later, flags = following
+                            if not flags[u]:
+                                flags[u] = 1
+                                later.append(u)
+                        break
+                else:
+                    if not (x_wing and self._fish):
+                        return True
+                    self._fish = False
+                    consistent = self._x_wing()
+                if not consistent:
+                    self._clear()
+                    return False
+        finally:
+            self.eliminated[0] += removed
+
+    def _touch(self, i: int):
+        self._fish = True
+        if self._levels:
+            queue, dirty, _, _ = self._levels[0]
+            for u in self._cell_units[i]:
+                if not dirty[u]:
+                    dirty[u] = 1
+                    queue.append(u)
+
+    def _clear(self):
+        self._cells.clear()
+        for queue, dirty, _, _ in self._levels:
+            queue.clear()
+            dirty[:] = bytes(len(dirty))
+        self._fish = False
+
+    def _hidden_singles(self, u: int) -> bool:
+        """
+        Places the digits that fit in a single cell of unit `u`.
+
+        Returns:
+            False if a contradiction was found, True otherwise.
+        """
+        values = self._values
+        masks = self._masks
+        placed = once = twice = 0
+        unsolved = []
+        for i in self._unit_cells[u]:
+            mask = masks[i]
+            if values[i]:
+                placed |= mask
+            else:
+                twice |= once & mask
+                once |= mask
+                unsolved.append(i)
+        if (placed | once) != self._all:
+            return False
+        singles = once & ~twice & ~placed
+        if singles:
+            for i in unsolved:
+                bit = masks[i] & singles
+                if bit:
+                    if bit & (bit - 1):
+                        return False
+                    self.eliminated[1] += masks[i].bit_count() - 1
+                    if not self.assign(i, bit.bit_length()):
+                        return False
+        return True
+
+    def _intersect(self, u: int) -> bool:
+        """
+        Applies pointing to section `u`, or box/line reduction to row or col `u`:
+        a digit whose candidates in the unit all lie in the segment shared with
+        one crossing unit is removed from the rest of that crossing unit.
+
+        Returns:
+            False if a contradiction was found, True otherwise.
+        """
+        technique = 2 if u < self._size else 3
+        if TECHNIQUES[technique] not in self.techniques:
+            return True
+        values = self._values
+        masks = self._masks
+        for partition in self._intersections[u]:
+            segments = []
+            once = twice = 0
+            for cells, _ in partition:
+                segment = 0
+                for i in cells:
+                    if not values[i]:
+                        segment |= masks[i]
+                segments.append(segment)
+                twice |= once & segment
+                once |= segment
+            # The digits found in a single segment.
+            confined = once & ~twice
+            if not confined:
+                continue
+            for segment, (_, targets) in zip(segments, partition):
+                bits = segment & confined
+                if bits:
+                    for i in targets:
+                        if masks[i] & bits:
+                            self.eliminated[technique] += (masks[i] & bits).bit_count()
+                            if not self.eliminate(i, bits):
+                                return False
+        return True
+
+    def _subsets(self, u: int) -> bool:
+        """
+        Applies naked/hidden subset elimination to unit `u`.
+
+        Returns:
+            False if a contradiction was found, True otherwise.
+        """
+        values = self._values
+        masks = self._masks
+        unsolved = [i for i in self._unit_cells[u] if not values[i]]
+        if len(unsolved) < 2:
+            return True
+        self.subset_calls += 1
+        self.subset_sizes[min(MAX_SUBSET_SIZE, len(unsolved) // 2)] += 1
+        eliminations = subset_eliminations(tuple(masks[i] for i in unsolved))
+        if eliminations is None:
+            return False
+        for j, bits in eliminations:
+            i = unsolved[j]
+            self.eliminated[4] += (masks[i] & bits).bit_count()
+            if not self.eliminate(i, bits):
+                return False
+        return True
+
+    def _x_wing(self) -> bool:
+        """
+        Looks for an X-wing over the whole grid, and applies the first one that
+        removes any candidate; the cheaper techniques run again before the next.
+
+        Returns:
+            False if a contradiction was found, True otherwise.
+        """
+        values = self._values
+        masks = self._masks
+        for lines, crossing in (self._lines, self._lines[::-1]):
+            # The lines in which each digit fits in exactly two cells, by digit and
+            # the positions of those cells along the line.
+            pairs = {}
+            for k, line in enumerate(lines):
+                once = twice = thrice = 0
+                for i in line:
+                    if not values[i]:
+                        mask = masks[i]
+                        thrice |= twice & mask
+                        twice |= once & mask
+                        once |= mask
+                two = twice & ~thrice
+                while two:
+                    bit = two & -two
+                    two ^= bit
+                    where = 0
+                    for j, i in enumerate(line):
+                        if masks[i] & bit:
+                            where |= 1 << j
+                    other = pairs.setdefault((bit, where), k)
+                    if other == k:
+                        continue
+                    # The digit lies in lines `other` and `k`, at the same two
+                    # positions, so nowhere else in the two crossing lines.
+                    removed = 0
+                    j = 0
+                    while where:
+                        if where & 1:
+                            for at, i in enumerate(crossing[j]):
+                                if at != k and at != other and masks[i] & bit:
+                                    removed += 1
+                                    if not self.eliminate(i, bit):
+                                        self.eliminated[5] += removed
+                                        return False
+                        where >>= 1
+                        j += 1
+                    if removed:
+                        self.eliminated[5] += removed
+                        return True
+        return True
+
+
+class ObservedPropagator(Propagator):
+    """
+    A Propagator that reports every candidate it removes to an observer, as an
+    ELIMINATION event. Kept apart from Propagator so that unobserved solves pay
+    nothing for it.
+    """
+
+    __slots__ = ("observer", "depth", "iteration")
+
+    def __init__(self, puzzle: Puzzle, observer: Observer, techniques: tuple[str, ...] = DEFAULT_TECHNIQUES):
+        super().__init__(puzzle, techniques)
+        self.observer = observer
+        self.depth = 0
+        self.iteration = 0
+
+    def _report(self, i: int, before: int):
+        removed = before & ~self._masks[i]
+        if removed:
+            self.observer(
+                Event(
+                    EventKind.ELIMINATION,
+                    self.puzzle,
+                    self.puzzle._geometry.positions[i],
+                    frozenset(from_mask(removed)),
+                    self.depth,
+                    self.iteration,
+                )
+            )
+
+    def assign(self, i: int, digit: int) -> bool:
+        before = self._masks[i]
+        consistent = super().assign(i, digit)
+        self._report(i, before)
+        return consistent
+
+    def eliminate(self, i: int, bits: int) -> bool:
+        before = self._masks[i]
+        consistent = super().eliminate(i, bits)
+        self._report(i, before)
+        return consistent
+
+
+def make_propagator(
+    puzzle: Puzzle, observer: Observer | None = None, techniques: tuple[str, ...] = DEFAULT_TECHNIQUES
+) -> Propagator:
+    """
+    Returns a Propagator for `puzzle` applying `techniques`, reporting to `observer`
+    if one is given.
+    """
+    if observer is None:
+        return Propagator(puzzle, techniques)
+    return ObservedPropagator(puzzle, observer, techniques)
@@ -1,121 +1,316 @@
-from .cell import Cell
-from copy import deepcopy
+import struct
+import sys
+from array import array
+from .cell import Cell, CellView, ALL_CANDIDATES, to_mask, from_mask
 from .tile import Tile, Tiles
+from .units import geometry
 from typing import Generator
 
+# The binary state format of `Puzzle.to_bytes`, all integers little-endian: an
+# 8-byte header (the magic b"SDKP", the format version, the box size, the width
+# of a candidate mask in bytes, and a reserved byte), then one value byte per cell
+# (0 for empty), then one candidate mask per cell.
+STATE_MAGIC = b"SDKP"
+STATE_VERSION = 1
+
+_STATE_HEADER = struct.Struct("<4sBBBx")
+
+# The typecode of the masks as stored: 2 bytes up to 16 digits, 4 bytes above.
+_STATE_TYPECODES = {2: "H", 4: "I"}
+
+_BYTES = bytes(range(256))
+
 class Puzzle:
-    def __init__(self):
-        self._cells = [[Cell() for _ in range(9)] for _ in range(9)]
+    """
+    A Sudoku grid stored as one value plus one candidate bitmask per cell.
+
+    The grid is made of `box` x `box` sections of `box` x `box` cells, so a
+    standard 9x9 puzzle has box 3; see `sudoku.units.BOX_SIZES`. Values live in
+    a flat bytearray (0 means empty) and candidates in an array of masks wide
+    enough for every digit, indexed by `row * size + col`. Indexing the puzzle
+    returns a CellView, a Cell that reads and writes these arrays directly, or
+    the Cell last assigned there, which is bound to them the same way.
+
+    Once `is_valid()` has been called, the puzzle also counts how often every
+    value occurs in every unit, and how many of those occurrences are repeats.
+    Values written through the puzzle, its cells or a Propagator keep the counts
+    up to date; code writing `_values` directly must go through `_place()`.
+    """
+
+    __slots__ = ("_values", "_masks", "_geometry", "_cells", "_counts", "_conflicts")
+
+    def __init__(self, box: int = 3):
+        g = geometry(box)
+        self._geometry = g
+        self._values = bytearray(g.cells)
+        self._masks = array(g.typecode, [g.all_candidates]) * g.cells
+        # The Cells bound by assignment, by index, or None if there are none.
+        self._cells = None
+        # The occurrences of every value in every unit, at `unit * (size + 1) + value`,
+        # and the number of repeats among them, or None until `is_valid()` is called.
+        self._counts = None
+        self._conflicts = 0
+
+    @property
+    def box(self) -> int:
+        return self._geometry.box
+
+    @property
+    def size(self) -> int:
+        return self._geometry.size
 
     def print(self):  # pragma: no cover
-        for i in range(9):
+        from .puzzle_file import DIGITS
+
+        box = self._geometry.box
+        n = self._geometry.size
+        for i in range(n):
             # Build the row string with spaces between cells
             row_parts = []
-            for j in range(9):
-                cell_value = (
-                    str(self._cells[i][j].value) if self._cells[i][j].value else "."
-                )
-                row_parts.append(cell_value)
+            for j in range(n):
+                cell_value = self._values[i * n + j]
+                row_parts.append(DIGITS[cell_value - 1] if cell_value else ".")
 
-            # Print horizontal separator before 3rd and 6th rows
-            if i % 3 == 0 and i != 0:
-                print("  ------+-------+------")
+            # Print a horizontal separator between bands
+            if i % box == 0 and i != 0:
+                print("  " + "+".join(["-" * (2 * box + 1)] * box)[1:-1])
 
-            # Print the row with vertical separators
+            # Print the row with vertical separators between stacks
             print(
-                "  "
-                + " ".join(row_parts[0:3])
-                + " | "
-                + " ".join(row_parts[3:6])
-                + " | "
-                + " ".join(row_parts[6:9])
+                "  " + " | ".join(" ".join(row_parts[k : k + box]) for k in range(0, n, box))
             )
 
-    def __getitem__(self, index: tuple[int, int]):
-        return self._cells[index[0]][index[1]]
+    def _cell(self, i: int) -> Cell:
+        if self._cells is not None and i in self._cells:
+            return self._cells[i]
+        return CellView(self, i)
+
+    def __getitem__(self, index: tuple[int, int]) -> Cell:
+        return self._cell(index[0] * self._geometry.size + index[1])
 
     def __setitem__(self, index: tuple[int, int], value: Cell):
-        self._cells[index[0]][index[1]] = value
+        """
+        Sets a cell to the value and candidates of `value`. A Cell that is not
+        bound to a puzzle yet is bound to this cell, see `Cell`; others are copied.
+        A Cell created without candidates gets every digit of this grid.
+        """
+        g = self._geometry
+        i = index[0] * g.size + index[1]
+        if self._cells is not None and i in self._cells:
+            self._cells.pop(i)._unbind()
+        mask = to_mask(value.possible_values)
+        if value._puzzle is None and value._default and mask == ALL_CANDIDATES:
+            mask = g.all_candidates
+        self._place(i, value.value or 0)
+        self._masks[i] = mask
+        if value._puzzle is None:
+            value._bind(self, i)
+            if self._cells is None:
+                self._cells = {}
+            self._cells[i] = value
 
     def __eq__(self, other: "Puzzle"):
-        for row in range(9):
-            for col in range(9):
-                if self._cells[row][col] != other._cells[row][col]:
-                    return False
-        return True
+        return self._values == other._values and self._masks == other._masks
+
+    def _tiles(self, unit: tuple[int, ...]) -> Tiles:
+        positions = self._geometry.positions
+        return [Tile(positions[i], self._cell(i)) for i in unit]
 
     def sections(self) -> Generator[Tiles, None, None]:
-        section_x = [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
-        section_y = [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
-        for i in range(9):
-            result = []
-            row = i // 3
-            col = i - row * 3
-            for r in section_x[row]:
-                for c in section_y[col]:
-                    result.append(Tile((r, c), self._cells[r][c]))
-            yield result        
+        for unit in self._geometry.sections:
+            yield self._tiles(unit)
 
     def rows(self) -> Generator[Tiles, None, None]:
-        for r in range(9):
-            result = []
-            for c in range(9):
-                result.append(Tile((r, c), self._cells[r][c]))
-            yield result
+        for unit in self._geometry.rows:
+            yield self._tiles(unit)
 
     def cols(self) -> Generator[Tiles, None, None]:
-        for c in range(9):
-            result = []
-            for r in range(9):
-                result.append(Tile((r, c), self._cells[r][c]))
-            yield result
+        for unit in self._geometry.cols:
+            yield self._tiles(unit)
+
+    def copy(self) -> "Puzzle":
+        result = Puzzle.__new__(Puzzle)
+        result._geometry = self._geometry
+        result._values = bytearray(self._values)
+        result._masks = array(self._masks.typecode, self._masks)
+        result._cells = None
+        result._counts = None if self._counts is None else bytearray(self._counts)
+        result._conflicts = self._conflicts
+        return result
 
-    def copy(self):
-        return deepcopy(self)
+    __copy__ = copy
+
+    def state_size(self) -> int:
+        """
+        The number of bytes of `to_bytes()`.
+        """
+        g = self._geometry
+        return _STATE_HEADER.size + g.cells * (1 + _mask_width(g.size))
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the values and candidates in a fixed, versioned layout, see
+        STATE_MAGIC. The result depends only on the grid size, so it can be sent
+        through pipes or written into shared memory as is.
+        """
+        g = self._geometry
+        width = _mask_width(g.size)
+        masks = self._masks
+        if masks.itemsize != width:
+            masks = array(_STATE_TYPECODES[width], masks)
+        if sys.byteorder == "big":
+            masks = array(masks.typecode, masks)
+            masks.byteswap()
+        return _STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, g.box, width) + self._values + masks.tobytes()
+
+    def pack_into(self, buffer, offset: int = 0) -> int:
+        """
+        Writes `to_bytes()` into a writable buffer, e.g. the buffer of a
+        `multiprocessing.shared_memory.SharedMemory`, at `offset`.
+
+        Returns:
+            The offset just past what was written.
+        """
+        state = self.to_bytes()
+        end = offset + len(state)
+        memoryview(buffer)[offset:end] = state
+        return end
+
+    @classmethod
+    def from_bytes(cls, data, offset: int = 0) -> "Puzzle":
+        """
+        Decodes a puzzle written by `to_bytes()` from any bytes-like object, such as
+        bytes, a memoryview or a memory map, starting at `offset`.
+
+        Raises:
+            ValueError: If the data is not a puzzle state of a known version, or
+                holds values out of range for its grid size.
+        """
+        view = memoryview(data).cast("B")
+        if len(view) < offset + _STATE_HEADER.size:
+            raise ValueError("truncated puzzle state")
+        magic, version, box, width = _STATE_HEADER.unpack_from(view, offset)
+        if magic != STATE_MAGIC:
+            raise ValueError("not a puzzle state")
+        if version != STATE_VERSION:
+            raise ValueError(f"unsupported puzzle state version {version}, expected {STATE_VERSION}")
+        g = geometry(box)
+        if width != _mask_width(g.size):
+            raise ValueError(f"bad mask width {width} for a grid of size {g.size}")
+        start = offset + _STATE_HEADER.size
+        end = start + g.cells * (1 + width)
+        if len(view) < end:
+            raise ValueError("truncated puzzle state")
+
+        result = cls.__new__(cls)
+        result._geometry = g
+        result._values = bytearray(view[start : start + g.cells])
+        masks = array(_STATE_TYPECODES[width])
+        masks.frombytes(view[start + g.cells : end])
+        if sys.byteorder == "big":
+            masks.byteswap()
+        if masks.typecode != g.typecode:
+            masks = array(g.typecode, masks)
+        result._masks = masks
+        result._cells = None
+        result._counts = None
+        result._conflicts = 0
+        if result._values.translate(None, _BYTES[: g.size + 1]):
+            raise ValueError("puzzle state has values out of range")
+        return result
+
+    def __reduce__(self):
+        # Pickles, e.g. for worker processes, go through the compact state instead
+        # of the shared index tables.
+        return Puzzle.from_bytes, (self.to_bytes(),)
+
+    def __deepcopy__(self, memo) -> "Puzzle":
+        return self.copy()
 
     def print_unsolved_values(self):
-        for row in range(9):
-            for col in range(9):
-                if not self._cells[row][col].value:
-                    print(
-                        f"Cell ({row}, {col}) has possible values {self._cells[row][col].possible_values}"
-                    )
+        n = self._geometry.size
+        for i in range(self._geometry.cells):
+            if not self._values[i]:
+                print(
+                    f"Cell ({i // n}, {i % n}) has possible values {from_mask(self._masks[i])}"
+                )
 
     def get_unsolved_cells(self) -> Tiles:
+        positions = self._geometry.positions
         unsolved_cells = []
-        for row in range(9):
-            for col in range(9):
-                if not self._cells[row][col].value:
-                    unsolved_cells.append(Tile((row, col), self._cells[row][col]))
+        for i in range(self._geometry.cells):
+            if not self._values[i]:
+                unsolved_cells.append(Tile(positions[i], self._cell(i)))
         return unsolved_cells
 
     def update_single_possible_values(self):
-        for row in range(9):
-            for col in range(9):
-                if len(self._cells[row][col].possible_values) == 1:
-                    self._cells[row][col].value = next(
-                        iter(self._cells[row][col].possible_values)
-                    )
+        masks = self._masks
+        for i in range(self._geometry.cells):
+            mask = masks[i]
+            if mask.bit_count() == 1:
+                self._place(i, mask.bit_length())
 
     def is_solved(self) -> bool:
-        for row in range(9):
-            for col in range(9):
-                if not self._cells[row][col].value:
+        return 0 not in self._values
+
+    def _is_valid_group(self, tiles: Tiles) -> bool:
+        seen = 0
+        for tile in tiles:
+            if tile.cell.value is not None:
+                bit = 1 << (tile.cell.value - 1)
+                if seen & bit:
                     return False
+                seen |= bit
         return True
 
-    def _is_valid_group(self, tiles: Tiles) -> bool:
-        values = [tile.cell.value for tile in tiles if tile.cell.value is not None]
-        return len(values) == len(set(values))
-        
     def is_valid(self) -> bool:
-        for section in self.sections():
-            if not self._is_valid_group(section):
-                return False
-        for row in self.rows():
-            if not self._is_valid_group(row):
-                return False
-        for col in self.cols():
-            if not self._is_valid_group(col):
-                return False
-        return True
\ No newline at end of file
+        """
+        Whether no value is repeated within a unit. The first call counts the
+        values of every unit; from then on the counts follow every write, so this
+        only checks that there are no repeats.
+        """
+        if self._counts is None:
+            self._count_values()
+        return not self._conflicts
+
+    def _count_values(self):
+        g = self._geometry
+        stride = g.size + 1
+        values = self._values
+        counts = bytearray(len(g.units) * stride)
+        conflicts = 0
+        for u, unit in enumerate(g.units):
+            for i in unit:
+                if values[i]:
+                    k = u * stride + values[i]
+                    if counts[k]:
+                        conflicts += 1
+                    counts[k] += 1
+        self._counts = counts
+        self._conflicts = conflicts
+
+    def _place(self, i: int, value: int):
+        """
+        Writes the value of cell `i`, 0 for empty, keeping the unit counts of
+        `is_valid()` up to date.
+        """
+        counts = self._counts
+        old = self._values[i]
+        if counts is not None and old != value:
+            stride = self._geometry.size + 1
+            for u in self._geometry.cell_units[i]:
+                if old:
+                    k = u * stride + old
+                    counts[k] -= 1
+                    if counts[k]:
+                        self._conflicts -= 1
+                if value:
+                    k = u * stride + value
+                    if counts[k]:
+                        self._conflicts += 1
+                    counts[k] += 1
+        self._values[i] = value
+
+
+def _mask_width(size: int) -> int:
+    return 2 if size <= 16 else 4
@@ -1,15 +1,172 @@
+import sys
+from contextlib import contextmanager
+from math import isqrt
+from typing import Iterator, TextIO
 from .puzzle import Puzzle
+from .units import BOX_SIZES
+
+EMPTY = "x.0"
+
+# The characters of the digits 1 to 25, as used in one-character-per-cell formats:
+# "1" to "9", then "A" for 10 up to "P" for 25 (lower case is accepted too).
+DIGITS = "123456789ABCDEFGHIJKLMNOP"
+
+_DIGIT_VALUES = {ch: v for v, ch in enumerate(DIGITS, 1)} | {
+    ch.lower(): v for v, ch in enumerate(DIGITS, 1) if ch.isalpha()
+}
+
+# The box size of the grid written as a single line of every length.
+LINE_LENGTHS = {box**4: box for box in BOX_SIZES}
+
+
+def _cell_value(text: str, size: int) -> int:
+    """
+    Returns the value of one cell written as a character or a token, 0 if empty.
+    """
+    if len(text) == 1 and text in EMPTY:
+        return 0
+    value = int(text) if text.isdigit() else _DIGIT_VALUES.get(text, 0)
+    if not 1 <= value <= size:
+        raise ValueError(f"format error, [{text}] is not a digit of a {size}x{size} puzzle")
+    return value
 
 
 def read_puzzle(filename: str) -> Puzzle:
-    puzzle = Puzzle()
+    """
+    Reads a puzzle written as a grid, one line per row.
+
+    A row is either one character per cell, as in `parse_puzzle`, or
+    space-separated numbers, with ".", "0" or "x" for empty cells, which suits
+    16x16 and 25x25 puzzles. The size of the grid is given by its first row;
+    blank lines and lines after the last row are ignored.
+    """
     with open(filename, "r") as f:
-        for i, line in enumerate(f):
-            line = line.strip()
-            if len(line) != 9 and i < 9:
-                raise ValueError(f"format error in line {i}, content is [{line}]")
-            for j, value_str in enumerate(line):
-                if value_str != "x" and value_str != ".":
-                    puzzle[i, j].set_value(int(value_str))
+        lines = [line.strip() for line in f if line.strip()]
+    rows = [line.split() if " " in line or "\t" in line else list(line) for line in lines]
+    size = len(rows[0]) if rows else 0
+    box = isqrt(size)
+    if box * box != size or box not in BOX_SIZES or len(rows) < size:
+        raise ValueError(f"format error, expected a grid of 4, 9, 16 or 25 rows, got {len(rows)} rows of {size}")
+
+    puzzle = Puzzle(box)
+    for i, row in enumerate(rows[:size]):
+        if len(row) != size:
+            raise ValueError(f"format error in line {i}, content is [{lines[i]}]")
+        for j, text in enumerate(row):
+            value = _cell_value(text, size)
+            if value:
+                puzzle[i, j].set_value(value)
 
     return puzzle
+
+
+def parse_puzzle(line: str) -> Puzzle:
+    """
+    Parses a puzzle written as a single line, row by row, one character per cell.
+
+    Args:
+        line: 81 characters for a 9x9 puzzle, or 16, 256 or 625 for the other
+            sizes: the characters of DIGITS for filled cells, and ".", "0" or "x"
+            for empty cells.
+
+    Returns:
+        The parsed puzzle.
+    """
+    box = LINE_LENGTHS.get(len(line))
+    if box is None:
+        raise ValueError(f"format error, expected 16, 81, 256 or 625 characters, content is [{line}]")
+    puzzle = Puzzle(box)
+    size = puzzle.size
+    values = puzzle._values
+    masks = puzzle._masks
+    for i, value_str in enumerate(line):
+        if value_str not in EMPTY:
+            value = _DIGIT_VALUES.get(value_str, 0)
+            if not 1 <= value <= size:
+                raise ValueError(f"format error, [{value_str}] is not a digit, content is [{line}]")
+            values[i] = value
+            masks[i] = 1 << (value - 1)
+    return puzzle
+
+
+def format_puzzle(puzzle: Puzzle) -> str:
+    """
+    Writes a puzzle as a single line, one character per cell, with "." for empty cells.
+    """
+    return "".join(DIGITS[v - 1] if v else "." for v in puzzle._values)
+
+
+def format_grid(puzzle: Puzzle, tokens: bool = False) -> str:
+    """
+    Writes a puzzle as a grid that `read_puzzle` reads back, one line per row.
+
+    Args:
+        puzzle: The puzzle.
+        tokens: Write space-separated numbers instead of one character per cell.
+    """
+    n = puzzle.size
+    values = puzzle._values
+    if tokens:
+        width = len(str(n))
+        cells = [str(v).rjust(width) if v else ".".rjust(width) for v in values]
+        return "\n".join(" ".join(cells[r * n : r * n + n]) for r in range(n)) + "\n"
+    line = format_puzzle(puzzle)
+    return "\n".join(line[r * n : r * n + n] for r in range(n)) + "\n"
+
+
+@contextmanager
+def open_source(source: str):
+    """
+    Opens a puzzle file for reading, or standard input when `source` is "-".
+    """
+    if source == "-":
+        yield sys.stdin
+    else:
+        with open(source, "r") as f:
+            yield f
+
+
+def iter_puzzle_lines(f: TextIO) -> Iterator[str]:
+    """
+    Lazily reads the puzzles of a multi-puzzle file, each as a single line.
+
+    A puzzle is either a line of 81 characters (as in the sudoku17 list), or the
+    first comma-separated field of such a line (as in the Kaggle CSV files, whose
+    header line is skipped), or a grid of 9 lines of 9 characters. Single lines of
+    16, 256 and 625 characters are read as 4x4, 16x16 and 25x25 puzzles. Blank
+    lines and lines starting with "#" are ignored.
+
+    Args:
+        f: The open file.
+
+    Yields:
+        The puzzles, in file order.
+    """
+    rows = []
+    for i, line in enumerate(f):
+        field = line.split(",", 1)[0].strip()
+        if not field or field.startswith("#"):
+            continue
+        if len(field) in LINE_LENGTHS and not rows:
+            yield field
+        elif len(field) == 9:
+            rows.append(field)
+            if len(rows) == 9:
+                yield "".join(rows)
+                rows = []
+        elif i == 0 and "," in line:
+            continue
+        else:
+            raise ValueError(f"format error in line {i}, content is [{line.strip()}]")
+    if rows:
+        raise ValueError(f"format error, incomplete puzzle with {len(rows)} lines at end of file")
+
+
+def iter_puzzles(source: str) -> Iterator[Puzzle]:
+    """
+    Lazily reads every puzzle of a multi-puzzle file, or of standard input when
+    `source` is "-". See `iter_puzzle_lines` for the accepted formats.
+    """
+    with open_source(source) as f:
+        for line in iter_puzzle_lines(f):
+            yield parse_puzzle(line)
@@ -0,0 +1,305 @@
+"""
+A long-lived solve server, so that callers do not pay for a process start and the
+imports on every puzzle.
+
+The server listens on a local TCP or Unix socket. A client sends one request per
+line and gets one reply per line, in request order, and may send more requests
+before reading the replies. A request is either:
+
+- a puzzle as a single line (81 characters for a 9x9 puzzle, or 16, 256 or 625
+  for the other sizes, see `sudoku.puzzle_file.parse_puzzle`), answered with the
+  solved grid, with the puzzle itself if it has no solution (as the batch command
+  does), with "timeout", or with "error: " and a message; or
+- a JSON object, {"puzzle": "...", "id": ..., "timeout": seconds}, where only the
+  puzzle is required, answered with a JSON object: the id, the "result" (the
+  lower-case name of the SolverResult, "timeout" or "error"), and the "solution"
+  or the "error" message.
+
+Requests from every connection are queued and handed to a pool of worker processes
+in micro-batches: a batch leaves as soon as a worker is free, with every request
+queued by then, so a batch holds one puzzle when the server is idle and grows
+with the load. The queue is bounded; when it is full the server stops reading
+from its clients until there is room again.
+
+A worker is given the latest deadline of its batch as the time limit of the
+whole batch: every puzzle gets only the time left (see `sudoku.limits`), and the
+puzzles not started by then are answered "timeout". So puzzles that take too
+long do not hold up the worker past the deadlines of the requests waiting for it.
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .puzzle_file import EMPTY, DIGITS, LINE_LENGTHS
+from .solver import solve, SolverResult, BACKENDS
+from .batch import _solve_chunk
+
+# The characters allowed in a puzzle line, by its length.
+_CHARACTERS = {
+    length: frozenset(DIGITS[: box * box] + DIGITS[9 : box * box].lower() + EMPTY)
+    for length, box in LINE_LENGTHS.items()
+}
+_WARM_UP = ".91..82..8...93.6..5.27.83........75.6731...498..4.6..6.95..12......9456215.6...3"
+
+
+def _warm_up():
+    """
+    Runs in every worker as it starts, so that the first request it gets does not
+    pay for the imports and the first solve.
+    """
+    from .puzzle_file import parse_puzzle
+
+    solve(parse_puzzle(_WARM_UP))
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def check_line(line: str):
+    """
+    Raises ValueError if `line` is not a puzzle written as a single line.
+    """
+    characters = _CHARACTERS.get(len(line))
+    if characters is None:
+        raise ValueError(f"expected 16, 81, 256 or 625 characters, got {len(line)}: [{line[:100]}]")
+    if not characters.issuperset(line):
+        raise ValueError(f"expected the digits of a {len(line)}-cell grid, '.', '0' or 'x', got [{line[:100]}]")
+
+
+class SolveServer:
+    """
+    The solve server, see the module docstring for the protocol.
+
+    Args:
+        jobs: The number of worker processes; defaults to the number of CPUs.
+        batch_size: The largest number of puzzles handed to a worker at a time.
+        max_pending: The number of queued requests, and of unanswered requests per
+            connection, past which the server stops reading.
+        timeout: The default deadline of a request, in seconds from when it is
+            read, after which it is answered with "timeout"; none if not given.
+        backend: The solver backend, see `sudoku.solver.BACKENDS`.
+    """
+
+    def __init__(
+        self,
+        jobs: int | None = None,
+        batch_size: int = 64,
+        max_pending: int = 1024,
+        timeout: float | None = None,
+        backend: str = "propagation",
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+        self.jobs = jobs or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.backend = backend
+        self.batches = 0
+        self._queue = None
+        self._executor = None
+        self._batcher = None
+        self._server = None
+        self._running = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: str | None = None) -> asyncio.Server:
+        """
+        Starts the worker pool, waits for every worker to be warmed up, and starts
+        listening on `host` and `port`, or on the Unix socket `path` if given.
+
+        Returns:
+            The listening server; with port 0, its socket has the port chosen.
+        """
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.max_pending)
+        self._executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=_warm_up)
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.jobs)))
+        self._batcher = asyncio.create_task(self._dispatch())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def close(self):
+        """
+        Stops listening, drops the queued requests and shuts the worker pool down.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        for task in list(self._running):
+            task.cancel()
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, cancel_futures=True)
+
+    async def __aenter__(self) -> "SolveServer":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def solve(self, line: str, timeout: float | None = None) -> tuple[SolverResult, str]:
+        """
+        Queues a puzzle and waits for its result.
+
+        Args:
+            line: The puzzle, as a single line, see `check_line`.
+            timeout: The deadline in seconds, counting the time spent queued.
+
+        Returns:
+            The SolverResult and resulting line, see `sudoku.batch.solve_lines`.
+
+        Raises:
+            TimeoutError: If the deadline passed first. A puzzle already handed
+                to a worker is stopped by the deadline of its batch.
+        """
+        check_line(line)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            async with asyncio.timeout_at(deadline):
+                await self._queue.put((line, future, deadline))
+                result = await future
+        finally:
+            future.cancel()
+        if result[0] == SolverResult.TIMEOUT:
+            raise TimeoutError("the solve timed out")
+        return result
+
+    async def _dispatch(self):
+        """
+        Takes batches off the queue, one whenever a worker is free.
+        """
+        free = asyncio.Semaphore(self.jobs)
+        while True:
+            await free.acquire()
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Requests whose deadline passed while queued have been cancelled.
+            batch = [request for request in batch if not request[1].done()]
+            if not batch:
+                free.release()
+                continue
+            task = asyncio.create_task(self._run(batch, free))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future, float | None]], free: asyncio.Semaphore):
+        loop = asyncio.get_running_loop()
+        deadlines = [deadline for _, _, deadline in batch]
+        timeout = None if None in deadlines else max(0.0, max(deadlines) - loop.time())
+        try:
+            results, _, _ = await loop.run_in_executor(
+                self._executor,
+                _solve_chunk,
+                [line for line, _, _ in batch],
+                self.backend,
+                False,
+                False,
+                None,
+                None,
+                timeout,
+            )
+            self.batches += 1
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            free.release()
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _reply(self, text: str) -> str:
+        """
+        Answers one request line.
+        """
+        if not text.startswith("{"):
+            try:
+                result, line = await self.solve(text, self.timeout)
+            except TimeoutError:
+                return "timeout"
+            except Exception as e:
+                return f"error: {e}"
+            return line
+
+        reply = {}
+        try:
+            request = json.loads(text)
+            if not isinstance(request, dict) or not isinstance(request.get("puzzle"), str):
+                raise ValueError("expected an object with a puzzle")
+            if "id" in request:
+                reply["id"] = request["id"]
+            result, line = await self.solve(request["puzzle"], request.get("timeout", self.timeout))
+        except TimeoutError:
+            reply["result"] = "timeout"
+        except Exception as e:
+            reply["result"] = "error"
+            reply["error"] = str(e)
+        else:
+            reply["result"] = result.name.lower()
+            if result == SolverResult.SOLVED:
+                reply["solution"] = line
+        return json.dumps(reply)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves one connection: requests are answered concurrently, and the replies
+        are written back in request order.
+        """
+        replies = asyncio.Queue(self.max_pending)
+
+        async def send():
+            while (reply := await replies.get()) is not None:
+                writer.write((await reply).encode() + b"\n")
+                await writer.drain()
+
+        sender = asyncio.create_task(send())
+        try:
+            while line := await reader.readline():
+                text = line.decode(errors="replace").strip()
+                if text:
+                    await replies.put(asyncio.create_task(self._reply(text)))
+            await replies.put(None)
+            await sender
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            sender.cancel()
+            while not replies.empty():
+                if reply := replies.get_nowait():
+                    reply.cancel()
+            writer.close()
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    path: str | None = None,
+    on_start=None,
+    **options,
+):
+    """
+    Runs a SolveServer until cancelled.
+
+    Args:
+        host: The address to listen on.
+        port: The TCP port to listen on.
+        path: A Unix socket to listen on instead.
+        on_start: Called with the listening asyncio.Server once it is ready.
+        options: Passed to SolveServer.
+    """
+    async with SolveServer(**options) as server:
+        listening = await server.start(host, port, path)
+        if on_start is not None:
+            on_start(listening)
+        await listening.serve_forever()
@@ -0,0 +1,275 @@
+"""
+Buffered output sinks for the results of batch runs.
+
+A sink takes the result of every puzzle, with its index in the input, and writes
+it in one of FORMATS:
+
+- "lines": one line per puzzle, the solution or the puzzle as given if it was
+  not solved, as `sudoku.batch.solve_stream` yields them;
+- "jsonl": one JSON object per puzzle, {"index": ..., "result": ..., "solution":
+  ...}, with "puzzle" instead of "solution" if it was not solved; `write_stats`
+  appends a {"stats": ...} object;
+- "binary": a binary corpus (see `sudoku.corpus_file`) of the same lines, with
+  the result of every puzzle in its results section. A corpus only holds 9x9
+  puzzles; check the input with `sudoku.corpus_file.check_lengths` to reject
+  other sizes before solving them.
+
+Results are gathered in memory and written in large blocks, and text formats can
+be compressed with any of COMPRESSIONS. The text formats write the results in the
+order they are given; only "jsonl" and "binary" record the index, so only they
+are suitable for results given out of order, see `sudoku.batch.solve_indexed`.
+"""
+
+import abc
+import importlib
+import json
+import os
+import sys
+from .corpus_file import (
+    MAGIC, VERSION, ENCODINGS, RESULTS, HEADER_SIZE, _HEADER, _RECORD_SIZES, check_length, encode_many
+)
+from .solver import SolverResult
+from .stats import SolveStats
+
+FORMATS = ("lines", "jsonl", "binary")
+
+# The compression of a text sink, by the module implementing it. zstd is in the
+# standard library from Python 3.14.
+COMPRESSIONS = {"gzip": "gzip", "bz2": "bz2", "lzma": "lzma", "zstd": "compression.zstd"}
+
+# The compression implied by the suffix of an output file.
+SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma", ".zst": "zstd"}
+
+BUFFER_SIZE = 1 << 20
+
+
+class Sink(abc.ABC):
+    """
+    Buffers the results of a batch run and writes them to a binary stream in
+    blocks of about `buffer_size` bytes. Use it as a context manager, or call
+    `close()` when done. Subclasses format every result in `_format`.
+
+    Args:
+        stream: The binary stream written to.
+        buffer_size: The number of bytes gathered before a write.
+        close_stream: Whether `close()` also closes the stream.
+    """
+
+    # The typical size of a result as written, to turn `buffer_size` into a
+    # number of results.
+    record_size = 82
+
+    def __init__(self, stream, buffer_size: int = BUFFER_SIZE, close_stream: bool = True):
+        self.stream = stream
+        self._close_stream = close_stream
+        self._batch = max(buffer_size // self.record_size, 1)
+        self._parts = []
+
+    @abc.abstractmethod
+    def _format(self, index: int, result: SolverResult, line: str) -> str:
+        """
+        Returns the text written for one result, see `write`.
+        """
+
+    def write(self, index: int, result: SolverResult, line: str):
+        """
+        Writes the result of puzzle `index`: its SolverResult and resulting line,
+        see `sudoku.batch.solve_lines`.
+        """
+        self._parts.append(self._format(index, result, line))
+        if len(self._parts) >= self._batch:
+            self.flush()
+
+    def write_stats(self, stats: SolveStats):
+        """
+        Writes the stats of the run, for the formats that hold them.
+        """
+
+    def flush(self):
+        if self._parts:
+            self.stream.write("".join(self._parts).encode("ascii"))
+            self._parts = []
+
+    def close(self):
+        self.flush()
+        if self._close_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LineSink(Sink):
+    """
+    Writes every result as a line, of any grid size, see FORMATS.
+    """
+
+    def _format(self, index: int, result: SolverResult, line: str) -> str:
+        return line + "\n"
+
+
+_RESULT_NAMES = {result: result.name.lower() for result in SolverResult}
+
+
+class JsonLinesSink(Sink):
+    """
+    Writes every result as a JSON object on a line of its own, see FORMATS.
+    """
+
+    record_size = 128
+
+    def _format(self, index: int, result: SolverResult, line: str) -> str:
+        # The lines hold nothing that JSON needs to escape.
+        key = "solution" if result == SolverResult.SOLVED else "puzzle"
+        return f'{{"index": {index}, "result": "{_RESULT_NAMES[result]}", "{key}": "{line}"}}\n'
+
+    def write_stats(self, stats: SolveStats):
+        self._parts.append(json.dumps({"stats": stats.to_dict()}) + "\n")
+        self.flush()
+
+
+class CorpusSink:
+    """
+    Writes the results into a binary corpus file, see FORMATS. The corpus holds
+    the resulting lines as its puzzles, and in its results section the result of
+    every puzzle and, for the solved ones, the same line as their solution.
+
+    Runs of consecutive indices are encoded and written as one block, so results
+    given out of order, one chunk at a time, still go out in large writes.
+    Puzzles without a result, e.g. after an interrupted run, are left empty and
+    unsolved.
+
+    Args:
+        path: The corpus file to write.
+        encoding: One of `sudoku.corpus_file.ENCODINGS`.
+        buffer_size: The number of bytes gathered before a write.
+    """
+
+    def __init__(self, path: str, encoding: str = "nibbles", buffer_size: int = BUFFER_SIZE):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self._record_size = _RECORD_SIZES[encoding]
+        self._batch = max(buffer_size // self._record_size, 1)
+        self._file = open(path, "w+b")
+        self._file.write(bytes(HEADER_SIZE))
+        self._statuses = bytearray()
+        self._run = []
+        self._run_start = 0
+
+    def write(self, index: int, result: SolverResult, line: str):
+        """
+        Writes the result of puzzle `index`, see `Sink.write`.
+
+        Raises:
+            ValueError: If the line is not a 9x9 puzzle, see FORMATS.
+        """
+        check_length(line)
+        if index != self._run_start + len(self._run) or len(self._run) >= self._batch:
+            self.flush()
+            self._run_start = index
+        self._run.append(line)
+        statuses = self._statuses
+        if index >= len(statuses):
+            statuses.extend(bytes(index + 1 - len(statuses)))
+        statuses[index] = result.value
+
+    def write_stats(self, stats: SolveStats):
+        # A corpus has no room for stats.
+        pass
+
+    def flush(self):
+        if self._run:
+            self._file.seek(HEADER_SIZE + self._run_start * self._record_size)
+            self._file.write(encode_many(self._run, self.encoding))
+            self._run = []
+
+    def close(self):
+        """
+        Writes the results section and the header, and closes the file.
+        """
+        self.flush()
+        f = self._file
+        count = len(self._statuses)
+        puzzles = HEADER_SIZE + count * self._record_size
+        # The solutions are the puzzles themselves; only the solved ones are read.
+        f.truncate(puzzles)
+        f.seek(puzzles)
+        f.write(self._statuses)
+        block = max(self.buffer_size // self._record_size, 1) * self._record_size
+        for offset in range(HEADER_SIZE, puzzles, block):
+            f.seek(offset)
+            data = f.read(min(block, puzzles - offset))
+            f.seek(offset + count * self._record_size + count)
+            f.write(data)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, ENCODINGS.index(self.encoding), RESULTS, 0, count))
+        f.close()
+
+    def __enter__(self) -> "CorpusSink":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def compression_for(path: str) -> str | None:
+    """
+    Returns the compression implied by the suffix of `path`, see SUFFIXES.
+    """
+    return SUFFIXES.get(os.path.splitext(path)[1])
+
+
+def open_sink(
+    path: str = "-",
+    format: str = "lines",
+    compression: str | None = None,
+    buffer_size: int = BUFFER_SIZE,
+) -> Sink | CorpusSink:
+    """
+    Opens a sink writing to a file, or to standard output when `path` is "-".
+
+    Args:
+        path: The output file.
+        format: One of FORMATS.
+        compression: One of COMPRESSIONS, for the text formats. Defaults to the
+            one implied by the suffix of `path`, if any.
+        buffer_size: The number of bytes gathered before a write.
+
+    Raises:
+        ValueError: If the format or compression is unknown, the compression is
+            not available in this Python, or a binary corpus is asked for on
+            standard output or compressed, as a corpus is memory-mapped.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"unknown format {format!r}, expected one of {FORMATS}")
+    if compression is None and path != "-":
+        compression = compression_for(path)
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"unknown compression {compression!r}, expected one of {tuple(COMPRESSIONS)}")
+    if format == "binary":
+        if path == "-" or compression is not None:
+            raise ValueError("a binary corpus is written to an uncompressed file")
+        return CorpusSink(path, buffer_size=buffer_size)
+
+    target = sys.stdout.buffer if path == "-" else path
+    close_stream = path != "-"
+    if compression is None:
+        stream = target if path == "-" else open(path, "wb")
+    else:
+        try:
+            module = importlib.import_module(COMPRESSIONS[compression])
+        except ImportError:
+            raise ValueError(f"{compression} compression is not available in this Python") from None
+        # Closing the compressed stream finishes the compressed data, and leaves
+        # standard output open.
+        stream = module.open(target, "wb")
+        close_stream = True
+    sink = LineSink if format == "lines" else JsonLinesSink
+    return sink(stream, buffer_size, close_stream)
@@ -1,14 +1,86 @@
 from .puzzle import Puzzle
-from .cell import Cell
-from typing import Generator
+from .cell import Cell, to_mask, from_mask
 from .tile import Tile, Tiles
-from rich import print
+from .propagation import Propagator, make_propagator, check_techniques, DEFAULT_TECHNIQUES
+from .events import Event, EventKind, Observer
+from .dlx import DancingLinks, solve_dlx
 from enum import Enum
+from random import Random
+from time import perf_counter
+from typing import TYPE_CHECKING
+from .subsets import cyclic_group
+from .limits import Limits, SolveInterrupted, make_limits
+
+if TYPE_CHECKING:
+    # Only needed by callers that pass stats or a cache, which import them already.
+    from .stats import SolveStats
+    from .cache import SolutionCache
 
 class SolverResult(Enum):
     SOLVED = 1
     UNSOLVED = 2
     FAILURE = 3
+    # A limit of the solve was reached first, see `sudoku.limits`.
+    TIMEOUT = 4
+
+def _extract_cyclic(values, masks, members: list[int]) -> tuple[list[int], list[int], list[int]]:
+    """
+    Mask-level core of `extract_cyclic_tiles`.
+
+    Works in place on `values` (0 for empty) and `masks` (candidate bitmasks),
+    considering only the positions listed in `members`.
+
+    Returns:
+        The positions of the known, cyclic and remaining cells.
+    """
+    known = []
+    unknown = []
+    known_mask = 0
+    for i in members:
+        if values[i]:
+            known.append(i)
+            known_mask |= 1 << (values[i] - 1)
+        else:
+            unknown.append(i)
+
+    remaining = []
+    for i in unknown:
+        mask = masks[i] & ~known_mask
+        masks[i] = mask
+        count = mask.bit_count()
+        if count == 1:
+            values[i] = mask.bit_length()
+            known.append(i)
+        elif count > 1:
+            remaining.append(i)
+
+    if not remaining:
+        return known, [], []
+
+    group = cyclic_group(tuple(masks[i] for i in remaining))
+    if group:
+        union = 0
+        cyclic = []
+        rest = []
+        for j, i in enumerate(remaining):
+            if group >> j & 1:
+                union |= masks[i]
+                cyclic.append(i)
+        for j, i in enumerate(remaining):
+            if group >> j & 1:
+                continue
+            mask = masks[i] & ~union
+            masks[i] = mask
+            if mask.bit_count() == 1:
+                values[i] = mask.bit_length()
+                known.append(i)
+            else:
+                rest.append(i)
+        return known, cyclic, rest
+
+    # No cyclic group found, so all unknown cells are considered "remaining"
+    return known, [], remaining
+
 
 def extract_cyclic_tiles(tiles: Tiles) -> tuple[Tiles, Tiles, Tiles]:
     """
@@ -21,6 +93,11 @@ def extract_cyclic_tiles(tiles: Tiles) -> tuple[Tiles, Tiles, Tiles]:
     is considered "cyclic". The possible values of the cyclic group are removed from the
     possible values of the remaining tiles.
 
+    The smallest cyclic group is found with the bitmask subset engine in
+    `sudoku.subsets`, so groups are searched directly only up to MAX_SUBSET_SIZE
+    tiles; larger groups are found from the digit side when the tiles form a
+    complete unit.
+
     Args:
         tiles: A list of tiles.
 
@@ -31,65 +108,24 @@ def extract_cyclic_tiles(tiles: Tiles) -> tuple[Tiles, Tiles, Tiles]:
         - The third list contains the remaining tiles with updated possible values.
         If no cyclic group is found, the second list is empty.
     """
-    # Filter out tiles that already have a value.
-    unknown_tiles = [tile for tile in tiles if tile.cell.value is None]
-    known_tiles = [tile for tile in tiles if tile.cell.value is not None]
-
-    known_values = [tile.cell.value for tile in known_tiles]
-
-    remaining_unknown_tiles = []
-    for tile in unknown_tiles:
-        tile.cell.possible_values -= set(known_values)
-        if len(tile.cell.possible_values) == 1:
-            new_value = next(iter(tile.cell.possible_values))
-            known_tiles.append(
-                Tile(tile.position, Cell(value=new_value, possible_values={new_value}))
-            )
-        elif len(tile.cell.possible_values) > 1:
-            remaining_unknown_tiles.append(tile)
-
-    if not remaining_unknown_tiles:
-        return known_tiles, [], []
-
-    # Sort unknown tiles by the length of possible_values
-    sorted_tiles = sorted(
-        remaining_unknown_tiles, key=lambda tile: len(tile.cell.possible_values)
+    values = [tile.cell.value or 0 for tile in tiles]
+    masks = [to_mask(tile.cell.possible_values) for tile in tiles]
+    original = masks.copy()
+
+    known, cyclic, remaining = _extract_cyclic(values, masks, list(range(len(tiles))))
+
+    def output(i: int) -> Tile:
+        tile = tiles[i]
+        if values[i] == (tile.cell.value or 0) and masks[i] == original[i]:
+            return tile
+        return Tile(tile.position, Cell(value=values[i] or None, possible_values=from_mask(masks[i])))
+
+    return (
+        [output(i) for i in known],
+        [output(i) for i in cyclic],
+        [output(i) for i in remaining],
     )
 
-    for i in range(2, len(sorted_tiles) + 1):
-        from itertools import combinations
-
-        for group in combinations(sorted_tiles, i):
-            union = set()
-            for tile in group:
-                union.update(tile.cell.possible_values)
-
-            if len(union) == i:
-                cyclic_tiles = list(group)
-                remaining_tiles_raw = [
-                    tile for tile in sorted_tiles if tile not in cyclic_tiles
-                ]
-
-                remaining_tiles = []
-                for t in remaining_tiles_raw:
-                    new_possible_values = t.cell.possible_values - union
-                    if len(new_possible_values) == 1:
-                        new_cell = Cell(
-                            value=next(iter(new_possible_values)),
-                            possible_values={next(iter(new_possible_values))},
-                        )
-                        known_tiles.append(Tile(position=t.position, cell=new_cell))
-                    else:
-                        new_cell = Cell(
-                            value=t.cell.value, possible_values=new_possible_values
-                        )
-                        remaining_tiles.append(Tile(position=t.position, cell=new_cell))
-
-                return known_tiles, cyclic_tiles, remaining_tiles
-
-    # No cyclic group found, so all unknown tiles are considered "remaining"
-    return known_tiles, [], sorted_tiles
-
 
 def reduce_possible_tiles(tiles: Tiles) -> Tiles:
     """
@@ -117,60 +153,621 @@ def reduce_possible_tiles(tiles: Tiles) -> Tiles:
     return result
 
 
+def _reduce_unit(values, masks, members: list[int]):
+    """
+    Mask-level counterpart of `reduce_possible_tiles`, updating a unit of a puzzle in place.
+    """
+    while members:
+        _, cyclic, members = _extract_cyclic(values, masks, members)
+        if not cyclic:
+            break
+
+
 def step(puzzle: Puzzle) -> Puzzle:
-    result = Puzzle()
-    for section in puzzle.sections():
-        output = reduce_possible_tiles(section)
-        for tile in output:
-            result[tile.position] = tile.cell
-
-    for row in result.rows():
-        output = reduce_possible_tiles(row)
-        for tile in output:
-            result[tile.position] = tile.cell
-
-    for col in result.cols():
-        output = reduce_possible_tiles(col)
-        for tile in output:
-            result[tile.position] = tile.cell
+    result = puzzle.copy()
+    # The units are reduced on the raw arrays, so the counts of is_valid() are
+    # taken again when next needed.
+    result._counts = None
+    values = result._values
+    masks = result._masks
+    for unit in result._geometry.units:
+        _reduce_unit(values, masks, list(unit))
 
     result.update_single_possible_values()
     return result
 
 
-def try_solve_puzzle(puzzle: Puzzle, iteration_from=1) -> tuple[SolverResult, Puzzle, int]:
+def _propagate(propagator: Propagator, observer: Observer | None) -> bool:
+    """
+    Runs the propagator to a fixpoint, reporting the pass to the observer, if any.
+    """
+    consistent = propagator.propagate()
+    if observer is not None:
+        propagator.iteration += 1
+        observer(
+            Event(
+                EventKind.ITERATION if consistent else EventKind.CONTRADICTION,
+                propagator.puzzle,
+                depth=propagator.depth,
+                iteration=propagator.iteration,
+            )
+        )
+    return consistent
+
+
+def try_solve_puzzle(
+    puzzle: Puzzle,
+    iteration_from=1,
+    observer: Observer | None = None,
+    stats: "SolveStats | None" = None,
+    techniques: tuple[str, ...] = DEFAULT_TECHNIQUES,
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+    cancel=None,
+) -> tuple[SolverResult, Puzzle, int]:
     """
-    Solves a Sudoku puzzle using a step-by-step approach.
+    Solves a Sudoku puzzle as far as constraint propagation allows.
+
+    The given puzzle is not modified; propagation runs on a copy, driven by a
+    worklist of changed cells and units until nothing is left to deduce.
 
     Args:
         puzzle: The Sudoku puzzle to be solved.
         iteration_from: The iteration number to start from (default is 1).
+        observer: Called with an Event for every step of the solve, if given.
+        stats: Filled in with the counts and timings of the solve, if given.
+        techniques: The deduction techniques to apply, see
+            `sudoku.propagation.TECHNIQUES`.
+        timeout, max_nodes, cancel: The limits of the solve, as for `solve`.
+            Propagation makes no guesses, so `max_nodes` never stops it; it is
+            accepted so that the limits of a solve can be passed on as they are.
 
     Returns:
         A tuple containing three elements:
-        - A boolean indicating whether the puzzle was solved successfully.
-        - The solved puzzle.
-        - The number of iterations performed since iteration_from.
+        - The SolverResult: SOLVED, FAILURE if a contradiction was found, TIMEOUT
+          if a limit was reached first, or UNSOLVED.
+        - The propagated puzzle.
+        - The number of the iteration performed.
     """
-        
+    result = puzzle.copy()
+    propagator = make_propagator(result, observer, techniques)
+    if observer is not None:
+        propagator.iteration = iteration_from - 1
+    propagator.limits = make_limits(timeout, max_nodes, cancel)
+    if stats is not None:
+        start = perf_counter()
+    propagator.load()
+    try:
+        consistent = _propagate(propagator, observer)
+    except SolveInterrupted:
+        consistent = None
+    if stats is not None:
+        stats.puzzles += 1
+        stats.add_time("propagation", perf_counter() - start)
+        stats.add_propagator(propagator)
+
     iteration = iteration_from
+    if consistent is None:
+        if stats is not None:
+            stats.timeouts += 1
+        return SolverResult.TIMEOUT, result, iteration
+    if not consistent:
+        return SolverResult.FAILURE, result, iteration
+    if result.is_solved():
+        return SolverResult.SOLVED, result, iteration
+    return SolverResult.UNSOLVED, result, iteration
+
+
+def _choose_cell(values, masks) -> int | None:
+    """
+    Picks the unsolved cell with the fewest candidates (minimum remaining values).
+
+    Returns:
+        The index of the cell, or None if every cell has a value.
+    """
+    best = None
+    best_count = len(values) + 1
+    for i in range(len(values)):
+        if not values[i]:
+            count = masks[i].bit_count()
+            if count < best_count:
+                best = i
+                best_count = count
+                if count <= 2:
+                    break
+    return best
+
+
+# The number of guesses allowed to the first try of a search with restarts; the
+# following tries are allowed this many times the terms of the Luby sequence.
+RESTART_GUESSES = 50
+
+
+def _luby(i: int) -> int:
+    """
+    Returns term `i`, from 1, of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    if i == (1 << k) - 1:
+        return 1 << (k - 1)
+    return _luby(i - (1 << (k - 1)) + 1)
+
+
+class _Restart(Exception):
+    """
+    Raised when a try of a search with restarts has used up its guesses.
+    """
+
+
+class _Restarts:
+    """
+    The state of a search with randomized restarts, see `_search_root`: ties
+    between the cells with the fewest candidates are broken at random, candidates
+    are tried in random order, and every try is allowed RESTART_GUESSES times the
+    next term of the Luby sequence. The random source is seeded, so that solves
+    are reproducible.
+    """
+
+    __slots__ = ("rng", "tries", "left")
+
+    def __init__(self, seed: int = 0):
+        self.rng = Random(seed)
+        self.tries = 0
+        self.next()
+
+    def next(self):
+        self.tries += 1
+        self.left = RESTART_GUESSES * _luby(self.tries)
+
+    def node(self):
+        self.left -= 1
+        if self.left < 0:
+            raise _Restart
+
+    def choose_cell(self, values, masks) -> int | None:
+        """
+        Picks one of the unsolved cells with the fewest candidates at random.
+        """
+        best = []
+        best_count = len(values) + 1
+        for i in range(len(values)):
+            if not values[i]:
+                count = masks[i].bit_count()
+                if count < best_count:
+                    best = [i]
+                    best_count = count
+                elif count == best_count:
+                    best.append(i)
+        return self.rng.choice(best) if best else None
+
+    def pick(self, mask: int) -> int:
+        """
+        Returns one of the bits set in `mask` at random.
+        """
+        return 1 << self.rng.choice([d for d in range(mask.bit_length()) if mask >> d & 1])
+
+
+def _search(
+    propagator: Propagator,
+    observer: Observer | None = None,
+    depth: int = 0,
+    stats: "SolveStats | None" = None,
+    restarts: _Restarts | None = None,
+) -> bool:
+    """
+    Depth-first search over the propagated puzzle. Each guess is propagated and,
+    if it leads nowhere, undone from the trail before the next one is tried.
+    Guesses, backtracks and the search depth are counted in `stats`, if given.
+    With `restarts`, cells and candidates are picked at random, and the guesses
+    are limited by them.
+
+    Returns:
+        True if the puzzle was completed, in which case it is left solved.
+
+    Raises:
+        SolveInterrupted: If a limit of the propagator was reached.
+        _Restart: If the guesses allowed by `restarts` were used up.
+    """
+    puzzle = propagator.puzzle
+    values = puzzle._values
+    masks = puzzle._masks
+    positions = puzzle._geometry.positions
+    i = _choose_cell(values, masks) if restarts is None else restarts.choose_cell(values, masks)
+    if i is None:
+        return True
+
+    mark = propagator.mark()
+    mask = masks[i]
+    limits = propagator.limits
+    while mask:
+        bit = mask & -mask if restarts is None else restarts.pick(mask)
+        mask ^= bit
+        digit = bit.bit_length()
+        if limits is not None:
+            limits.node()
+        if restarts is not None:
+            restarts.node()
+        if stats is not None:
+            stats.guesses += 1
+            stats.eliminations["guesses"] += masks[i].bit_count() - 1
+            if depth >= stats.max_depth:
+                stats.max_depth = depth + 1
+        if observer is not None:
+            propagator.depth = depth + 1
+            observer(
+                Event(EventKind.GUESS, puzzle, positions[i], frozenset((digit,)), depth + 1, propagator.iteration)
+            )
+        if (
+            propagator.assign(i, digit)
+            and _propagate(propagator, observer)
+            and _search(propagator, observer, depth + 1, stats, restarts)
+        ):
+            return True
+        propagator.undo(mark)
+        if stats is not None:
+            stats.backtracks += 1
+        if observer is not None:
+            propagator.depth = depth
+            observer(
+                Event(EventKind.BACKTRACK, puzzle, positions[i], frozenset((digit,)), depth, propagator.iteration)
+            )
+    return False
+
+
+def _search_root(propagator: Propagator, observer: Observer | None = None, stats: "SolveStats | None" = None) -> bool:
+    """
+    Searches the propagated puzzle with `_search`, restarting it on grids larger
+    than 9x9. There, an early wrong guess can leave the search in a subtree
+    without solutions that propagation does not rule out and that takes minutes
+    to exhaust; restarting with random choices after a growing number of guesses
+    (see `_Restarts`) avoids these, and still ends, as the allowance grows without
+    bound. Restarts are counted in `stats`, if given.
+    """
+    if propagator.puzzle.size <= 9:
+        return _search(propagator, observer, stats=stats)
+    restarts = _Restarts()
+    root = propagator.mark()
     while True:
-        print(f"\n[green]Iteration {iteration}[/green]:\n")
-        new_puzzle = step(puzzle)
-        new_puzzle.print()
+        try:
+            return _search(propagator, observer, stats=stats, restarts=restarts)
+        except _Restart:
+            propagator.undo(root)
+            restarts.next()
+            if stats is not None:
+                stats.restarts += 1
+
+
+BACKENDS = ("propagation", "dlx")
+
+
+def solve(
+    puzzle: Puzzle,
+    backend: str = "propagation",
+    observer: Observer | None = None,
+    stats: "SolveStats | None" = None,
+    cache: "SolutionCache | None" = None,
+    techniques: tuple[str, ...] = DEFAULT_TECHNIQUES,
+    workers: int | None = 1,
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+    cancel=None,
+) -> tuple[SolverResult, Puzzle]:
+    """
+    Solves a Sudoku puzzle.
 
-        if new_puzzle.is_solved():
-            break
-        if new_puzzle == puzzle:
-            break
+    The "propagation" backend combines constraint propagation with a depth-first
+    search: whenever propagation gets stuck, it guesses a value for the cell with
+    the fewest candidates and propagates again; dead ends are rolled back through
+    the propagation trail, so the puzzle is never copied during the search.
+    Propagation applies the configured deduction techniques, cheapest first, see
+    `sudoku.propagation.Propagator`; every guess they avoid saves a subtree.
+
+    The "dlx" backend solves the puzzle as an exact-cover problem with Dancing Links,
+    which is usually faster on very sparse (e.g. 17-clue) puzzles.
 
-        puzzle = new_puzzle
-        iteration += 1
+    Args:
+        puzzle: The Sudoku puzzle to be solved. It is not modified.
+        backend: One of BACKENDS.
+        observer: Called with an Event for every step of the solve, if given. Only
+            the "propagation" backend reports eliminations, guesses and backtracks.
+        stats: Filled in with the counts and timings of the solve, if given. The
+            "dlx" backend only records its time.
+        cache: Looked up first, and given the solution if the puzzle has to be
+            solved, for the puzzles `sudoku.cache.is_cacheable` accepts. On a
+            hit, no events are emitted and only `stats.cache_hits` is counted.
+        techniques: The deduction techniques of the "propagation" backend, some
+            of `sudoku.propagation.TECHNIQUES`.
+        workers: With more than one, or None for one per CPU, the search is split
+            over that many worker processes once it takes longer than a moment,
+            see `sudoku.parallel`. Only the "propagation" backend, without an
+            observer, can search in parallel.
+        timeout: The time allowed for the solve, in seconds.
+        max_nodes: The largest number of guesses allowed.
+        cancel: A cancellation token, such as a `threading.Event`, that stops the
+            solve once set. The limits are checked at every guess and, during
+            propagation, at every unit examined; see `sudoku.limits`.
 
-    if new_puzzle.is_solved():
-        return SolverResult.SOLVED, new_puzzle, iteration
+    Returns:
+        A tuple containing two elements:
+        - SOLVED, FAILURE if the puzzle has no solution, or TIMEOUT if a limit
+          was reached first.
+        - The solved puzzle, or the puzzle as far as the backend got. After a
+          TIMEOUT, that is the puzzle as far as the initial propagation got,
+          without any guess.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+    check_techniques(techniques)
+    if workers != 1 and (backend != "propagation" or observer is not None):
+        raise ValueError("only the propagation backend, without an observer, can search in parallel")
+    limits = make_limits(timeout, max_nodes, cancel)
+
+    if cache is not None:
+        from .cache import is_cacheable
+
+        if is_cacheable(puzzle):
+            return _solve_cached(puzzle, backend, observer, stats, cache, techniques, workers, limits)
+    return _solve(puzzle, backend, observer, stats, techniques, workers, limits)
+
+
+def _solve(
+    puzzle: Puzzle,
+    backend: str,
+    observer: Observer | None,
+    stats: "SolveStats | None",
+    techniques: tuple[str, ...],
+    workers: int | None,
+    limits: Limits | None,
+) -> tuple[SolverResult, Puzzle]:
+    """
+    `solve()` past its checks and the cache.
+    """
+    if workers != 1:
+        from .parallel import search
+
+        try:
+            found, solved, result = search(puzzle, workers, 1, techniques, stats, limits=limits)
+        except SolveInterrupted as e:
+            if stats is not None:
+                stats.timeouts += 1
+            return SolverResult.TIMEOUT, e.puzzle
+        if found:
+            return SolverResult.SOLVED, solved
+        return SolverResult.FAILURE, result
+    if stats is not None:
+        return _solve_with_stats(puzzle, backend, observer, stats, techniques, limits)
+
+    if backend == "dlx":
+        if puzzle.is_valid():
+            try:
+                solved = solve_dlx(puzzle, limits)
+            except SolveInterrupted:
+                return SolverResult.TIMEOUT, puzzle.copy()
+            if solved is not None:
+                return SolverResult.SOLVED, solved
+        if observer is not None:
+            observer(Event(EventKind.CONTRADICTION, puzzle))
+        return SolverResult.FAILURE, puzzle.copy()
+
+    result = puzzle.copy()
+    propagator = make_propagator(result, observer, techniques)
+    propagator.limits = limits
+    propagator.load()
+    root = None
+    try:
+        if _propagate(propagator, observer):
+            root = propagator.mark()
+            if _search_root(propagator, observer):
+                return SolverResult.SOLVED, result
+        return SolverResult.FAILURE, result
+    except SolveInterrupted:
+        if root is not None:
+            propagator.undo(root)
+        return SolverResult.TIMEOUT, result
+
+
+def _solve_cached(
+    puzzle: Puzzle,
+    backend: str,
+    observer: Observer | None,
+    stats: "SolveStats | None",
+    cache: "SolutionCache",
+    techniques: tuple[str, ...],
+    workers: int | None,
+    limits: Limits | None,
+) -> tuple[SolverResult, Puzzle]:
+    """
+    `solve()` through a SolutionCache, canonicalizing the puzzle only once.
+    """
+    from .canonical import canonical_form
+    from .puzzle_file import parse_puzzle, format_puzzle
+
+    key, transform = canonical_form(puzzle)
+    solution = cache.lookup(key)
+    if solution is not None:
+        if stats is not None:
+            stats.cache_hits += 1
+        return SolverResult.SOLVED, transform.inverse().apply_puzzle(parse_puzzle(solution))
+    result, solved = _solve(puzzle, backend, observer, stats, techniques, workers, limits)
+    if result == SolverResult.SOLVED:
+        cache.store(key, format_puzzle(transform.apply_puzzle(solved)))
+    return result, solved
+
+
+def _solve_with_stats(
+    puzzle: Puzzle,
+    backend: str,
+    observer: Observer | None,
+    stats: "SolveStats",
+    techniques: tuple[str, ...],
+    limits: Limits | None,
+) -> tuple[SolverResult, Puzzle]:
+    """
+    `solve()` with counts and timings recorded in `stats`, kept apart so that
+    solves without stats run without any timing calls.
+    """
+    stats.puzzles += 1
+    start = perf_counter()
+    if backend == "dlx":
+        try:
+            result, solved = _solve(puzzle, backend, observer, None, techniques, 1, limits)
+        finally:
+            stats.add_time("dlx", perf_counter() - start)
+        if result == SolverResult.TIMEOUT:
+            stats.timeouts += 1
+        return result, solved
+
+    result = puzzle.copy()
+    propagator = make_propagator(result, observer, techniques)
+    propagator.limits = limits
+    propagator.load()
+    outcome = SolverResult.FAILURE
+    searched = None
+    try:
+        if _propagate(propagator, observer):
+            searched = perf_counter()
+            stats.add_time("propagation", searched - start)
+            root = propagator.mark()
+            try:
+                if _search_root(propagator, observer, stats):
+                    outcome = SolverResult.SOLVED
+            except SolveInterrupted:
+                propagator.undo(root)
+                raise
+    except SolveInterrupted:
+        outcome = SolverResult.TIMEOUT
+        stats.timeouts += 1
+    if searched is None:
+        stats.add_time("propagation", perf_counter() - start)
     else:
-        if not new_puzzle.is_valid():
-            return SolverResult.FAILURE, new_puzzle, iteration
-        else:
-            return SolverResult.UNSOLVED, new_puzzle, iteration
+        stats.add_time("search", perf_counter() - searched)
+    stats.add_propagator(propagator)
+    return outcome, result
+
+
+def _count(propagator: Propagator, limit: int) -> int:
+    """
+    Counts the completions of the propagated puzzle, up to `limit`, with the same
+    search as `_search`. Every branch is undone from the trail, so the puzzle is
+    left as it was.
+    """
+    values = propagator._values
+    masks = propagator._masks
+    i = _choose_cell(values, masks)
+    if i is None:
+        return 1
+
+    found = 0
+    mark = propagator.mark()
+    mask = masks[i]
+    limits = propagator.limits
+    while mask and found < limit:
+        bit = mask & -mask
+        mask ^= bit
+        if limits is not None:
+            limits.node()
+        if propagator.assign(i, bit.bit_length()) and propagator.propagate():
+            found += _count(propagator, limit - found)
+        propagator.undo(mark)
+    return found
+
+
+def count_solutions(
+    puzzle: Puzzle,
+    limit: int = 2,
+    backend: str = "propagation",
+    workers: int | None = 1,
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+    cancel=None,
+) -> int:
+    """
+    Counts the solutions of a Sudoku puzzle, stopping as soon as `limit` are found.
+
+    Args:
+        puzzle: The Sudoku puzzle. It is not modified.
+        limit: The number of solutions after which to stop counting.
+        backend: One of BACKENDS.
+        workers: The number of worker processes to split the search over, see
+            `solve`; only for the "propagation" backend.
+        timeout, max_nodes, cancel: The limits of the search, as for `solve`.
+
+    Returns:
+        The number of solutions, or `limit` if there are at least that many.
+
+    Raises:
+        TimeoutError: A `sudoku.limits.SolveInterrupted`, if a limit was reached
+            before the count was known.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    if workers != 1 and backend != "propagation":
+        raise ValueError("only the propagation backend can search in parallel")
+    limits = make_limits(timeout, max_nodes, cancel)
+    if workers != 1:
+        from .parallel import search
+
+        return search(puzzle, workers, limit, limits=limits)[0]
+
+    if backend == "dlx":
+        if not puzzle.is_valid():
+            return 0
+        return DancingLinks(puzzle).search(limit, limits)
+
+    propagator = Propagator(puzzle.copy())
+    propagator.limits = limits
+    propagator.load()
+    if not propagator.propagate():
+        return 0
+    return _count(propagator, limit)
+
+
+def has_unique_solution(
+    puzzle: Puzzle,
+    backend: str = "propagation",
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+    cancel=None,
+) -> bool:
+    """
+    Checks whether a Sudoku puzzle has exactly one solution.
+
+    Args:
+        puzzle: The Sudoku puzzle. It is not modified.
+        backend: One of BACKENDS.
+        timeout, max_nodes, cancel: The limits of the search, as for `solve`.
+
+    Raises:
+        TimeoutError: If a limit was reached first, see `count_solutions`.
+    """
+    return count_solutions(puzzle, limit=2, backend=backend, timeout=timeout, max_nodes=max_nodes, cancel=cancel) == 1
+
+
+def solve_many(
+    puzzles: list[Puzzle],
+    backend: str = "propagation",
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+) -> list[tuple[SolverResult, Puzzle]]:
+    """
+    Solves a batch of puzzles. A vectorized NumPy pass applies naked and hidden singles
+    to all of them at once, and only the puzzles it leaves unsolved go through `solve()`.
+
+    Requires NumPy; see `sudoku.vectorized`.
+
+    Args:
+        puzzles: The puzzles to be solved. They are not modified.
+        backend: The backend used for puzzles that need a search.
+        timeout: The time allowed for the search of every puzzle, in seconds.
+        max_nodes: The largest number of guesses allowed for every puzzle.
+
+    Returns:
+        For every puzzle, its SolverResult and resulting puzzle, as from `solve()`.
+    """
+    from .vectorized import solve_many as solve_vectorized
+
+    return solve_vectorized(puzzles, backend, timeout, max_nodes)
@@ -0,0 +1,106 @@
+"""
+Opt-in solve statistics.
+
+Pass a SolveStats to a solve entry point and it is filled in as the puzzle is
+solved. The counters are plain integers updated at technique granularity, so
+they are cheap enough to leave on; merge the stats of many solves with
+`SolveStats.merge` or `aggregate`.
+"""
+
+from dataclasses import dataclass, field, asdict
+from typing import Iterable
+
+# The techniques whose eliminations are counted, see SolveStats.eliminations: those
+# of `sudoku.propagation.TECHNIQUES`, in the same order, and the guesses.
+TECHNIQUES = ("singles", "hidden_singles", "pointing", "box_line", "subsets", "x_wing", "guesses")
+
+
+@dataclass(slots=True)
+class SolveStats:
+    """
+    Counters and timers for one or more solves.
+
+    Attributes:
+        puzzles: The number of puzzles solved.
+        eliminations: The number of candidates removed by each of TECHNIQUES:
+            "singles" removes placed values from their peers, the others but the
+            last are the deduction techniques of `sudoku.propagation.TECHNIQUES`,
+            and "guesses" counts the candidates dropped when the search assigns a
+            guessed value.
+        subset_calls: The number of naked/hidden subset searches run on a unit.
+        subset_sizes: For every largest subset size tried, how many searches tried it.
+        guesses: The number of values guessed by the search.
+        backtracks: The number of guesses undone.
+        restarts: The number of times the search on a grid larger than 9x9 was
+            restarted, see `sudoku.solver._search_root`; the guesses undone by a
+            restart are not counted in `backtracks`.
+        max_depth: The largest number of nested guesses.
+        times: Wall time in seconds spent in each phase, such as "propagation"
+            (the initial propagation), "search" or "dlx".
+        cache_hits: The number of puzzles answered from a `sudoku.cache.SolutionCache`;
+            they are not counted in `puzzles`.
+        timeouts: The number of solves stopped by one of their limits, see
+            `sudoku.limits`; they are counted in `puzzles`.
+    """
+
+    puzzles: int = 0
+    eliminations: dict[str, int] = field(default_factory=lambda: dict.fromkeys(TECHNIQUES, 0))
+    subset_calls: int = 0
+    subset_sizes: dict[int, int] = field(default_factory=dict)
+    guesses: int = 0
+    backtracks: int = 0
+    restarts: int = 0
+    max_depth: int = 0
+    times: dict[str, float] = field(default_factory=dict)
+    cache_hits: int = 0
+    timeouts: int = 0
+
+    def add_time(self, phase: str, seconds: float):
+        self.times[phase] = self.times.get(phase, 0.0) + seconds
+
+    def add_propagator(self, propagator):
+        """
+        Adds the counters kept by a `sudoku.propagation.Propagator`.
+        """
+        for technique, count in zip(TECHNIQUES, propagator.eliminated):
+            self.eliminations[technique] += count
+        self.subset_calls += propagator.subset_calls
+        for size, count in enumerate(propagator.subset_sizes):
+            if count:
+                self.subset_sizes[size] = self.subset_sizes.get(size, 0) + count
+
+    def merge(self, other: "SolveStats") -> "SolveStats":
+        """
+        Adds the counts and times of `other` to these stats.
+
+        Returns:
+            These stats, updated.
+        """
+        self.puzzles += other.puzzles
+        for technique, count in other.eliminations.items():
+            self.eliminations[technique] = self.eliminations.get(technique, 0) + count
+        self.subset_calls += other.subset_calls
+        for size, count in other.subset_sizes.items():
+            self.subset_sizes[size] = self.subset_sizes.get(size, 0) + count
+        self.guesses += other.guesses
+        self.backtracks += other.backtracks
+        self.restarts += other.restarts
+        self.max_depth = max(self.max_depth, other.max_depth)
+        for phase, seconds in other.times.items():
+            self.add_time(phase, seconds)
+        self.cache_hits += other.cache_hits
+        self.timeouts += other.timeouts
+        return self
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def aggregate(stats: Iterable[SolveStats]) -> SolveStats:
+    """
+    Merges the stats of many solves, e.g. of a batch run, into one SolveStats.
+    """
+    total = SolveStats()
+    for s in stats:
+        total.merge(s)
+    return total
@@ -0,0 +1,175 @@
+"""
+Naked and hidden subset detection on candidate bitmasks.
+
+A naked subset is k cells whose candidates together hold only k digits; those
+digits can be removed from every other cell of the unit. A hidden subset is
+the same pattern seen from the digit side: k digits that fit in only k cells,
+so every other digit can be removed from those cells.
+
+In a unit with n unsolved cells, a naked subset of size k leaves a hidden
+subset of size n - k behind, so searching both sides up to n // 2 finds every
+subset. Sizes are additionally capped at MAX_SUBSET_SIZE, which keeps the search
+polynomial, and results are cached per tuple of unit masks.
+"""
+
+from functools import lru_cache
+from typing import Generator
+
+MAX_SUBSET_SIZE = 4
+
+
+def _groups(masks: tuple[int, ...], size: int) -> Generator[tuple[int, int], None, None]:
+    """
+    Yields every group of `size` entries of `masks` whose union has at most `size` bits.
+
+    Groups are yielded as (members, union), where bit j of `members` is set when
+    entry j is part of the group. Partial groups are pruned as soon as their union
+    grows past `size` bits.
+    """
+    n = len(masks)
+
+    def extend(start: int, depth: int, members: int, union: int):
+        for j in range(start, n - size + depth + 1):
+            combined = union | masks[j]
+            if combined.bit_count() > size:
+                continue
+            if depth + 1 == size:
+                yield members | (1 << j), combined
+            else:
+                yield from extend(j + 1, depth + 1, members | (1 << j), combined)
+
+    yield from extend(0, 0, 0, 0)
+
+
+def _transpose(masks: tuple[int, ...], union: int | None = None) -> tuple[list[int], list[int]]:
+    """
+    Returns the candidate digits of `masks`, or those in `union` if given, and, for
+    each, the positions it fits in.
+    """
+    if union is None:
+        union = 0
+        for mask in masks:
+            union |= mask
+    digits = []
+    positions = []
+    while union:
+        bit = union & -union
+        union ^= bit
+        where = 0
+        for j, mask in enumerate(masks):
+            if mask & bit:
+                where |= 1 << j
+        digits.append(bit)
+        positions.append(where)
+    return digits, positions
+
+
+def _members(group: int) -> Generator[int, None, None]:
+    j = 0
+    while group:
+        if group & 1:
+            yield j
+        group >>= 1
+        j += 1
+
+
+@lru_cache(maxsize=1 << 16)
+def subset_eliminations(
+    masks: tuple[int, ...], max_size: int = MAX_SUBSET_SIZE
+) -> tuple[tuple[int, int], ...] | None:
+    """
+    Finds the naked and hidden subsets among the candidate masks of a unit's unsolved cells.
+
+    Args:
+        masks: The candidate masks of the unsolved cells of one unit.
+        max_size: The largest subset size to look for.
+
+    Returns:
+        The eliminations implied by every subset found, as (position, bits) pairs where
+        `bits` are the candidates to remove from `masks[position]`, or None if the
+        masks are contradictory (k cells sharing fewer than k digits, or k digits
+        confined to fewer than k cells).
+    """
+    n = len(masks)
+    limit = min(max_size, n // 2)
+    removed = [0] * n
+
+    # Only cells with at most `limit` candidates can be part of a naked subset, and
+    # only digits that fit in at most `limit` cells can be part of a hidden one, so
+    # the searches run on those alone; in wide units, that is usually a handful.
+    small = [j for j in range(n) if masks[j].bit_count() <= limit]
+    if len(small) >= 2:
+        small_masks = tuple(masks[j] for j in small)
+        for size in range(2, limit + 1):
+            for members, union in _groups(small_masks, size):
+                if union.bit_count() < size:
+                    return None
+                group = 0
+                for k in _members(members):
+                    group |= 1 << small[k]
+                for j in range(n):
+                    if not group >> j & 1:
+                        removed[j] |= masks[j] & union
+
+    # seen[k] holds the digits found in more than k cells.
+    seen = [0] * (limit + 1)
+    for mask in masks:
+        for k in range(limit, 0, -1):
+            seen[k] |= seen[k - 1] & mask
+        seen[0] |= mask
+    if seen[0].bit_count() < n:
+        return None
+    few = seen[0] & ~seen[limit]
+    if few.bit_count() >= 2:
+        digits, positions = _transpose(masks, few)
+        for size in range(2, limit + 1):
+            for members, cells in _groups(tuple(positions), size):
+                if cells.bit_count() < size:
+                    return None
+                kept = 0
+                for d in _members(members):
+                    kept |= digits[d]
+                for j in _members(cells):
+                    removed[j] |= masks[j] & ~kept
+
+    return tuple((j, bits) for j, bits in enumerate(removed) if bits)
+
+
+@lru_cache(maxsize=1 << 16)
+def cyclic_group(masks: tuple[int, ...], max_size: int = MAX_SUBSET_SIZE) -> int:
+    """
+    Finds the smallest "cyclic" group: at least two cells whose candidates together
+    hold exactly as many digits as there are cells.
+
+    Groups up to `max_size` cells are searched directly. Larger groups are found as
+    the complement of a hidden subset of at most `max_size` digits, which is exact
+    when the masks hold exactly `len(masks)` digits, as in a consistent unit.
+
+    Args:
+        masks: The candidate masks of the unsolved cells of one unit.
+        max_size: The largest subset size to search directly.
+
+    Returns:
+        The group as a bitmask over positions in `masks`, or 0 if there is none.
+    """
+    n = len(masks)
+    everyone = (1 << n) - 1
+    union = 0
+    for mask in masks:
+        union |= mask
+    positions = None
+
+    for size in range(2, n + 1):
+        if size <= max_size:
+            for members, group_union in _groups(masks, size):
+                if group_union.bit_count() == size:
+                    return members
+        elif union.bit_count() == n and n - size <= max_size:
+            if size == n:
+                return everyone
+            if positions is None:
+                _, positions = _transpose(masks)
+            for _, cells in _groups(tuple(positions), n - size):
+                if cells.bit_count() == n - size:
+                    return everyone & ~cells
+    return 0
@@ -0,0 +1,129 @@
+"""
+Precomputed index tables for the grid.
+
+Cells are addressed by their flat index `row * size + col`. The tables are built
+once per box size, on first use, so that traversals never have to allocate Tile
+lists. The module-level tables are those of the standard 9x9 grid.
+"""
+
+from functools import cache
+from typing import NamedTuple
+
+# The supported box sizes: 4x4, 9x9, 16x16 and 25x25 grids.
+BOX_SIZES = (2, 3, 4, 5)
+
+
+class Geometry(NamedTuple):
+    """
+    The index tables of a grid made of `box` x `box` sections of `box` x `box` cells.
+
+    Attributes:
+        box: The side of a section.
+        size: The side of the grid, and the number of digits: box * box.
+        cells: The number of cells: size * size.
+        all_candidates: The candidate mask with every digit set.
+        typecode: The array typecode wide enough for a candidate mask.
+        positions: The (row, col) of every cell.
+        sections, rows, cols: The cells of every unit of each kind.
+        units: All units, in the order the solver visits them: sections, rows, cols.
+        cell_units: The ids (indices into `units`) of the section, row and col of
+            every cell.
+        peers: The other cells sharing a unit with every cell.
+        intersections: For every unit, its partitions into the segments it shares
+            with crossing units: a section is split into its rows and into its cols,
+            a row or col into its sections. Each segment is given as its cells and
+            the cells of the crossing unit outside of it.
+    """
+
+    box: int
+    size: int
+    cells: int
+    all_candidates: int
+    typecode: str
+    positions: tuple[tuple[int, int], ...]
+    sections: tuple[tuple[int, ...], ...]
+    rows: tuple[tuple[int, ...], ...]
+    cols: tuple[tuple[int, ...], ...]
+    units: tuple[tuple[int, ...], ...]
+    cell_units: tuple[tuple[int, int, int], ...]
+    peers: tuple[tuple[int, ...], ...]
+    intersections: tuple[tuple[tuple[tuple[tuple[int, ...], tuple[int, ...]], ...], ...], ...]
+
+
+def geometry(box: int = 3) -> Geometry:
+    """
+    Returns the index tables of the grid with sections of `box` x `box` cells, one
+    of BOX_SIZES. They are built once per box size and shared.
+    """
+    return _geometry(box)
+
+
+@cache
+def _geometry(box: int) -> Geometry:
+    if box not in BOX_SIZES:
+        raise ValueError(f"unsupported box size {box}, expected one of {BOX_SIZES}")
+    n = box * box
+    positions = tuple((i // n, i % n) for i in range(n * n))
+    sections = tuple(
+        tuple(
+            (section // box * box + r) * n + section % box * box + c
+            for r in range(box)
+            for c in range(box)
+        )
+        for section in range(n)
+    )
+    rows = tuple(tuple(row * n + col for col in range(n)) for row in range(n))
+    cols = tuple(tuple(row * n + col for row in range(n)) for col in range(n))
+    units = sections + rows + cols
+    cell_units = tuple((row // box * box + col // box, n + row, 2 * n + col) for row, col in positions)
+    peers = tuple(
+        tuple(sorted({peer for unit in cell_units[i] for peer in units[unit]} - {i}))
+        for i in range(n * n)
+    )
+
+    def split(unit: tuple[int, ...], kind: int) -> tuple[tuple[tuple[int, ...], tuple[int, ...]], ...]:
+        # The segments of `unit` along the crossing units of the given kind (0 for
+        # sections, 1 for rows, 2 for cols), in order of the crossing unit.
+        segments = {}
+        for i in unit:
+            segments.setdefault(cell_units[i][kind], []).append(i)
+        return tuple(
+            (tuple(cells), tuple(i for i in units[crossing] if i not in cells))
+            for crossing, cells in sorted(segments.items())
+        )
+
+    intersections = tuple(
+        (split(unit, 1), split(unit, 2)) if u < n else (split(unit, 0),) for u, unit in enumerate(units)
+    )
+    return Geometry(
+        box,
+        n,
+        n * n,
+        (1 << n) - 1,
+        "H" if n <= 16 else "L",
+        positions,
+        sections,
+        rows,
+        cols,
+        units,
+        cell_units,
+        peers,
+        intersections,
+    )
+
+
+GEOMETRY = geometry(3)
+
+POSITIONS: tuple[tuple[int, int], ...] = GEOMETRY.positions
+SECTIONS: tuple[tuple[int, ...], ...] = GEOMETRY.sections
+ROWS: tuple[tuple[int, ...], ...] = GEOMETRY.rows
+COLS: tuple[tuple[int, ...], ...] = GEOMETRY.cols
+
+# All 27 units, in the order the solver visits them: sections, rows, cols.
+UNITS: tuple[tuple[int, ...], ...] = GEOMETRY.units
+
+# The ids (indices into UNITS) of the section, row and col of every cell.
+CELL_UNITS: tuple[tuple[int, int, int], ...] = GEOMETRY.cell_units
+
+# The 20 other cells sharing a unit with every cell.
+PEERS: tuple[tuple[int, ...], ...] = GEOMETRY.peers
@@ -0,0 +1,224 @@
+"""
+Vectorized constraint propagation over many puzzles at once, using NumPy.
+
+N puzzles are held as an (N, 81) uint8 array of values and an (N, 81) uint16
+array of candidate masks. Naked singles and hidden singles are applied to every
+puzzle of the batch with array operations driven by the tables in
+`sudoku.units`, until no puzzle changes any more. Puzzles that propagation
+leaves unsolved are handed to the scalar solver.
+
+`grade` checks many submitted grids against their puzzles in the same way,
+straight from their text lines.
+
+This module needs NumPy, which is an optional dependency of the package.
+"""
+
+from array import array
+import numpy as np
+from .cell import ALL_CANDIDATES
+from .puzzle import Puzzle
+from .puzzle_file import EMPTY
+from .units import UNITS, PEERS
+from .solver import solve, SolverResult
+
+_UNITS = np.array(UNITS, dtype=np.intp)
+_PEERS = np.array(PEERS, dtype=np.intp)
+# The units split into three partitions (sections, rows, cols), each covering every cell once.
+_PARTITIONS = [_UNITS[k : k + 9].ravel() for k in range(0, 27, 9)]
+
+# The candidate bit of every value, 0 for empty cells.
+_BITS = np.array([0] + [1 << d for d in range(9)], dtype=np.uint16)
+_POPCOUNT = np.array([mask.bit_count() for mask in range(ALL_CANDIDATES + 1)], dtype=np.uint8)
+# The digit of every single-candidate mask, 0 for other masks.
+_DIGIT = np.array(
+    [mask.bit_length() if mask.bit_count() == 1 else 0 for mask in range(ALL_CANDIDATES + 1)],
+    dtype=np.uint8,
+)
+
+
+def to_arrays(puzzles: list[Puzzle]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Packs puzzles into an (N, 81) uint8 value array and an (N, 81) uint16 mask array.
+    """
+    values = np.frombuffer(b"".join(bytes(p._values) for p in puzzles), dtype=np.uint8)
+    masks = np.frombuffer(b"".join(p._masks.tobytes() for p in puzzles), dtype=np.uint16)
+    return values.reshape(-1, 81).copy(), masks.reshape(-1, 81).copy()
+
+
+def from_arrays(values: np.ndarray, masks: np.ndarray) -> Puzzle:
+    """
+    Builds a Puzzle from one row of the value and mask arrays.
+    """
+    puzzle = Puzzle()
+    puzzle._values = bytearray(values.astype(np.uint8).tobytes())
+    puzzle._masks = array("H")
+    puzzle._masks.frombytes(masks.astype(np.uint16).tobytes())
+    return puzzle
+
+
+def _propagate_once(values: np.ndarray, masks: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Runs one round of naked and hidden singles over a batch.
+
+    Returns:
+        The new values and masks, and per puzzle whether it changed and whether it
+        is contradictory.
+    """
+    bits = _BITS[values]
+    unsolved = values == 0
+
+    # Remove placed digits from the candidates of their peers.
+    taken = np.bitwise_or.reduce(bits[:, _PEERS], axis=2)
+    new_masks = np.where(unsolved, masks & ~taken, bits).astype(np.uint16)
+
+    # A digit repeated within a unit, or a digit with nowhere to go, is a contradiction.
+    unit_bits = bits[:, _UNITS]
+    placed = np.bitwise_or.reduce(unit_bits, axis=2)
+    repeated = _POPCOUNT[unit_bits].sum(axis=2) != _POPCOUNT[placed]
+
+    # Hidden singles: digits that fit in exactly one unsolved cell of a unit.
+    unit_masks = np.where(unsolved[:, _UNITS], new_masks[:, _UNITS], 0)
+    once = np.zeros(placed.shape, dtype=np.uint16)
+    twice = np.zeros(placed.shape, dtype=np.uint16)
+    for position in range(9):
+        twice |= once & unit_masks[:, :, position]
+        once |= unit_masks[:, :, position]
+    missing = (placed | once) != ALL_CANDIDATES
+    singles = once & ~twice & ~placed
+
+    hidden = np.zeros(values.shape, dtype=np.uint16)
+    for k, cells in enumerate(_PARTITIONS):
+        partition = slice(9 * k, 9 * k + 9)
+        hidden[:, cells] |= (unit_masks[:, partition, :] & singles[:, partition, None]).reshape(-1, 81)
+
+    new_masks = np.where(hidden != 0, hidden, new_masks).astype(np.uint16)
+    new_values = np.where(unsolved, _DIGIT[new_masks], values).astype(np.uint8)
+
+    contradiction = (
+        repeated.any(axis=1)
+        | missing.any(axis=1)
+        | (unsolved & (new_masks == 0)).any(axis=1)
+        | (_POPCOUNT[hidden] > 1).any(axis=1)
+    )
+    changed = (new_values != values).any(axis=1) | (new_masks != masks).any(axis=1)
+    return new_values, new_masks, changed, contradiction
+
+
+def propagate_many(values: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """
+    Applies naked and hidden singles to every puzzle of a batch until none of them changes.
+
+    Args:
+        values: The (N, 81) array of values, 0 for empty cells; updated in place.
+        masks: The (N, 81) array of candidate masks; updated in place.
+
+    Returns:
+        A boolean array of length N, True for every contradictory puzzle.
+    """
+    contradiction = np.zeros(len(values), dtype=bool)
+    active = np.arange(len(values))
+    while len(active):
+        new_values, new_masks, changed, failed = _propagate_once(values[active], masks[active])
+        values[active] = new_values
+        masks[active] = new_masks
+        contradiction[active[failed]] = True
+        active = active[changed & ~failed]
+    return contradiction
+
+
+def solve_many(
+    puzzles: list[Puzzle],
+    backend: str = "propagation",
+    timeout: float | None = None,
+    max_nodes: int | None = None,
+) -> list[tuple[SolverResult, Puzzle]]:
+    """
+    Solves a batch of puzzles, running a vectorized propagation pass over all of them
+    first and the scalar `solve()` only on those it leaves unsolved.
+
+    Args:
+        puzzles: The puzzles to be solved. They are not modified.
+        backend: The scalar solver backend, see `sudoku.solver.BACKENDS`.
+        timeout: The time allowed for the scalar solve of every puzzle, in seconds.
+        max_nodes: The largest number of guesses allowed for every puzzle.
+
+    Returns:
+        For every puzzle, its SolverResult and resulting puzzle, as from `solve()`.
+    """
+    if not puzzles:
+        return []
+    if any(puzzle.size != 9 for puzzle in puzzles):
+        # The arrays are laid out for 9x9 grids; other sizes are solved one by one.
+        return [solve(puzzle, backend, timeout=timeout, max_nodes=max_nodes) for puzzle in puzzles]
+    values, masks = to_arrays(puzzles)
+    # Given values start with their single candidate, as in Propagator.load().
+    masks = np.where(values > 0, _BITS[values], masks).astype(np.uint16)
+    contradiction = propagate_many(values, masks)
+    solved = (values != 0).all(axis=1)
+
+    results = []
+    for n, puzzle in enumerate(puzzles):
+        if contradiction[n]:
+            results.append((SolverResult.FAILURE, puzzle.copy()))
+        elif solved[n]:
+            results.append((SolverResult.SOLVED, from_arrays(values[n], masks[n])))
+        else:
+            results.append(solve(from_arrays(values[n], masks[n]), backend, timeout=timeout, max_nodes=max_nodes))
+    return results
+
+
+# The value of every character of a puzzle line, as in `sudoku.puzzle_file`: 0 for
+# empty cells, and _INVALID for characters that are neither.
+_INVALID = 255
+_CHARACTER_VALUES = np.full(256, _INVALID, dtype=np.uint8)
+_CHARACTER_VALUES[[ord(ch) for ch in EMPTY]] = 0
+_CHARACTER_VALUES[[ord(ch) for ch in "123456789"]] = np.arange(1, 10)
+
+
+def lines_to_values(lines: list[str]) -> np.ndarray:
+    """
+    Packs 9x9 puzzles written as 81-character lines into an (N, 81) uint8 value
+    array, without building a Puzzle for any of them. Characters other than
+    digits and the empty markers become 255.
+
+    Raises:
+        ValueError: If a line is not 81 characters long.
+    """
+    for line in lines:
+        if len(line) != 81:
+            raise ValueError(f"expected 81 characters, got [{line[:100]}]")
+    data = "".join(lines).encode("ascii", "replace")
+    return _CHARACTER_VALUES[np.frombuffer(data, dtype=np.uint8)].reshape(-1, 81)
+
+
+def grade(puzzles: list[str], submissions: list[str]) -> np.ndarray:
+    """
+    Checks submitted solutions against their puzzles, all of them at once.
+
+    A submission is correct if it is a complete grid, with every digit once in
+    every row, col and section, that keeps every given of its puzzle.
+
+    Args:
+        puzzles: The puzzles, as 81-character lines.
+        submissions: The submitted grids, as 81-character lines, one per puzzle.
+
+    Returns:
+        A boolean array, True for every correct submission.
+
+    Raises:
+        ValueError: If the lists differ in length, a line is not 81 characters
+            long, or a puzzle holds a character that is neither a digit nor an
+            empty marker.
+    """
+    if len(puzzles) != len(submissions):
+        raise ValueError(f"got {len(puzzles)} puzzles but {len(submissions)} submissions")
+    givens = lines_to_values(puzzles)
+    if (givens == _INVALID).any():
+        raise ValueError("a puzzle holds a character that is not a digit or an empty marker")
+    values = lines_to_values(submissions)
+    # Anything but a digit has no candidate bit, so it fails the unit check below.
+    bits = _BITS[np.where(values == _INVALID, 0, values)]
+    # 9 cells hold the 9 digits exactly when their bits cover every candidate.
+    complete = (np.bitwise_or.reduce(bits[:, _UNITS], axis=2) == ALL_CANDIDATES).all(axis=1)
+    kept = ((givens == 0) | (givens == values)).all(axis=1)
+    return complete & kept
@@ -0,0 +1,53 @@
+import pytest
+from sudoku.batch import solve_lines, solve_stream, solve_indexed
+from sudoku.cache import SolutionCache
+from sudoku.puzzle_file import parse_puzzle
+from sudoku.solver import SolverResult
+
+EASY = ".91..82..8...93.6..5.27.83........75.6731...498..4.6..6.95..12......9456215.6...3"
+HARD = "9..6..5....5..1......2......7..94.....6.8.9..1......75.37...29...4.7..5.......6.."
+UNSOLVABLE = "11" + "." * 79
+LARGE = "123456789ABCDEFG5678DEFG12349ABC9ABC1234DEFG5678" + "." * 208
+
+
+def test_solve_lines():
+    (result, solution), (failed, line) = solve_lines([EASY, UNSOLVABLE])
+    assert result == SolverResult.SOLVED
+    assert parse_puzzle(solution).is_solved()
+    assert failed == SolverResult.FAILURE
+    assert line == UNSOLVABLE
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_solve_lines_with_cache(vectorized):
+    if vectorized:
+        pytest.importorskip("numpy")
+    cache = SolutionCache()
+    # Only sparse 9x9 puzzles are cached; larger and denser ones are solved all the same.
+    for _ in range(2):
+        (result, solution), (large, line), (easy, _) = solve_lines(
+            [HARD, LARGE, EASY], vectorized=vectorized, cache=cache
+        )
+        assert easy == SolverResult.SOLVED
+        assert result == SolverResult.SOLVED and large == SolverResult.SOLVED
+        assert parse_puzzle(line).is_solved() and line.startswith(LARGE[:48])
+    assert len(cache) == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_solve_stream_keeps_order(jobs):
+    lines = [EASY, UNSOLVABLE] * 5
+    results = list(solve_stream(iter(lines), jobs=jobs, chunk_size=3))
+    assert [result for result, _ in results] == [SolverResult.SOLVED, SolverResult.FAILURE] * 5
+    assert results[0] == results[2]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_solve_indexed(ordered):
+    lines = [EASY, UNSOLVABLE] * 5
+    results = list(solve_indexed(iter(lines), jobs=2, chunk_size=3, ordered=ordered))
+    assert sorted(index for index, _, _ in results) == list(range(10))
+    if ordered:
+        assert [index for index, _, _ in results] == list(range(10))
+    for index, result, line in results:
+        assert result == (SolverResult.SOLVED if index % 2 == 0 else SolverResult.FAILURE)
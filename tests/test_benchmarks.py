@@ -0,0 +1,86 @@
+import random
+import subprocess
+import sys
+import pytest
+from benchmarks.corpus import TIERS, LARGE_TIERS, load_tier, shuffle_grid
+from benchmarks import runner, startup
+from sudoku.dlx import DancingLinks
+from sudoku.puzzle_file import parse_puzzle
+
+
+@pytest.mark.parametrize("name", TIERS)
+def test_tiers_are_deterministic(name):
+    lines = load_tier(name, 3, seed=7)
+    assert lines == load_tier(name, 3, seed=7)
+    for line in lines:
+        assert len(line) == 81
+        assert parse_puzzle(line).is_valid()
+
+
+def test_shuffle_grid_keeps_unique_solution():
+    line = load_tier("sudoku17", 1)[0]
+    shuffled = shuffle_grid(line, random.Random(3))
+    assert sum(ch != "." for ch in shuffled) == 17
+    assert DancingLinks(parse_puzzle(shuffled)).search(limit=2) == 1
+
+
+def test_run_tier():
+    result = runner.run_tier(load_tier("easy", 4))
+    assert result["puzzles"] == result["solved"] == 4
+    assert result["puzzles_per_second"] > 0
+    assert result["p50_ms"] <= result["p99_ms"]
+    assert result["peak_memory_kib"] > 0
+    assert result["steps"] >= 4
+
+
+def test_compare(tmp_path):
+    report = runner.run(["examples"], count=1)
+    path = tmp_path / "report.json"
+    runner.save(report, path)
+    baseline = runner.load(path)
+    assert runner.compare(baseline, baseline) == []
+
+    slower = runner.load(path)
+    slower["tiers"]["examples"]["puzzles_per_second"] /= 2
+    slower["tiers"]["examples"]["guesses"] += 10
+    regressions = runner.compare(baseline, slower)
+    assert len(regressions) == 2
+    assert all(regression.startswith("examples:") for regression in regressions)
+
+
+def test_core_imports_only_the_standard_library():
+    code = (
+        "import sys; import sudoku.solver, sudoku.batch, sudoku.cache, sudoku.generator; "
+        f"print([name for name in {startup.HEAVY_MODULES!r} if name in sys.modules])"
+    )
+    done = subprocess.run([sys.executable, "-c", code], cwd=startup.ROOT, capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("args", [["solve", "examples/easy.txt"], ["examples/easy.txt"]])
+def test_cli_solve_imports_only_the_standard_library(args):
+    code = (
+        f"import runpy, sys; sys.argv = ['solve_sudoku.py', *{args!r}]; "
+        "runpy.run_path('solve_sudoku.py', run_name='__main__'); "
+        f"print([name for name in {startup.HEAVY_MODULES!r} if name in sys.modules], file=sys.stderr)"
+    )
+    done = subprocess.run([sys.executable, "-c", code], cwd=startup.ROOT, capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    assert "Solved Puzzle:" in done.stdout
+    assert "[green]" not in done.stdout
+    assert done.stderr.strip() == "[]"
+
+
+def test_startup_within_budget():
+    assert startup.over_budget(startup.run(runs=3)) == []
+
+
+@pytest.mark.parametrize("name", LARGE_TIERS)
+def test_large_tiers(name):
+    lines = load_tier(name, 2, seed=7)
+    assert lines == load_tier(name, 2, seed=7)
+    for line in lines:
+        puzzle = parse_puzzle(line)
+        assert puzzle.size == int(name.split("x")[0])
+        assert puzzle.is_valid()
@@ -0,0 +1,86 @@
+import random
+import time
+from pathlib import Path
+from sudoku.puzzle_file import read_puzzle, format_puzzle
+from sudoku.solver import solve, SolverResult
+from sudoku.stats import SolveStats
+from sudoku.canonical import random_transform
+from sudoku.cache import SolutionCache, is_cacheable
+from sudoku.batch import solve_stream
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_equivalent_puzzles_hit_the_cache():
+    rng = random.Random(0)
+    puzzle = read_puzzle(EXAMPLES / "expert2.txt")
+    cache = SolutionCache()
+    stats = SolveStats()
+    solve(puzzle, cache=cache, stats=stats)
+    assert len(cache) == 1 and stats.cache_hits == 0
+
+    for _ in range(5):
+        variant = random_transform(rng).apply_puzzle(puzzle)
+        result, solved = solve(variant, cache=cache, stats=stats)
+        assert result == SolverResult.SOLVED
+        assert solved.is_solved() and solved.is_valid()
+        assert all(v == s for v, s in zip(variant._values, solved._values) if v)
+    assert stats.cache_hits == 5
+    assert stats.puzzles == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SolutionCache(maxsize=2)
+    cache.store("a" * 81, "1" * 81)
+    cache.store("b" * 81, "2" * 81)
+    assert cache.lookup("a" * 81) == "1" * 81
+    cache.store("c" * 81, "3" * 81)
+    assert "b" * 81 not in cache
+    assert ["a" * 81, "c" * 81] == [key for key, _ in cache.items()]
+
+
+def test_cache_save_and_load(tmp_path):
+    path = tmp_path / "cache.txt"
+    puzzle = read_puzzle(EXAMPLES / "hard.txt")
+    cache = SolutionCache(path=str(path))
+    _, solved = solve(puzzle)
+    cache.put(puzzle, solved)
+    cache.save()
+
+    loaded = SolutionCache(path=str(path))
+    assert list(loaded.items()) == list(cache.items())
+    assert loaded.get(puzzle) == solved
+
+
+def test_puzzles_with_reduced_candidates_bypass_the_cache():
+    puzzle = read_puzzle(EXAMPLES / "hard.txt")
+    cell = next(puzzle[i // 9, i % 9] for i in range(81) if not puzzle._values[i])
+    cell.possible_values = {1, 2}
+    cache = SolutionCache()
+    solve(puzzle, cache=cache)
+    assert len(cache) == 0
+    assert cache.get(puzzle) is None
+
+
+def test_dense_puzzles_bypass_the_cache():
+    _, grid = solve(read_puzzle(EXAMPLES / "expert.txt"))
+    assert is_cacheable(read_puzzle(EXAMPLES / "expert.txt")) and not is_cacheable(grid)
+    cache = SolutionCache()
+    # A full grid would take about 300 ms to canonicalize.
+    start = time.perf_counter()
+    for _ in range(10):
+        assert solve(grid, cache=cache)[0] == SolverResult.SOLVED
+    assert time.perf_counter() - start < 0.5
+    assert len(cache) == 0
+
+
+def test_solve_stream_fills_the_cache_from_workers():
+    rng = random.Random(1)
+    puzzle = read_puzzle(EXAMPLES / "expert2.txt")
+    lines = [format_puzzle(puzzle)] + [format_puzzle(random_transform(rng).apply_puzzle(puzzle)) for _ in range(3)]
+    cache = SolutionCache()
+    stats = SolveStats()
+    results = list(solve_stream(lines, jobs=2, chunk_size=1, stats=stats, cache=cache))
+    assert all(result == SolverResult.SOLVED for result, _ in results)
+    assert len(cache) == 1
+    assert stats.puzzles + stats.cache_hits == 4
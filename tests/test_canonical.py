@@ -0,0 +1,37 @@
+import random
+from pathlib import Path
+import pytest
+from sudoku.puzzle import Puzzle
+from sudoku.puzzle_file import read_puzzle, format_puzzle
+from sudoku.solver import solve
+from sudoku.canonical import canonical_form, random_transform, IDENTITY
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+@pytest.mark.parametrize("path", sorted(EXAMPLES.glob("*.txt")), ids=lambda path: path.stem)
+def test_canonical_form_is_shared_by_equivalent_puzzles(path):
+    rng = random.Random(path.stem)
+    puzzle = read_puzzle(path)
+    key, transform = canonical_form(puzzle)
+    assert format_puzzle(transform.apply_puzzle(puzzle)) == key
+    assert key <= format_puzzle(puzzle)
+    for _ in range(5):
+        assert canonical_form(random_transform(rng).apply_puzzle(puzzle))[0] == key
+
+
+def test_transform_inverse():
+    rng = random.Random(0)
+    puzzle = read_puzzle(EXAMPLES / "hard.txt")
+    for _ in range(10):
+        transform = random_transform(rng)
+        assert transform.inverse().apply_puzzle(transform.apply_puzzle(puzzle)) == puzzle
+    assert IDENTITY.apply_puzzle(puzzle) == puzzle
+
+
+def test_canonical_form_of_degenerate_grids():
+    assert canonical_form(Puzzle())[0] == "." * 81
+    _, solved = solve(Puzzle())
+    key, _ = canonical_form(solved)
+    assert key.startswith("123456789456789123789")
+    assert canonical_form(random_transform(random.Random(1)).apply_puzzle(solved))[0] == key
@@ -1,4 +1,4 @@
-from sudoku.cell import Cell
+from sudoku.cell import Cell, ALL_CANDIDATES, to_mask, from_mask
 
 
 def test_cell_initialization():
@@ -39,3 +39,10 @@ def test_cell_equality():
 
     cell1.set_value(5)
     assert cell1 == cell4
+
+
+def test_mask_round_trip():
+    assert to_mask({1, 9}) == 0b100000001
+    assert from_mask(0b100000001) == {1, 9}
+    assert from_mask(ALL_CANDIDATES) == set(range(1, 10))
+    assert to_mask(set()) == 0
@@ -0,0 +1,115 @@
+import io
+import pytest
+from pathlib import Path
+from sudoku.puzzle_file import read_puzzle, format_puzzle
+from sudoku.solver import solve, SolverResult
+from sudoku.corpus_file import (
+    Corpus,
+    ENCODINGS,
+    encode,
+    encode_many,
+    decode,
+    check_lengths,
+    is_corpus,
+    write_corpus,
+    shards,
+    text_to_corpus,
+    corpus_to_text,
+)
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+LINES = [format_puzzle(read_puzzle(path)) for path in sorted(EXAMPLES.glob("*.txt"))]
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_encode_round_trip(encoding):
+    for line in LINES:
+        record = encode(line, encoding)
+        assert len(record) == (41 if encoding == "nibbles" else 81)
+        assert decode(record, encoding) == line
+    assert decode(encode("0x" + LINES[0][2:], encoding), encoding) == ".." + LINES[0][2:]
+    with pytest.raises(ValueError):
+        encode("a" + LINES[0][1:], encoding)
+    assert encode_many(LINES, encoding) == b"".join(encode(line, encoding) for line in LINES)
+    assert encode_many([], encoding) == b""
+    with pytest.raises(ValueError):
+        encode_many([LINES[0], "a" + LINES[0][1:]], encoding)
+    with pytest.raises(ValueError, match="9x9"):
+        encode_many([LINES[0], "." * 256], encoding)
+    checked = check_lengths(LINES + ["." * 256])
+    assert [next(checked) for _ in LINES] == LINES
+    with pytest.raises(ValueError, match="9x9"):
+        next(checked)
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_random_access(tmp_path, encoding):
+    path = tmp_path / "corpus.sdk"
+    assert write_corpus(path, iter(LINES * 3), encoding) == 15
+    assert is_corpus(str(path))
+    with Corpus(path) as corpus:
+        assert len(corpus) == 15
+        assert corpus[7] == LINES[2]
+        assert corpus[-1] == LINES[-1]
+        assert format_puzzle(corpus.puzzle(3)) == LINES[3]
+        assert list(corpus.iter_lines(12)) == LINES[2:]
+        assert [line for r in shards(len(corpus), 4) for line in corpus.iter_lines(r.start, r.stop)] == LINES * 3
+        assert not corpus.has_results
+        with pytest.raises(IndexError):
+            corpus[15]
+
+
+@pytest.mark.parametrize("results", [False, True])
+def test_corrupt_corpus(tmp_path, results):
+    path = tmp_path / "corpus.sdk"
+    write_corpus(path, LINES, results=results)
+    data = path.read_bytes()
+    # An unknown encoding, a truncated file, a count larger than the file holds,
+    # and trailing bytes.
+    for corrupt in (
+        data[:5] + bytes([len(ENCODINGS)]) + data[6:],
+        data[:-1],
+        data[:8] + (len(LINES) + 1).to_bytes(8, "little") + data[16:],
+        data + b"\0",
+    ):
+        path.write_bytes(corrupt)
+        with pytest.raises(ValueError, match="not a puzzle corpus"):
+            Corpus(path)
+
+
+def test_shards():
+    assert shards(10, 3) == [range(0, 4), range(4, 7), range(7, 10)]
+    assert shards(2, 3) == [range(0, 1), range(1, 2), range(2, 2)]
+
+
+def test_results_and_resume(tmp_path):
+    path = tmp_path / "corpus.sdk"
+    write_corpus(path, LINES, results=True)
+    with Corpus(path, writable=True) as corpus:
+        assert corpus.first_unsolved() == 0
+        for i in range(2):
+            result, solved = solve(corpus.puzzle(i))
+            corpus.set_result(i, result, format_puzzle(solved))
+        corpus.set_result(2, SolverResult.FAILURE)
+
+    with Corpus(path) as corpus:
+        assert corpus.first_unsolved() == 3
+        result, solution = corpus.result(0)
+        assert result == SolverResult.SOLVED
+        assert all(c == "." or c == s for c, s in zip(corpus[0], solution))
+        assert corpus.result(2) == (SolverResult.FAILURE, None)
+        assert corpus.result(3) == (None, None)
+        assert list(corpus.iter_lines(corpus.first_unsolved())) == LINES[3:]
+
+
+def test_text_conversion(tmp_path):
+    text = tmp_path / "puzzles.txt"
+    text.write_text("\n".join(LINES) + "\n")
+    path = tmp_path / "corpus.sdk"
+    assert text_to_corpus(str(text), str(path)) == len(LINES)
+    assert not is_corpus(str(text))
+    out = io.StringIO()
+    assert corpus_to_text(str(path), out) == len(LINES)
+    assert out.getvalue() == text.read_text()
+    with pytest.raises(ValueError):
+        Corpus(text)
@@ -0,0 +1,34 @@
+from sudoku.puzzle import Puzzle
+from sudoku.cell import Cell
+from sudoku.dlx import DancingLinks, solve_dlx
+
+
+def test_solve_dlx_keeps_givens():
+    puzzle = Puzzle()
+    puzzle[0, 0] = Cell(value=5)
+    puzzle[4, 4] = Cell(value=1)
+    solved = solve_dlx(puzzle)
+    assert solved.is_solved()
+    assert solved.is_valid()
+    assert solved[0, 0].value == 5
+    assert solved[4, 4].value == 1
+    assert puzzle[1, 1].value is None
+
+
+def test_solve_dlx_respects_candidates():
+    puzzle = Puzzle()
+    puzzle[0, 0].possible_values = {7}
+    solved = solve_dlx(puzzle)
+    assert solved[0, 0].value == 7
+
+
+def test_search_counts_up_to_limit():
+    assert DancingLinks(Puzzle()).search(limit=3) == 3
+
+
+def test_solve_dlx_no_solution():
+    puzzle = Puzzle()
+    for col in range(1, 9):
+        puzzle[0, col] = Cell(value=col)
+    puzzle[0, 0].possible_values = {1}
+    assert solve_dlx(puzzle) is None
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+from pathlib import Path
+from sudoku.puzzle import Puzzle
+from sudoku.cell import Cell
+from sudoku.puzzle_file import read_puzzle
+from sudoku.solver import solve, try_solve_puzzle, SolverResult
+from sudoku.events import EventKind
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_solve_reports_guesses_and_backtracks():
+    events = []
+    result, puzzle = solve(read_puzzle(EXAMPLES / "expert2.txt"), observer=events.append)
+    assert result == SolverResult.SOLVED
+    kinds = {event.kind for event in events}
+    assert kinds == set(EventKind)
+    guesses = [event for event in events if event.kind == EventKind.GUESS]
+    assert all(len(event.digits) == 1 and event.depth >= 1 for event in guesses)
+    iterations = [event.iteration for event in events if event.kind == EventKind.ITERATION]
+    assert iterations == sorted(iterations)
+
+
+def test_elimination_events_match_final_state():
+    events = []
+    puzzle = read_puzzle(EXAMPLES / "easy.txt")
+    result, solved, _ = try_solve_puzzle(puzzle, observer=events.append)
+    assert result == SolverResult.SOLVED
+    for event in events:
+        if event.kind == EventKind.ELIMINATION:
+            row, col = event.position
+            assert solved[row, col].value not in event.digits
+
+
+def test_try_solve_puzzle_reports_contradiction():
+    events = []
+    puzzle = Puzzle()
+    puzzle[0, 0] = Cell(value=1)
+    puzzle[0, 1] = Cell(value=1)
+    result, _, _ = try_solve_puzzle(puzzle, iteration_from=5, observer=events.append)
+    assert result == SolverResult.FAILURE
+    assert events[-1].kind == EventKind.CONTRADICTION
+    assert events[-1].iteration == 5
+
+
+def test_solver_does_not_print_or_import_rich():
+    code = (
+        "import sys; from sudoku.solver import solve; from sudoku.puzzle import Puzzle; "
+        "solve(Puzzle()); assert 'rich' not in sys.modules"
+    )
+    done = subprocess.run(
+        [sys.executable, "-c", code], cwd=EXAMPLES.parent, capture_output=True, text=True
+    )
+    assert done.returncode == 0, done.stderr
+    assert done.stdout == ""
@@ -0,0 +1,58 @@
+import random
+from pathlib import Path
+import pytest
+from sudoku.puzzle_file import read_puzzle, parse_puzzle
+from sudoku.solver import has_unique_solution
+from sudoku.generator import random_grid, grade, dig, generate, generate_stream
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_random_grid():
+    grid = random_grid(random.Random(0))
+    assert grid.is_solved() and grid.is_valid()
+    assert grid != random_grid(random.Random(1))
+
+
+@pytest.mark.parametrize(
+    "name, difficulty", [("easy", "easy"), ("normal", "medium"), ("hard", "medium"), ("expert", "hard")]
+)
+def test_grade(name, difficulty):
+    assert grade(read_puzzle(EXAMPLES / f"{name}.txt")) == difficulty
+
+
+def test_dig_keeps_solution_unique():
+    rng = random.Random(2)
+    grid = random_grid(rng)
+    puzzle = dig(grid, rng, difficulty="easy")
+    assert has_unique_solution(puzzle)
+    assert grade(puzzle) == "easy"
+    assert all(v == g for v, g in zip(puzzle._values, grid._values) if v)
+
+
+def test_generate_with_clues():
+    puzzle = generate(random.Random(3), clues=30)
+    assert 81 - puzzle._values.count(0) == 30
+    assert has_unique_solution(puzzle)
+
+
+def test_generate_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        generate(random.Random(0), clues=16)
+    with pytest.raises(ValueError):
+        generate(random.Random(0), difficulty="fiendish")
+
+
+def test_generate_gives_up():
+    # No easy puzzle has as few as 17 clues.
+    with pytest.raises(ValueError, match="3 attempts"):
+        generate(random.Random(0), clues=17, difficulty="easy", max_attempts=3)
+    with pytest.raises(ValueError):
+        list(generate_stream(2, clues=17, seed=0, jobs=2, chunk_size=1, max_attempts=2))
+
+
+def test_generate_stream_does_not_depend_on_jobs():
+    lines = list(generate_stream(5, clues=36, seed=4, jobs=1, chunk_size=2))
+    assert lines == list(generate_stream(5, clues=36, seed=4, jobs=2, chunk_size=2))
+    assert len(set(lines)) == 5
+    assert all(has_unique_solution(parse_puzzle(line)) for line in lines)
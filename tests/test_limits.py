@@ -0,0 +1,99 @@
+import threading
+import pytest
+from pathlib import Path
+from sudoku.puzzle import Puzzle
+from sudoku.puzzle_file import read_puzzle, format_puzzle
+from sudoku.limits import Limits, SolveInterrupted, make_limits
+from sudoku.solver import solve, count_solutions, has_unique_solution, try_solve_puzzle, SolverResult, BACKENDS
+from sudoku.batch import solve_lines
+from sudoku.stats import SolveStats
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_limits():
+    assert make_limits() is None
+    limits = Limits(max_nodes=2)
+    limits.node()
+    limits.node()
+    with pytest.raises(SolveInterrupted):
+        limits.node()
+    with pytest.raises(TimeoutError):
+        Limits(timeout=0).check()
+    cancel = threading.Event()
+    limits = Limits(cancel=cancel)
+    limits.check()
+    cancel.set()
+    with pytest.raises(SolveInterrupted):
+        limits.check()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_solve_stops_at_max_nodes(backend):
+    puzzle = read_puzzle(EXAMPLES / "expert.txt")
+    result, partial = solve(puzzle, backend, max_nodes=0)
+    assert result == SolverResult.TIMEOUT
+    # Left without any guess, for the "propagation" backend after its propagation.
+    given, left = format_puzzle(puzzle), format_puzzle(partial)
+    assert not partial.is_solved()
+    assert all(left[i] == given[i] for i in range(81) if given[i] != ".")
+    result, solved = solve(puzzle, backend, max_nodes=10_000)
+    assert result == SolverResult.SOLVED and solved.is_solved()
+
+
+def test_solve_stops_on_cancel_and_timeout():
+    puzzle = read_puzzle(EXAMPLES / "expert.txt")
+    cancel = threading.Event()
+    cancel.set()
+    assert solve(puzzle, cancel=cancel)[0] == SolverResult.TIMEOUT
+    assert solve(puzzle, timeout=0)[0] == SolverResult.TIMEOUT
+    assert try_solve_puzzle(puzzle, timeout=0)[0] == SolverResult.TIMEOUT
+    assert try_solve_puzzle(puzzle, cancel=cancel)[0] == SolverResult.TIMEOUT
+    # Propagation alone makes no guess.
+    assert try_solve_puzzle(read_puzzle(EXAMPLES / "easy.txt"), max_nodes=0)[0] == SolverResult.SOLVED
+    # An easy puzzle, solved by propagation alone, still stops at the deadline.
+    assert solve(read_puzzle(EXAMPLES / "easy.txt"), timeout=0)[0] == SolverResult.TIMEOUT
+
+
+def test_timeout_stats():
+    stats = SolveStats()
+    solve(read_puzzle(EXAMPLES / "expert.txt"), stats=stats, max_nodes=0)
+    solve(read_puzzle(EXAMPLES / "easy.txt"), stats=stats, max_nodes=0)
+    assert stats.puzzles == 2 and stats.timeouts == 1
+
+
+def test_count_solutions_raises():
+    with pytest.raises(TimeoutError):
+        count_solutions(Puzzle(), limit=1000, max_nodes=100)
+    with pytest.raises(TimeoutError):
+        count_solutions(Puzzle(), limit=1000, backend="dlx", max_nodes=100)
+    puzzle = read_puzzle(EXAMPLES / "expert.txt")
+    for backend in BACKENDS:
+        with pytest.raises(TimeoutError):
+            has_unique_solution(puzzle, backend, max_nodes=0)
+        assert has_unique_solution(puzzle, backend, timeout=60, max_nodes=10_000)
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(TimeoutError):
+        has_unique_solution(puzzle, cancel=cancel)
+
+
+def test_parallel_search_stops():
+    puzzle = Puzzle(box=2)
+    with pytest.raises(TimeoutError):
+        count_solutions(puzzle, limit=1000, workers=2, max_nodes=5)
+    expert = read_puzzle(EXAMPLES / "expert.txt")
+    result, partial = solve(expert, workers=2, max_nodes=0)
+    assert result == SolverResult.TIMEOUT
+    # The partial puzzle is the propagated one, as in a serial solve.
+    assert partial == solve(expert, max_nodes=0)[1] != expert
+    stats = SolveStats()
+    assert solve(expert, workers=2, stats=stats, timeout=0)[0] == SolverResult.TIMEOUT
+    assert stats.puzzles == 1 and stats.timeouts == 1
+
+
+def test_batch_writes_back_timed_out_puzzles():
+    lines = [format_puzzle(read_puzzle(EXAMPLES / name)) for name in ("easy.txt", "expert.txt")]
+    (easy, _), (expert, line) = solve_lines(lines, max_nodes=0)
+    assert easy == SolverResult.SOLVED
+    assert expert == SolverResult.TIMEOUT and line == lines[1]
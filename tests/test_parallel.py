@@ -0,0 +1,55 @@
+import pytest
+from pathlib import Path
+from sudoku.puzzle import Puzzle
+from sudoku.puzzle_file import read_puzzle
+from sudoku.propagation import Propagator
+from sudoku.parallel import search, _explore
+from sudoku.solver import solve, count_solutions, SolverResult
+from sudoku.stats import SolveStats
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_split_covers_the_tree():
+    # Split at every node, and search the pieces one by one.
+    pending = [(Puzzle(box=2).to_bytes(), 0)]
+    total = splits = 0
+    while pending:
+        state, depth = pending.pop()
+        propagator = Propagator(Puzzle.from_bytes(state))
+        propagator.load()
+        if propagator.propagate():
+            found, _, rest = _explore(propagator, 1000, lambda: True, 0, depth)
+            total += found
+            splits += bool(rest)
+            pending.extend(rest)
+    assert total == 288
+    assert splits > 10
+
+
+def test_search_counts_over_workers():
+    assert search(Puzzle(box=2), workers=2, limit=1000, serial_time=0)[0] == 288
+    assert search(Puzzle(box=2), workers=2, limit=10, serial_time=0)[0] == 10
+
+
+def test_search_solves_over_workers():
+    puzzle = read_puzzle(EXAMPLES / "expert.txt")
+    stats = SolveStats()
+    found, solved, root = search(puzzle, workers=2, serial_time=0, stats=stats)
+    assert found == 1 and solved == solve(puzzle)[1]
+    assert stats.puzzles == 1 and stats.guesses > 0
+    assert set(stats.times) == {"propagation", "search"}
+
+    puzzle[0, 0].set_value(puzzle[0, 1].value or 1)
+    puzzle[0, 1].set_value(puzzle[0, 0].value)
+    assert search(puzzle, workers=2, serial_time=0)[:2] == (0, None)
+
+
+def test_solve_with_workers():
+    result, solved = solve(Puzzle(), workers=2)
+    assert result == SolverResult.SOLVED and solved.is_solved() and solved.is_valid()
+    assert count_solutions(read_puzzle(EXAMPLES / "hard.txt"), workers=2) == 1
+    with pytest.raises(ValueError):
+        solve(Puzzle(), backend="dlx", workers=2)
+    with pytest.raises(ValueError):
+        count_solutions(Puzzle(), backend="dlx", workers=2)
@@ -0,0 +1,38 @@
+import pytest
+from pathlib import Path
+from sudoku.puzzle_file import read_puzzle, parse_puzzle
+from sudoku.portfolio import Portfolio, Strategy, STRATEGIES, solve_portfolio
+from sudoku.solver import solve, SolverResult
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_portfolio_solves():
+    names = {strategy.name for strategy in STRATEGIES}
+    with Portfolio() as portfolio:
+        for name in ("easy.txt", "expert.txt", "hard.txt"):
+            puzzle = read_puzzle(EXAMPLES / name)
+            result, solved, winner = portfolio.solve(puzzle)
+            assert result == SolverResult.SOLVED and solved == solve(puzzle)[1]
+            assert winner in names
+        result, _, winner = portfolio.solve(parse_puzzle("11" + "." * 79))
+        assert result == SolverResult.FAILURE and winner in names
+        assert sum(portfolio.wins.values()) == 4
+
+
+def test_portfolio_timeout():
+    puzzle = read_puzzle(EXAMPLES / "expert.txt")
+    result, partial, winner = solve_portfolio(puzzle, timeout=0)
+    assert result == SolverResult.TIMEOUT and winner is None
+    assert partial == puzzle
+
+
+def test_portfolio_checks_strategies():
+    with pytest.raises(ValueError):
+        Portfolio(())
+    with pytest.raises(ValueError):
+        Portfolio((Strategy("a"), Strategy("a", backend="dlx")))
+    with pytest.raises(ValueError):
+        Portfolio((Strategy("a", backend="nope"),))
+    with pytest.raises(ValueError):
+        Portfolio((Strategy("a", techniques=("nope",)),))
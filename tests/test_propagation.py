@@ -0,0 +1,112 @@
+from pathlib import Path
+from sudoku.puzzle import Puzzle
+from sudoku.puzzle_file import read_puzzle
+import pytest
+from sudoku.propagation import Propagator
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_assign_removes_value_from_peers_only():
+    puzzle = Puzzle()
+    propagator = Propagator(puzzle)
+    assert propagator.assign(0, 5)
+    assert propagator.propagate()
+    assert 5 not in puzzle[0, 8].possible_values
+    assert 5 not in puzzle[8, 0].possible_values
+    assert 5 not in puzzle[2, 2].possible_values
+    assert 5 in puzzle[4, 4].possible_values
+
+
+def test_naked_single_is_assigned():
+    puzzle = Puzzle()
+    propagator = Propagator(puzzle)
+    assert propagator.eliminate(0, 0b011111111)
+    assert puzzle[0, 0].value == 9
+    assert propagator.propagate()
+    assert 9 not in puzzle[0, 1].possible_values
+
+
+def test_hidden_single_is_assigned():
+    puzzle = Puzzle()
+    propagator = Propagator(puzzle)
+    for col in range(1, 9):
+        assert propagator.eliminate(col, 1)
+    assert propagator.propagate()
+    assert puzzle[0, 0].value == 1
+
+
+def test_hidden_singles_can_be_turned_off():
+    puzzle = Puzzle()
+    propagator = Propagator(puzzle, ("singles",))
+    for col in range(1, 9):
+        assert propagator.eliminate(col, 1)
+    assert propagator.propagate()
+    assert puzzle[0, 0].value is None
+
+
+def test_pointing():
+    puzzle = Puzzle()
+    propagator = Propagator(puzzle, ("singles", "pointing"))
+    # 1 is left only in the top row of the first section.
+    for i in (9, 10, 11, 18, 19, 20):
+        assert propagator.eliminate(i, 1)
+    assert propagator.propagate()
+    assert 1 not in puzzle[0, 3].possible_values
+    assert 1 not in puzzle[0, 8].possible_values
+    assert 1 in puzzle[0, 0].possible_values
+    assert 1 in puzzle[1, 3].possible_values
+    assert propagator.eliminated[2] == 6
+
+
+def test_box_line_reduction():
+    puzzle = Puzzle()
+    propagator = Propagator(puzzle, ("singles", "box_line"))
+    # 1 is left only in the first section of the top row.
+    for col in range(3, 9):
+        assert propagator.eliminate(col, 1)
+    assert propagator.propagate()
+    assert 1 not in puzzle[1, 0].possible_values
+    assert 1 not in puzzle[2, 2].possible_values
+    assert 1 in puzzle[0, 0].possible_values
+    assert 1 in puzzle[3, 0].possible_values
+    assert propagator.eliminated[3] == 6
+
+
+def test_x_wing():
+    puzzle = Puzzle()
+    propagator = Propagator(puzzle, ("singles", "x_wing"))
+    # 1 is left only in cols 0 and 4 of rows 0 and 4.
+    for row in (0, 4):
+        for col in (1, 2, 3, 5, 6, 7, 8):
+            assert propagator.eliminate(row * 9 + col, 1)
+    assert propagator.propagate()
+    for row in (1, 2, 3, 5, 6, 7, 8):
+        assert 1 not in puzzle[row, 0].possible_values
+        assert 1 not in puzzle[row, 4].possible_values
+        assert 1 in puzzle[row, 1].possible_values
+    assert 1 in puzzle[4, 4].possible_values
+    assert propagator.eliminated[5] == 14
+
+
+def test_unknown_technique():
+    with pytest.raises(ValueError):
+        Propagator(Puzzle(), ("singles", "swordfish"))
+
+
+def test_contradiction():
+    puzzle = Puzzle()
+    puzzle[0, 0].set_value(1)
+    puzzle[0, 5].set_value(1)
+    propagator = Propagator(puzzle)
+    propagator.load()
+    assert not propagator.propagate()
+
+
+def test_load_and_propagate_solves_easy_puzzle():
+    puzzle = read_puzzle(EXAMPLES / "easy.txt")
+    propagator = Propagator(puzzle)
+    propagator.load()
+    assert propagator.propagate()
+    assert puzzle.is_solved()
+    assert puzzle.is_valid()
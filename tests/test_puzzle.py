@@ -1,5 +1,9 @@
-from sudoku.puzzle import Puzzle
+import pickle
+import pytest
+from sudoku.puzzle import Puzzle, STATE_MAGIC
 from sudoku.cell import Cell
+from sudoku.propagation import Propagator
+from sudoku.units import BOX_SIZES
 
 
 def test_puzzle_initialization():
@@ -123,4 +127,127 @@ def test_is_valid():
     puzzle[0, 1] = Cell(value=2)
     puzzle[1, 0] = Cell(value=3)
     puzzle[1, 1] = Cell(value=4)
-    assert puzzle.is_valid()
\ No newline at end of file
+    assert puzzle.is_valid()
+
+
+def test_is_valid_follows_writes():
+    puzzle = Puzzle()
+    assert puzzle.is_valid()
+    cell = Cell(value=1)
+    puzzle[0, 0] = cell
+    puzzle[0, 8].value = 1
+    assert not puzzle.is_valid()
+    copy = puzzle.copy()
+    puzzle[0, 8].value = None
+    assert puzzle.is_valid() and not copy.is_valid()
+    puzzle[8, 0].set_value(1)
+    assert not puzzle.is_valid()
+    cell.value = 2
+    assert puzzle.is_valid()
+    puzzle[0, 0] = Cell(value=3)
+    puzzle[1, 1] = Cell(value=3)
+    puzzle[2, 2] = Cell(value=3)
+    assert not puzzle.is_valid()
+    puzzle[1, 1] = Cell()
+    assert not puzzle.is_valid()
+    puzzle[2, 2] = Cell()
+    assert puzzle.is_valid()
+
+
+def test_is_valid_follows_the_propagator():
+    puzzle = Puzzle()
+    assert puzzle.is_valid()
+    propagator = Propagator(puzzle)
+    mark = propagator.mark()
+    assert propagator.assign(0, 1) and propagator.propagate()
+    # Without elimination in between, a repeated value is counted.
+    puzzle._masks[1] |= 1
+    assert propagator.assign(1, 1)
+    assert not puzzle.is_valid()
+    propagator.undo(mark)
+    assert puzzle.is_valid() and puzzle == Puzzle()
+
+def test_cell_view_writes_through():
+    puzzle = Puzzle()
+    view = puzzle[4, 5]
+    view.possible_values -= {1, 2}
+    assert puzzle[4, 5].possible_values == set(range(3, 10))
+    view.set_value(7)
+    assert puzzle[4, 5] == Cell(value=7, possible_values={7})
+    detached = puzzle[4, 5].copy()
+    puzzle[4, 5].value = None
+    assert detached.value == 7
+
+
+def test_assigned_cell_is_bound():
+    puzzle = Puzzle()
+    cell = Cell(value=5)
+    puzzle[0, 0] = cell
+    puzzle._values[0] = 6
+    assert cell.value == 6 and puzzle[0, 0] is cell
+    cell.set_value(7)
+    assert puzzle[0, 0].value == 7 and next(puzzle.rows())[0].cell is cell
+    # A cell assigned in its place leaves it as it was.
+    puzzle[0, 0] = Cell(value=8)
+    assert cell.value == 7 and puzzle[0, 0].value == 8
+    other = Puzzle()
+    other[0, 0] = puzzle[0, 0]
+    other[0, 0].value = 9
+    assert puzzle[0, 0].value == 8
+
+
+def test_default_cell_takes_the_candidates_of_the_grid():
+    puzzle = Puzzle(box=4)
+    puzzle[0, 0] = Cell()
+    assert puzzle[0, 0].possible_values == set(range(1, 17))
+    puzzle[0, 1] = Cell(possible_values=range(1, 10))
+    assert puzzle[0, 1].possible_values == set(range(1, 10))
+    puzzle[0, 2] = Cell(value=12)
+    assert puzzle[0, 2].value == 12 and puzzle[0, 2].possible_values == set(range(1, 17))
+
+
+def test_copy_is_independent():
+    puzzle = Puzzle()
+    puzzle[0, 0].set_value(3)
+    other = puzzle.copy()
+    assert other == puzzle
+    other[0, 0].set_value(4)
+    assert puzzle[0, 0].value == 3
+    assert other != puzzle
+
+
+@pytest.mark.parametrize("box", BOX_SIZES)
+def test_state_round_trip(box):
+    puzzle = Puzzle(box=box)
+    n = box * box
+    puzzle[0, 0].set_value(n)
+    puzzle._masks[1] = 0b101
+    puzzle._masks[n * n - 1] = 1 << (n - 1)
+    state = puzzle.to_bytes()
+    assert state.startswith(STATE_MAGIC) and len(state) == puzzle.state_size()
+    decoded = Puzzle.from_bytes(state)
+    assert decoded == puzzle and decoded.size == n
+    assert decoded._masks.typecode == puzzle._masks.typecode
+    assert pickle.loads(pickle.dumps(puzzle)) == puzzle
+
+
+def test_state_in_shared_buffer():
+    first = Puzzle()
+    first[4, 4].set_value(5)
+    second = Puzzle(box=2)
+    buffer = bytearray(1000)
+    end = second.pack_into(buffer, first.pack_into(buffer, 10))
+    assert end == 10 + first.state_size() + second.state_size()
+    view = memoryview(buffer)
+    assert Puzzle.from_bytes(view, 10) == first
+    assert Puzzle.from_bytes(view[10 + first.state_size() :]) == second
+    assert len(pickle.dumps(first)) < 2 * first.state_size()
+
+
+def test_state_rejects_bad_data():
+    state = Puzzle().to_bytes()
+    for bad in (b"", state[:-1], b"XXXX" + state[4:], state[:4] + b"\2" + state[5:]):
+        with pytest.raises(ValueError):
+            Puzzle.from_bytes(bad)
+    with pytest.raises(ValueError):
+        Puzzle.from_bytes(state[:8] + b"\12" + state[9:])
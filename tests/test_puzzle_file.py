@@ -0,0 +1,90 @@
+import io
+import pytest
+from pathlib import Path
+from sudoku.puzzle_file import (
+    read_puzzle,
+    parse_puzzle,
+    format_puzzle,
+    format_grid,
+    iter_puzzle_lines,
+    iter_puzzles,
+)
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+EASY = ".91..82..8...93.6..5.27.83........75.6731...498..4.6..6.95..12......9456215.6...3"
+LARGE = (
+    "..F..61..4A.3..76..23....8F..A49..95E8B.........C.7...9A6D..EF..F.E8..6.A9..G3.C73.G.945.2..F..."
+    "95.A..8.7..G1.2D.26...C3......9.......EBG..C..1.G.3.....D.2...F.8FBE6.21...5.7G..12..G37.F...9.."
+    "..D1..........5..CG7.5A..6.1B8.F..8F12D6954A.C...4....F8..G..D6."
+)
+
+
+def test_parse_and_format_round_trip():
+    puzzle = parse_puzzle(EASY)
+    assert puzzle == read_puzzle(EXAMPLES / "easy.txt")
+    assert format_puzzle(puzzle) == EASY
+    assert parse_puzzle(EASY.replace(".", "0")) == puzzle
+
+
+def test_parse_puzzle_rejects_bad_length():
+    with pytest.raises(ValueError):
+        parse_puzzle(EASY[:-1])
+
+
+def test_iter_puzzle_lines_formats():
+    grid = (EXAMPLES / "easy.txt").read_text()
+    f = io.StringIO(
+        "quizzes,solutions\n"
+        f"{EASY},\n"
+        "# a comment\n"
+        "\n"
+        f"{grid}\n"
+        f"{EASY.replace('.', '0')}\n"
+    )
+    lines = list(iter_puzzle_lines(f))
+    assert lines == [EASY, "".join(grid.split()), EASY.replace(".", "0")]
+    assert parse_puzzle(lines[1]) == parse_puzzle(EASY)
+
+
+def test_iter_puzzle_lines_incomplete_grid():
+    with pytest.raises(ValueError):
+        list(iter_puzzle_lines(io.StringIO("123456789\n")))
+
+
+def test_iter_puzzles_is_lazy(tmp_path):
+    path = tmp_path / "puzzles.txt"
+    path.write_text(f"{EASY}\nnot a puzzle\n")
+    puzzles = iter_puzzles(str(path))
+    assert next(puzzles) == parse_puzzle(EASY)
+    with pytest.raises(ValueError):
+        next(puzzles)
+
+
+def test_large_puzzles(tmp_path):
+    puzzle = parse_puzzle(LARGE)
+    assert puzzle.size == 16 and puzzle.box == 4
+    assert puzzle[0, 2].value == 15 and puzzle._masks.typecode == "H"
+    assert format_puzzle(puzzle) == LARGE
+    assert parse_puzzle(LARGE.lower()) == puzzle
+    assert parse_puzzle("..232.1.....1432").size == 4
+    with pytest.raises(ValueError):
+        parse_puzzle("Q" + LARGE[1:])
+    with pytest.raises(ValueError):
+        parse_puzzle("5" + "." * 15)
+
+    for tokens in (False, True):
+        path = tmp_path / f"large-{tokens}.txt"
+        path.write_text(format_grid(puzzle, tokens=tokens))
+        assert read_puzzle(path) == puzzle
+    assert format_grid(puzzle, tokens=True).splitlines()[0].split()[:3] == [".", ".", "15"]
+    assert list(iter_puzzle_lines(io.StringIO(LARGE + "\n" + EASY + "\n"))) == [LARGE, EASY]
+
+
+def test_read_puzzle_rejects_bad_grids(tmp_path):
+    path = tmp_path / "puzzle.txt"
+    path.write_text("123\n456\n789\n")
+    with pytest.raises(ValueError):
+        read_puzzle(path)
+    path.write_text("1 2 3 4\n. . . .\n. . 17 .\n. . . .\n")
+    with pytest.raises(ValueError):
+        read_puzzle(path)
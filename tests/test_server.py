@@ -0,0 +1,112 @@
+import asyncio
+import json
+import time
+import pytest
+from benchmarks.corpus import large
+from sudoku.puzzle_file import parse_puzzle
+from sudoku.server import SolveServer, check_line
+
+EASY = ".91..82..8...93.6..5.27.83........75.6731...498..4.6..6.95..12......9456215.6...3"
+UNSOLVABLE = "11" + "." * 79
+LARGE = "123456789ABCDEFG5678DEFG12349abc9abc1234defg5678" + "." * 208
+
+
+async def exchange(server: SolveServer, requests: list[str], path: str | None = None) -> list[str]:
+    listening = await server.start(path=path)
+    if path is None:
+        reader, writer = await asyncio.open_connection(*listening.sockets[0].getsockname()[:2])
+    else:
+        reader, writer = await asyncio.open_unix_connection(path)
+    writer.write("".join(request + "\n" for request in requests).encode())
+    await writer.drain()
+    replies = [(await reader.readline()).decode().strip() for _ in requests]
+    writer.close()
+    return replies
+
+
+def test_replies_in_order():
+    async def main():
+        async with SolveServer(jobs=2) as server:
+            return await exchange(
+                server,
+                [
+                    EASY,
+                    json.dumps({"id": 7, "puzzle": EASY}),
+                    UNSOLVABLE,
+                    json.dumps({"id": "x", "puzzle": UNSOLVABLE}),
+                    "12345",
+                    json.dumps({"puzzle": 5}),
+                ],
+            )
+
+    solved, reply, unsolvable, failure, error, json_error = asyncio.run(main())
+    assert parse_puzzle(solved).is_solved()
+    assert json.loads(reply) == {"id": 7, "result": "solved", "solution": solved}
+    assert unsolvable == UNSOLVABLE
+    assert json.loads(failure) == {"id": "x", "result": "failure"}
+    assert error.startswith("error: ")
+    assert json.loads(json_error)["result"] == "error"
+
+
+def test_micro_batches_and_deadlines(tmp_path):
+    async def main():
+        async with SolveServer(jobs=1, batch_size=16) as server:
+            replies = await exchange(
+                server,
+                [EASY] * 50 + [json.dumps({"puzzle": EASY, "timeout": 0})],
+                path=str(tmp_path / "solve.sock"),
+            )
+            return replies, server.batches
+
+    replies, batches = asyncio.run(main())
+    assert all(parse_puzzle(reply).is_solved() for reply in replies[:50])
+    assert json.loads(replies[50]) == {"result": "timeout"}
+    assert batches < 50
+
+
+def test_solve_directly():
+    async def main():
+        async with SolveServer(jobs=1, max_pending=2) as server:
+            await server.start()
+            results = await asyncio.gather(*(server.solve(EASY) for _ in range(10)))
+            with pytest.raises(TimeoutError):
+                await server.solve(EASY, timeout=0)
+            return results
+
+    results = asyncio.run(main())
+    assert len(results) == 10 and len(set(results)) == 1
+
+
+def test_other_sizes():
+    check_line(LARGE)
+    for line in (EASY[:80], LARGE.replace("G", "H"), "5" + EASY[1:80] + "A"):
+        with pytest.raises(ValueError):
+            check_line(line)
+
+    async def main():
+        async with SolveServer(jobs=1) as server:
+            return await exchange(server, [LARGE, json.dumps({"puzzle": "." * 16})])
+
+    solved, reply = asyncio.run(main())
+    assert len(solved) == 256 and parse_puzzle(solved).is_solved()
+    assert parse_puzzle(json.loads(reply)["solution"]).is_solved()
+
+
+def test_slow_batch_frees_the_worker_by_its_deadline():
+    # 25x25 grids that each take seconds to solve.
+    slow = large(5, 0.55, 3)
+
+    async def main():
+        async with SolveServer(jobs=1, batch_size=16) as server:
+            await server.start()
+            replies = await asyncio.gather(
+                *(server.solve(line, timeout=0.5) for line in slow), return_exceptions=True
+            )
+            start = time.perf_counter()
+            await server.solve(EASY)
+            return replies, time.perf_counter() - start, server.batches
+
+    replies, waited, batches = asyncio.run(main())
+    assert all(isinstance(reply, TimeoutError) for reply in replies)
+    # The worker gave up on the whole batch at its deadline, not 0.5 s per puzzle.
+    assert batches == 2 and waited < 0.4
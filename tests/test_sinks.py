@@ -0,0 +1,83 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import pytest
+from sudoku.sinks import Sink, open_sink, FORMATS
+from sudoku.corpus_file import Corpus
+from sudoku.solver import SolverResult
+from sudoku.stats import SolveStats
+
+SOLVED = "391658247872493561456271839124986375567312984983745612649537128738129456215864793"
+UNSOLVABLE = "11" + "." * 79
+RESULTS = [(0, SolverResult.SOLVED, SOLVED), (1, SolverResult.FAILURE, UNSOLVABLE), (2, SolverResult.TIMEOUT, SOLVED)]
+
+
+@pytest.mark.parametrize("suffix, opener", [("", open), (".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open)])
+def test_lines(tmp_path, suffix, opener):
+    path = str(tmp_path / f"out.txt{suffix}")
+    # A tiny buffer, to write in several blocks.
+    with open_sink(path, buffer_size=100) as sink:
+        for result in RESULTS * 3:
+            sink.write(*result)
+    with opener(path, "rt") as f:
+        assert f.read().split("\n") == [SOLVED, UNSOLVABLE, SOLVED] * 3 + [""]
+
+
+def test_jsonl(tmp_path):
+    path = str(tmp_path / "out.jsonl.gz")
+    with open_sink(path, "jsonl") as sink:
+        for result in RESULTS:
+            sink.write(*result)
+        sink.write_stats(SolveStats(puzzles=3))
+    with gzip.open(path, "rt") as f:
+        records = [json.loads(line) for line in f]
+    assert records[:3] == [
+        {"index": 0, "result": "solved", "solution": SOLVED},
+        {"index": 1, "result": "failure", "puzzle": UNSOLVABLE},
+        {"index": 2, "result": "timeout", "puzzle": SOLVED},
+    ]
+    assert records[3]["stats"]["puzzles"] == 3
+
+
+def test_binary_out_of_order(tmp_path):
+    path = str(tmp_path / "out.sdk")
+    with open_sink(path, "binary", buffer_size=50) as sink:
+        for index in (4, 5, 0, 1, 2, 7):
+            sink.write(index, SolverResult.SOLVED if index % 2 else SolverResult.FAILURE, SOLVED)
+    with Corpus(path) as corpus:
+        assert len(corpus) == 8
+        assert corpus[5] == SOLVED and corpus.result(5) == (SolverResult.SOLVED, SOLVED)
+        assert corpus.result(4) == (SolverResult.FAILURE, None)
+        # Never written.
+        assert corpus.result(6) == (None, None)
+
+
+def test_bad_sinks(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "out"), "xml")
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "out"), compression="rar")
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "out.sdk.gz"), "binary")
+    with pytest.raises(ValueError):
+        open_sink("-", "binary")
+    assert "binary" in FORMATS
+    # Only the sinks of a format can be made.
+    with pytest.raises(TypeError):
+        Sink(io.BytesIO())
+
+
+def test_larger_grids(tmp_path):
+    large = "123456789ABCDEFG" * 16
+    path = str(tmp_path / "out.txt")
+    with open_sink(path) as sink:
+        sink.write(0, SolverResult.SOLVED, large)
+    with open(path) as f:
+        assert f.read() == large + "\n"
+    # A corpus only holds 9x9 puzzles, and says so at once.
+    with open_sink(str(tmp_path / "out.sdk"), "binary") as sink:
+        sink.write(0, SolverResult.SOLVED, SOLVED)
+        with pytest.raises(ValueError, match="9x9"):
+            sink.write(1, SolverResult.SOLVED, large)
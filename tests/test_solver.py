@@ -1,5 +1,7 @@
 import pytest
+from pathlib import Path
 from sudoku.puzzle import Puzzle
+from sudoku.puzzle_file import read_puzzle, parse_puzzle, format_puzzle
 from sudoku.cell import Cell
 from sudoku.solver import (
     extract_cyclic_tiles,
@@ -7,7 +9,21 @@ from sudoku.solver import (
     step,
     Tile,
     try_solve_puzzle,
-    SolverResult
+    solve,
+    SolverResult,
+    BACKENDS,
+    count_solutions,
+    has_unique_solution,
+)
+from sudoku.propagation import TECHNIQUES
+from sudoku.stats import SolveStats
+from sudoku import solver
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+LARGE = (
+    "..F..61..4A.3..76..23....8F..A49..95E8B.........C.7...9A6D..EF..F.E8..6.A9..G3.C73.G.945.2..F..."
+    "95.A..8.7..G1.2D.26...C3......9.......EBG..C..1.G.3.....D.2...F.8FBE6.21...5.7G..12..G37.F...9.."
+    "..D1..........5..CG7.5A..6.1B8.F..8F12D6954A.C...4....F8..G..D6."
 )
 
 
@@ -177,4 +193,116 @@ def test_try_solve_puzzle():
     result, unsolved_puzzle, iterations = try_solve_puzzle(puzzle)
     assert result == SolverResult.UNSOLVED
     assert not unsolved_puzzle.is_solved()
-    assert unsolved_puzzle.is_valid()
\ No newline at end of file
+    assert unsolved_puzzle.is_valid()
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["easy", "normal", "hard", "expert", "expert2"])
+def test_solve_examples(name, backend):
+    puzzle = read_puzzle(EXAMPLES / f"{name}.txt")
+    result, solved_puzzle = solve(puzzle, backend=backend)
+    assert result == SolverResult.SOLVED
+    assert solved_puzzle.is_solved()
+    assert solved_puzzle.is_valid()
+    for i in range(9):
+        for j in range(9):
+            if puzzle[i, j].value is not None:
+                assert solved_puzzle[i, j].value == puzzle[i, j].value
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_solve_empty_puzzle(empty_puzzle, backend):
+    result, solved_puzzle = solve(empty_puzzle, backend=backend)
+    assert result == SolverResult.SOLVED
+    assert solved_puzzle.is_valid()
+    assert not empty_puzzle.is_solved()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_solve_no_solution(backend):
+    puzzle = Puzzle()
+    # Every digit but 9 is ruled out of (0, 0), and 9 is already used in its column.
+    for col in range(1, 9):
+        puzzle[0, col] = Cell(value=col)
+    puzzle[5, 0] = Cell(value=9)
+    result, _ = solve(puzzle, backend=backend)
+    assert result == SolverResult.FAILURE
+
+    puzzle[0, 0] = Cell(value=9)
+    result, _ = solve(puzzle, backend=backend)
+    assert result == SolverResult.FAILURE
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_solve_larger_grids(backend):
+    puzzle = parse_puzzle(LARGE)
+    result, solved = solve(puzzle, backend=backend)
+    assert result == SolverResult.SOLVED
+    assert solved.size == 16 and solved.is_solved() and solved.is_valid()
+    assert all(v == s for v, s in zip(puzzle._values, solved._values) if v)
+
+    assert count_solutions(Puzzle(box=2), limit=1000, backend=backend) == 288
+    result, solved = solve(Puzzle(box=5), backend=backend)
+    assert result == SolverResult.SOLVED and solved.is_solved() and solved.is_valid()
+
+
+def test_search_restarts_on_larger_grids(monkeypatch):
+    assert [solver._luby(i) for i in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+    monkeypatch.setattr(solver, "RESTART_GUESSES", 1)
+    stats = SolveStats()
+    result, solved = solve(parse_puzzle(LARGE), stats=stats)
+    assert result == SolverResult.SOLVED and solved.is_solved() and solved.is_valid()
+    assert stats.restarts > 0
+    assert solve(parse_puzzle(LARGE))[1] == solved
+    # 9x9 grids are searched without restarts.
+    stats = SolveStats()
+    solve(read_puzzle(EXAMPLES / "expert.txt"), stats=stats)
+    assert stats.restarts == 0 and stats.guesses > 0
+
+
+@pytest.mark.parametrize(
+    "techniques",
+    [("singles",), ("singles", "hidden_singles", "pointing", "box_line"), TECHNIQUES],
+)
+def test_solve_with_techniques(techniques):
+    for puzzle in [read_puzzle(EXAMPLES / f"{name}.txt") for name in ("hard", "expert", "expert2")]:
+        result, solved = solve(puzzle, techniques=techniques)
+        assert result == SolverResult.SOLVED
+        assert solved == solve(puzzle)[1]
+    # LARGE has several solutions, and the randomized search may find any of them.
+    result, solved = solve(parse_puzzle(LARGE), techniques=techniques)
+    line = format_puzzle(solved)
+    assert result == SolverResult.SOLVED and solved.is_solved() and solved.is_valid()
+    assert all(line[i] == given for i, given in enumerate(LARGE) if given != ".")
+    with pytest.raises(ValueError):
+        solve(Puzzle(), techniques=("singles", "guessing"))
+
+
+def test_solve_unknown_backend(empty_puzzle):
+    with pytest.raises(ValueError):
+        solve(empty_puzzle, backend="quantum")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_count_solutions(backend):
+    puzzle = read_puzzle(EXAMPLES / "expert2.txt")
+    assert count_solutions(puzzle, backend=backend) == 1
+    assert has_unique_solution(puzzle, backend=backend)
+    assert count_solutions(Puzzle(), limit=5, backend=backend) == 5
+    assert not has_unique_solution(Puzzle(), backend=backend)
+
+    invalid = Puzzle()
+    invalid[0, 0].set_value(1)
+    invalid[0, 1].set_value(1)
+    assert count_solutions(invalid, backend=backend) == 0
+
+
+def test_count_solutions_leaves_puzzle_unchanged():
+    _, solved = solve(read_puzzle(EXAMPLES / "hard.txt"))
+    puzzle = solved.copy()
+    for i in range(0, 81, 2):
+        puzzle[i // 9, i % 9] = Cell()
+    before = puzzle.copy()
+    count = count_solutions(puzzle, limit=1000)
+    assert 1 <= count < 1000
+    assert count_solutions(puzzle, limit=1000, backend="dlx") == count
+    assert puzzle == before
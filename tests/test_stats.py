@@ -0,0 +1,76 @@
+from pathlib import Path
+from sudoku.puzzle_file import read_puzzle, format_puzzle
+from sudoku.solver import solve, try_solve_puzzle, SolverResult
+from sudoku.events import EventKind
+from sudoku.stats import SolveStats, TECHNIQUES, aggregate
+from sudoku.batch import solve_stream
+from sudoku.propagation import TECHNIQUES as PIPELINE
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_stats_match_events():
+    events = []
+    stats = SolveStats()
+    result, _ = solve(read_puzzle(EXAMPLES / "expert2.txt"), observer=events.append, stats=stats)
+    assert result == SolverResult.SOLVED
+
+    def count(kind):
+        return sum(1 for event in events if event.kind == kind)
+
+    assert stats.puzzles == 1
+    assert stats.guesses == count(EventKind.GUESS) > 0
+    assert stats.backtracks == count(EventKind.BACKTRACK)
+    assert stats.max_depth == max(event.depth for event in events)
+    eliminated = sum(len(event.digits) for event in events if event.kind == EventKind.ELIMINATION)
+    assert sum(stats.eliminations.values()) == eliminated
+    assert stats.subset_calls == sum(stats.subset_sizes.values()) > 0
+    assert set(stats.times) == {"propagation", "search"}
+
+
+def test_technique_eliminations():
+    assert TECHNIQUES[:-1] == PIPELINE
+    stats = SolveStats()
+    solve(read_puzzle(EXAMPLES / "expert2.txt"), stats=stats, techniques=PIPELINE)
+    assert stats.eliminations["pointing"] > 0 and stats.eliminations["box_line"] > 0
+
+
+def test_try_solve_puzzle_stats():
+    stats = SolveStats()
+    result, _, _ = try_solve_puzzle(read_puzzle(EXAMPLES / "easy.txt"), stats=stats)
+    assert result == SolverResult.SOLVED
+    assert stats.guesses == 0
+    assert stats.eliminations["singles"] > 0
+    assert set(stats.times) == {"propagation"}
+
+
+def test_dlx_stats_are_timed():
+    stats = SolveStats()
+    solve(read_puzzle(EXAMPLES / "hard.txt"), backend="dlx", stats=stats)
+    assert stats.puzzles == 1
+    assert set(stats.times) == {"dlx"}
+
+
+def test_aggregate():
+    first = SolveStats()
+    second = SolveStats()
+    solve(read_puzzle(EXAMPLES / "expert2.txt"), stats=first)
+    solve(read_puzzle(EXAMPLES / "easy.txt"), stats=second)
+    total = aggregate([first, second])
+    assert total.puzzles == 2
+    assert total.guesses == first.guesses + second.guesses
+    assert total.max_depth == max(first.max_depth, second.max_depth)
+    for technique in TECHNIQUES:
+        assert total.eliminations[technique] == first.eliminations[technique] + second.eliminations[technique]
+    assert total.to_dict()["puzzles"] == 2
+
+
+def test_solve_stream_collects_stats_from_workers():
+    line = format_puzzle(read_puzzle(EXAMPLES / "expert2.txt"))
+    local = SolveStats()
+    pooled = SolveStats()
+    list(solve_stream([line] * 4, jobs=1, stats=local))
+    list(solve_stream([line] * 4, jobs=2, chunk_size=1, stats=pooled))
+    assert local.puzzles == pooled.puzzles == 4
+    assert local.guesses == pooled.guesses > 0
+    assert local.eliminations == pooled.eliminations
@@ -0,0 +1,43 @@
+from sudoku.cell import to_mask
+from sudoku.subsets import subset_eliminations, cyclic_group
+
+
+def masks(*candidates):
+    return tuple(to_mask(c) for c in candidates)
+
+
+def test_naked_pair():
+    eliminations = subset_eliminations(masks({1, 2}, {1, 2}, {1, 2, 3}, {3, 4}))
+    assert dict(eliminations) == {2: to_mask({1, 2})}
+
+
+def test_hidden_pair():
+    unit = masks({1, 2, 5}, {1, 2, 6}, {3, 4, 5, 6}, {3, 4, 5, 6}, {3, 4, 5, 6}, {3, 4, 5, 6})
+    eliminations = dict(subset_eliminations(unit))
+    assert eliminations[0] == to_mask({5})
+    assert eliminations[1] == to_mask({6})
+
+
+def test_no_subset():
+    assert subset_eliminations(masks({1, 2}, {2, 3}, {3, 4}, {4, 1})) == ()
+
+
+def test_contradiction():
+    assert subset_eliminations(masks({1, 2}, {1, 2}, {1, 2}, {3, 4, 5})) is None
+
+
+def test_size_cap():
+    unit = masks({1, 2, 3}, {1, 2, 3}, {1, 2, 3}, {1, 2, 3, 4}, {4, 5, 6}, {5, 6, 7}, {6, 7})
+    assert subset_eliminations(unit, max_size=2) == ()
+    assert dict(subset_eliminations(unit, max_size=3))[3] == to_mask({1, 2, 3})
+
+
+def test_cyclic_group():
+    assert cyclic_group(masks({1, 2, 3}, {1, 2}, {1, 2})) == 0b110
+    assert cyclic_group(masks({1, 2}, {1, 2, 3})) == 0
+
+
+def test_large_cyclic_group_from_digit_side():
+    # Six cells share six digits; the remaining cell holds the hidden single 7.
+    unit = masks({1, 2}, {2, 3}, {3, 4}, {4, 5}, {5, 6}, {6, 1}, {1, 7})
+    assert cyclic_group(unit) == 0b0111111
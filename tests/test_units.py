@@ -0,0 +1,57 @@
+import pytest
+from sudoku.units import POSITIONS, SECTIONS, ROWS, COLS, UNITS, CELL_UNITS, PEERS, BOX_SIZES, geometry
+
+
+def test_units_cover_grid():
+    assert len(UNITS) == 27
+    for group in (SECTIONS, ROWS, COLS):
+        assert sorted(i for unit in group for i in unit) == list(range(81))
+
+
+def test_section_layout():
+    assert SECTIONS[0] == (0, 1, 2, 9, 10, 11, 18, 19, 20)
+    assert SECTIONS[4] == (30, 31, 32, 39, 40, 41, 48, 49, 50)
+
+
+def test_cell_units():
+    for i, (row, col) in enumerate(POSITIONS):
+        section, row_unit, col_unit = CELL_UNITS[i]
+        assert i in UNITS[section]
+        assert UNITS[row_unit] == ROWS[row]
+        assert UNITS[col_unit] == COLS[col]
+
+
+def test_peers():
+    for i in range(81):
+        assert len(PEERS[i]) == 20
+        assert i not in PEERS[i]
+    assert 72 in PEERS[0]
+    assert 10 in PEERS[0]
+    assert 13 not in PEERS[0]
+
+
+@pytest.mark.parametrize("box", BOX_SIZES)
+def test_geometry(box):
+    g = geometry(box)
+    n = box * box
+    assert g.size == n and g.cells == n * n
+    assert len(g.units) == 3 * n
+    for group in (g.sections, g.rows, g.cols):
+        assert sorted(i for unit in group for i in unit) == list(range(n * n))
+    for i in range(n * n):
+        assert len(g.peers[i]) == 2 * (n - 1) + (box - 1) ** 2
+        assert all(i in g.units[u] for u in g.cell_units[i])
+    assert g.all_candidates.bit_count() == n
+    for u, unit in enumerate(g.units):
+        for partition in g.intersections[u]:
+            assert sorted(i for cells, _ in partition for i in cells) == sorted(unit)
+            for cells, targets in partition:
+                assert len(cells) == box and len(targets) == n - box
+                assert not set(targets) & set(unit)
+
+
+def test_geometry_of_the_standard_grid():
+    assert geometry() is geometry(3)
+    assert geometry().units == UNITS and geometry().peers == PEERS
+    with pytest.raises(ValueError):
+        geometry(6)
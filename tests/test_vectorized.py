@@ -0,0 +1,57 @@
+import pytest
+from pathlib import Path
+from sudoku.puzzle_file import read_puzzle, parse_puzzle, format_puzzle
+from sudoku.solver import solve, SolverResult
+
+np = pytest.importorskip("numpy")
+
+from sudoku.vectorized import to_arrays, from_arrays, propagate_many, solve_many, grade  # noqa: E402
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+NAMES = ["easy", "normal", "hard", "expert", "expert2"]
+
+
+def test_array_round_trip():
+    puzzle = read_puzzle(EXAMPLES / "hard.txt")
+    values, masks = to_arrays([puzzle, puzzle])
+    assert values.shape == (2, 81)
+    assert from_arrays(values[1], masks[1]) == puzzle
+
+
+def test_propagate_many_solves_easy_and_flags_contradictions():
+    puzzles = [read_puzzle(EXAMPLES / "easy.txt"), parse_puzzle("11" + "." * 79)]
+    values, masks = to_arrays(puzzles)
+    contradiction = propagate_many(values, masks)
+    assert list(contradiction) == [False, True]
+    assert (values[0] != 0).all()
+    assert from_arrays(values[0], masks[0]).is_valid()
+
+
+def test_solve_many_matches_scalar_solver():
+    puzzles = [read_puzzle(EXAMPLES / f"{name}.txt") for name in NAMES]
+    puzzles.append(parse_puzzle("11" + "." * 79))
+    for puzzle, (result, solved) in zip(puzzles, solve_many(puzzles)):
+        expected, expected_puzzle = solve(puzzle)
+        assert result == expected
+        if result == SolverResult.SOLVED:
+            assert solved == expected_puzzle
+
+
+def test_grade():
+    puzzles = [format_puzzle(read_puzzle(EXAMPLES / f"{name}.txt")) for name in NAMES]
+    solutions = [format_puzzle(solve(parse_puzzle(line))[1]) for line in puzzles]
+    assert grade(puzzles, solutions).all()
+
+    other = solutions[1]
+    swapped = solutions[0][1] + solutions[0][0] + solutions[0][2:]
+    wrong = [other, swapped, solutions[2][:80] + ".", solutions[3][:80] + "?", solutions[4]]
+    # A valid grid that does not keep the givens, two cells swapped, an empty
+    # cell, and a stray character.
+    assert list(grade(puzzles, wrong)) == [False, False, False, False, True]
+
+    with pytest.raises(ValueError):
+        grade(puzzles, solutions[1:])
+    with pytest.raises(ValueError):
+        grade(puzzles[:1], [solutions[0][:80]])
+    with pytest.raises(ValueError):
+        grade(["?" + puzzles[0][1:]], solutions[:1])